@@ -0,0 +1,220 @@
+import argparse
+import gc
+import random
+import struct
+import sys
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from benchmarks import VirtualCanvas, _board, _window
+from gameImage import HeadlessImages
+
+TICKS = 500                 # ticks measured per subsystem
+WARMUP = 50                 # ticks run first, so caches, free lists and lazy tables are filled
+
+# Per-tick budgets in bytes: (peak, retained). peak is the most memory a single tick had
+# allocated above where it started, i.e. its short-lived garbage at the worst moment;
+# retained is the average growth per tick still held afterwards (within a level the eaten
+# pickups log grows, and the characters' last locations are new tuples after a restore).
+# What is left is what pure Python cannot avoid: floats, ints above 256, small tuples.
+BUDGETS: Dict[str, Tuple[int, float]] = {
+    "directions":      (1024, 2),
+    "tick":            (1536, 16),
+    "tick_256_ghosts": (3072, 48),
+    "level_complete":  (64, 1),
+    "draw_board":      (1024, 2),
+    "notification":    (512, 2),
+}
+
+SUBSYSTEMS: Dict[str, Callable] = {}
+
+
+def subsystem(name: str):
+    """Registers a subsystem: a function returning its per-tick step, or (step, unmeasured step before it)."""
+    def register(build):
+        SUBSYSTEMS[name] = build
+        return build
+    return register
+
+
+def _playing(ghosts_per_type: int = 1):
+    """
+    A board played for 30 updates, step() playing one more, and rewind() going back to
+    that point once the game or the level has ended (unmeasured, so every tick measured
+    is an ordinary one).
+    """
+    board = _board(ghosts_per_type, ticks=30)
+    start = board.snapshot(with_rng=True)
+    moves = ("Left", "Up", "Right", "Down")
+    count = [0]
+
+    def step():
+        count[0] += 1
+        if count[0] % 5 == 0:
+            board.directions.push(moves[count[0] // 5 % 4])
+        board.update_directions()
+        board.update_board()
+        if board.pacman.is_respawning:
+            board.pacman.is_respawning = False
+
+    def rewind():
+        if board.game_over or board.level_complete():
+            board.restore(start)
+
+    return board, step, rewind
+
+
+@subsystem("directions")
+def _directions():
+    board, _, _ = _playing()
+    moves = ("Left", "Up", "Right", "Down")
+    count = [0]
+
+    def step():
+        count[0] += 1
+        board.directions.push(moves[count[0] % 4])
+        board.update_directions()
+
+    return step
+
+
+@subsystem("tick")
+def _tick():
+    return _playing()[1:]
+
+
+@subsystem("tick_256_ghosts")
+def _tick_many():
+    return _playing(64)[1:]
+
+
+@subsystem("level_complete")
+def _level_complete():
+    return _playing()[0].level_complete
+
+
+@subsystem("draw_board")
+def _draw_board():
+    board, play, rewind = _playing()
+    window = _window(VirtualCanvas(), HeadlessImages(), board)
+
+    def step():
+        window._draw_board()
+
+    def advance():
+        play()
+        rewind()
+        if window._scene is not board._level_cells:
+            window._draw_board()            # a new level's items: made once per level, not per tick
+
+    return step, advance
+
+
+@subsystem("notification")
+def _notification():
+    from balance_board import BalanceBoard
+    from simulated_board import SimulatedTransport, synthetic_leans
+
+    board = BalanceBoard("00:00:00:00:00:00", transport=SimulatedTransport())
+    pack = struct.Struct(board._NOTIFY_FORMAT).pack
+    leans = synthetic_leans(rate_hz=100.0, seed=0)
+    packets = [bytearray(pack(*next(leans))) for _ in range(1000)]
+    handler, direction = board._notification_handler, board.get_direction
+    clock = [0.0, 0]
+
+    def step():
+        clock[0] += 0.01
+        clock[1] = (clock[1] + 1) % len(packets)
+        handler(0, packets[clock[1]], clock[0])
+        direction()
+
+    return step
+
+
+# ------------------------------------------------------------------ measuring
+def measure(step, ticks: int = TICKS, advance=None, top: int = 0) -> dict:
+    """
+    Runs ``step`` ``ticks`` times under tracemalloc. ``advance``, when given, runs before
+    each step without being measured (e.g. the game update whose board draw_board draws).
+    Garbage collections during the run are counted by generation. What measuring costs
+    by itself (an empty step) is taken off.
+    """
+    overhead = _measure(_nothing, ticks, None, 0)
+    result = _measure(step, ticks, advance, top)
+    result["peak"] = max(result["peak"] - overhead["peak"], 0)
+    result["retained"] = max(result["retained"] - overhead["retained"], 0.0)
+    return result
+
+
+def _nothing():
+    pass
+
+
+def _measure(step, ticks, advance, top) -> dict:
+    for _ in range(WARMUP):
+        if advance is not None:
+            advance()
+        step()
+    collections = [0, 0, 0]
+
+    def count(phase, info):
+        if phase == "start":
+            collections[info["generation"]] += 1
+
+    gc.collect()
+    gc.callbacks.append(count)
+    tracemalloc.start(8 if top else 1)
+    try:
+        if advance is not None:
+            advance()
+        step()                      # replaces what the warmup left behind, which was allocated untraced
+        peak = retained = 0
+        for _ in range(ticks):
+            if advance is not None:
+                advance()
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            step()
+            after, high = tracemalloc.get_traced_memory()
+            peak = max(peak, high - before)
+            retained += after - before
+        sites = tracemalloc.take_snapshot().statistics("traceback")[:top] if top else []
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(count)
+    return {"peak": peak, "retained": retained / ticks, "collections": collections, "sites": sites}
+
+
+def check(names=None, ticks: int = TICKS, top: int = 0) -> list:
+    """Measures each subsystem against its budget; returns the names over budget."""
+    over = []
+    print(f"{'subsystem':18} {'peak B':>8} {'budget':>8} {'kept B/tick':>12} {'budget':>7} {'gc 0/1/2':>10}")
+    for name in names or SUBSYSTEMS:
+        random.seed(0)
+        built = SUBSYSTEMS[name]()
+        step, advance = built if isinstance(built, tuple) else (built, None)
+        result = measure(step, ticks, advance, top)
+        peak_budget, kept_budget = BUDGETS[name]
+        flag = ""
+        if result["peak"] > peak_budget or result["retained"] > kept_budget:
+            flag = "   OVER BUDGET"
+            over.append(name)
+        print(f"{name:18} {result['peak']:8d} {peak_budget:8d} {result['retained']:12.1f} {kept_budget:7g} "
+              f"{'/'.join(map(str, result['collections'])):>10}{flag}")
+        for stat in result["sites"]:
+            print(f"    {stat.size:8d} B {stat.count:5d} blocks  " + " <- ".join(
+                f"{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}" for frame in stat.traceback))
+    return over
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-tick memory allocation budgets of the game's subsystems (headless).")
+    parser.add_argument("names", nargs="*", help=f"subsystems to check (default: all): {', '.join(SUBSYSTEMS)}")
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--top", type=int, default=0, help="also list the allocation sites still holding the most memory")
+    args = parser.parse_args()
+
+    over = check(args.names or None, args.ticks, args.top)
+    if over:
+        print(f"{len(over)} subsystem(s) over budget: {', '.join(over)}")
+        sys.exit(1)
@@ -1,10 +1,87 @@
 import asyncio
 import struct
 import threading
-from collections import deque
-from typing import Optional, Tuple
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Tuple
 
-from bleak import BleakClient, BleakScanner
+import latency
+import telemetry
+from tilt_filters import BoxcarFilter, TiltFilter
+
+
+class BoardTransport(ABC):
+    """
+    Source of raw notification packets for a BalanceBoard.  A transport owns the
+    connection life-cycle and pushes every packet through the board's real
+    notification handler, so the rest of the input pipeline cannot tell a real
+    board from a simulated one.
+    """
+
+    @abstractmethod
+    async def run(self, board: "BalanceBoard") -> None:
+        ...
+
+
+async def keep_connected(
+    board: "BalanceBoard",
+    device,
+    char_uuid: str,
+    connect_timeout: float = 20,
+    reconnect_delay: float = 2.0,
+) -> None:
+    """
+    Connect to ``device`` (a bleak BLEDevice or an address), subscribe ``board`` to the
+    pitch/roll characteristic and reconnect whenever the link drops.  Shared by
+    BleakTransport and BalanceBoardManager so every board gets the same recovery.
+    """
+    from bleak import BleakClient
+    from bleak.exc import BleakError
+
+    address = getattr(device, "address", device)
+    while True:
+        dropped = asyncio.Event()
+
+        def on_disconnect(_client) -> None:
+            board._mark_disconnected()
+            dropped.set()
+
+        try:
+            async with BleakClient(device, timeout=connect_timeout, disconnected_callback=on_disconnect) as client:
+                print(f"[INFO] Connected to {address}. Subscribing notifications…")
+                await client.start_notify(char_uuid, board._notification_handler)
+                board._mark_connected()
+                await dropped.wait()
+        except (BleakError, asyncio.TimeoutError, OSError) as exc:
+            print(f"[WARN] {address}: {exc}")
+        board._mark_disconnected()
+
+        print(f"[INFO] {address} disconnected — reconnecting in {reconnect_delay:.0f} s")
+        await asyncio.sleep(reconnect_delay)
+
+
+class BleakTransport(BoardTransport):
+    """Scans for the Arduino by MAC address and subscribes to its pitch/roll characteristic."""
+
+    def __init__(self, mac_address: str, char_uuid: str = "2a57", connect_timeout: float = 20,
+                 reconnect_delay: float = 2.0):
+        self.mac_address = mac_address
+        self.char_uuid = char_uuid
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+
+    async def run(self, board: "BalanceBoard") -> None:
+        # imported here so simulated boards work on machines without bleak/BlueZ
+        from bleak import BleakScanner
+
+        print("[INFO] Scanning for BLE devices…")
+        devices = await BleakScanner.discover()
+        target = next((d for d in devices if d.address.lower() == self.mac_address.lower()), None)
+        if not target:
+            print(f"[ERROR] Device {self.mac_address} not found.")
+            return
+
+        await keep_connected(board, target, self.char_uuid, self.connect_timeout, self.reconnect_delay)
 
 
 class BalanceBoard:
@@ -16,7 +93,7 @@ class BalanceBoard:
     # --------------------------------------------
     #                CONSTANTS / TUNING
     # --------------------------------------------
-    _AVG_SAMPLES = 5              # how many samples for the moving average
+    _AVG_SAMPLES = 5              # how many samples for the default moving average
     _NOTIFY_FORMAT = "<ff"        # little-endian Pitch,Roll floats  (# NEW)
     _NOTIFY_SIZE   = struct.calcsize(_NOTIFY_FORMAT)
 
@@ -26,9 +103,17 @@ class BalanceBoard:
         char_uuid: str = "2a57",
         activate_thresh: float = 5.0,   # degrees needed to fire a direction
         release_thresh: float = 3.0,    # degrees back to centre to release
+        transport: Optional[BoardTransport] = None,
+        recorder=None,                  # optional sample_recording.SampleRecorder
+        tilt_filter: Optional[Callable[[], TiltFilter]] = None,   # factory, one filter per axis
+        predictive: bool = False,       # fire early when the lean is certain to cross activate
+        predict_horizon: float = 0.08,  # seconds of extrapolation allowed
+        predict_min_velocity: float = 25.0,  # deg/s a lean must be moving at to be predicted
     ):
         self.mac_address = mac_address
         self.char_uuid = char_uuid
+        self.transport = transport or BleakTransport(mac_address, char_uuid)
+        self.recorder = recorder
 
         # last raw reading
         self._raw_pitch: float = 0.0
@@ -38,19 +123,48 @@ class BalanceBoard:
         self._origin_pitch: float = 0.0
         self._origin_roll: float = 0.0
 
-        # circular buffers for a short moving average  (# NEW)
-        self._pitch_hist = deque(maxlen=self._AVG_SAMPLES)
-        self._roll_hist  = deque(maxlen=self._AVG_SAMPLES)
+        # per-axis smoothing, run once per sample in the handler; readers get the cached output
+        make_filter = tilt_filter or (lambda: BoxcarFilter(self._AVG_SAMPLES))
+        self._pitch_filter = make_filter()
+        self._roll_filter  = make_filter()
+        self._pitch_smooth: Optional[float] = None
+        self._roll_smooth: float = 0.0
+        self._last_ts: Optional[float] = None
+        self._last_dt: float = 0.0
+        self._sample_period: float = 0.0            # running estimate, for group_delay()
 
         self._activate = activate_thresh
         self._release  = release_thresh
 
         self._direction: Optional[str] = None      # last direction fired (# NEW)
+        self.direction_sink = None                 # optional DirectionQueue fed on every new direction
+
+        # predictive mode: tilt velocity (deg/s) and the early fire awaiting confirmation
+        self._predictive       = predictive
+        self._horizon          = predict_horizon
+        self._min_velocity     = predict_min_velocity
+        self._prev_tilt: Optional[Tuple[float, float]] = None
+        self._pitch_vel: float = 0.0
+        self._roll_vel: float  = 0.0
+        self._pending: Optional[Tuple[str, float]] = None     # (direction, fired at)
+        self._ticket: Optional[int] = None          # the direction sink's ticket for the early fire
+
+        # prediction statistics (see prediction_stats())
+        self.predictions_fired     = 0
+        self.predictions_confirmed = 0
+        self.predictions_cancelled = 0
+        self.prediction_lead_total = 0.0          # seconds gained by confirmed predictions
 
         # thread-sync
         self._lock          = threading.Lock()
         self._connected_evt = threading.Event()
         self._calibrated    = False
+        self._thread: Optional[threading.Thread] = None
+
+        # link statistics
+        self.packets_received = 0
+        self.packets_rejected = 0
+        self.disconnects      = 0
 
     # ------------------------------------------------------------ #
     #                         Public API                           #
@@ -64,8 +178,12 @@ class BalanceBoard:
     def reset_origin(self) -> None:
         """Call when the board lies flat to set a new zero."""
         with self._lock:
-            self._origin_pitch = self._raw_pitch
-            self._origin_roll  = self._raw_roll
+            self._set_origin()
+
+    def _set_origin(self) -> None:
+        """Take the last raw reading as the new zero.  Caller must hold ``_lock``."""
+        self._origin_pitch = self._raw_pitch
+        self._origin_roll  = self._raw_roll
         print(f"[INFO] Origin reset: pitch={self._origin_pitch:.2f}, roll={self._origin_roll:.2f}")
 
     # -----------------------  LIVE VALUES  ----------------------- #
@@ -75,10 +193,10 @@ class BalanceBoard:
         and *properly* inverting the roll axis so “lean right” is positive.
         """
         with self._lock:
-            if not self._pitch_hist:         # no data yet
+            if self._pitch_smooth is None:   # no data yet
                 return 0.0, 0.0
-            pitch = sum(self._pitch_hist) / len(self._pitch_hist)
-            roll  = sum(self._roll_hist)  / len(self._roll_hist)
+            pitch = self._pitch_smooth
+            roll  = self._roll_smooth
 
             # FIXED — correct order: (latest_raw − origin) then invert sign
             pitch -= self._origin_pitch
@@ -86,12 +204,88 @@ class BalanceBoard:
 
         return pitch, roll
 
+    def group_delay(self) -> float:
+        """Seconds the smoothed tilt currently lags the raw samples, at the observed packet rate."""
+        with self._lock:
+            return self._pitch_filter.group_delay(self._sample_period)
+
     def get_direction(self) -> Optional[str]:
         """
         Return 'Up', 'Down', 'Left', 'Right' or None.
         Uses hysteresis so the same key isn’t spammed while you hold a lean.
+        The direction is re-evaluated on every sample, so this is just a read.
         """
-        pitch, roll = self.get_tilt()
+        with self._lock:
+            return self._direction
+
+    def prediction_stats(self) -> dict:
+        """Early fires so far, how many the lean went on to confirm, and the average time gained."""
+        with self._lock:
+            confirmed = self.predictions_confirmed
+            return {
+                "fired":     self.predictions_fired,
+                "confirmed": confirmed,
+                "cancelled": self.predictions_cancelled,
+                "mean_lead": self.prediction_lead_total / confirmed if confirmed else 0.0,
+            }
+
+    def link_stats(self) -> dict:
+        """Packet counters and the observed packet rate, for telemetry."""
+        period = self._sample_period
+        return {
+            "received":    self.packets_received,
+            "rejected":    self.packets_rejected,
+            "disconnects": self.disconnects,
+            "rate_hz":     round(1 / period, 1) if period else 0.0,
+        }
+
+    # -----------------------  Life-cycle  ------------------------ #
+    def start(self) -> None:
+        """Start the transport (BLE scanning/connection by default) in a background thread."""
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.transport.run(self)), daemon=True
+        )
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        """False once the transport has given up (e.g. the board was not found by the scan)."""
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------ #
+    #                   Internal / transport hooks                 #
+    # ------------------------------------------------------------ #
+    def _mark_connected(self) -> None:
+        self._connected_evt.set()
+        telemetry.emit("ble_connect", address=self.mac_address, disconnects=self.disconnects)
+
+    def _mark_disconnected(self) -> None:
+        if self._connected_evt.is_set():
+            self.disconnects += 1
+            telemetry.emit("ble_disconnect", address=self.mac_address, **self.link_stats())
+        self._connected_evt.clear()
+
+    # -------------------  Direction detection  ------------------- #
+    def _update_direction(self, timestamp: float) -> None:
+        """Run the activate/release hysteresis (and prediction) on the newest sample.  Caller holds ``_lock``."""
+        previous, predicted = self._direction, self._pending is not None
+        self._classify(timestamp)
+
+        if self._direction == previous or self.direction_sink is None:
+            return
+        if self._direction is not None:
+            cid = latency.tracker.begin() if latency.tracker is not None else None
+            ticket = self.direction_sink.push(self._direction, cid, tentative=self._pending is not None)
+            if self._pending is not None:
+                self._ticket = ticket
+        elif predicted and self._pending is None:
+            self.direction_sink.retract(self._ticket)   # a false start: the game undoes the turn
+
+    def _classify(self, timestamp: float) -> None:
+        pitch = self._pitch_smooth - self._origin_pitch
+        roll  = -(self._roll_smooth - self._origin_roll)
+
+        if self._predictive:
+            self._update_velocity(pitch, roll, timestamp)
 
         # currently outside any gesture ─ look for activation
         if self._direction is None:
@@ -103,7 +297,13 @@ class BalanceBoard:
                 self._direction = "Right"
             elif roll < -self._activate:
                 self._direction = "Left"
-            return self._direction
+            elif self._predictive:
+                self._predict(pitch, roll, timestamp)
+            return
+
+        if self._pending is not None:
+            self._confirm_or_cancel(pitch, roll, timestamp)
+            return
 
         # we are *inside* a gesture ─ wait for release back to dead-zone
         if (
@@ -111,54 +311,99 @@ class BalanceBoard:
             and -self._release <= roll  <= self._release
         ):
             self._direction = None            # released
-        return self._direction
 
-    # -----------------------  Life-cycle  ------------------------ #
-    def start(self) -> None:
-        """Start BLE scanning/connection in a background thread."""
-        threading.Thread(
-            target=lambda: asyncio.run(self._ble_main()), daemon=True
-        ).start()
+    def _update_velocity(self, pitch: float, roll: float, timestamp: float) -> None:
+        if self._prev_tilt is not None and self._last_dt > 0:
+            prev_pitch, prev_roll = self._prev_tilt
+            # light EMA on the finite difference; the tilt itself is already filtered
+            self._pitch_vel += 0.5 * ((pitch - prev_pitch) / self._last_dt - self._pitch_vel)
+            self._roll_vel  += 0.5 * ((roll - prev_roll)  / self._last_dt - self._roll_vel)
+        self._prev_tilt = (pitch, roll)
 
-    # ------------------------------------------------------------ #
-    #                    Internal / BLE helpers                    #
-    # ------------------------------------------------------------ #
-    async def _ble_main(self) -> None:
-        print("[INFO] Scanning for BLE devices…")
-        devices = await BleakScanner.discover()
-        target = next((d for d in devices if d.address.lower() == self.mac_address.lower()), None)
-        if not target:
-            print(f"[ERROR] Device {self.mac_address} not found.")
-            return
+    def _predict(self, pitch: float, roll: float, timestamp: float) -> None:
+        """
+        Fire early when a lean is already past the dead-zone, moving outwards fast enough,
+        and its extrapolation over ``predict_horizon`` crosses the activate threshold.
+        """
+        best, best_reach = None, self._activate
+        for angle, velocity, positive, negative in (
+            (pitch, self._pitch_vel, "Up", "Down"),
+            (roll,  self._roll_vel,  "Right", "Left"),
+        ):
+            if abs(angle) < self._release or abs(velocity) < self._min_velocity:
+                continue
+            if (angle > 0) != (velocity > 0):
+                continue                      # moving back towards the centre
+            reach = abs(angle + velocity * self._horizon)
+            if reach >= best_reach:
+                best, best_reach = (positive if angle > 0 else negative), reach
+
+        if best is not None:
+            self._direction = best
+            self._pending = (best, timestamp)
+            self.predictions_fired += 1
+
+    def _confirm_or_cancel(self, pitch: float, roll: float, timestamp: float) -> None:
+        """Safeguard for early fires: keep them once the lean really crosses, drop false starts."""
+        direction, fired_at = self._pending
+        angle, velocity = {
+            "Up":    (pitch,  self._pitch_vel),
+            "Down":  (-pitch, -self._pitch_vel),
+            "Right": (roll,   self._roll_vel),
+            "Left":  (-roll,  -self._roll_vel),
+        }[direction]
 
-        async with BleakClient(target, timeout=20) as client:
-            print(f"[INFO] Connected to {target.address}. Subscribing notifications…")
-            await client.start_notify(self.char_uuid, self._notification_handler)
-            self._connected_evt.set()
-            await asyncio.Event().wait()       # keep task alive
+        if angle > self._activate:
+            self._pending = None
+            self.predictions_confirmed += 1
+            self.prediction_lead_total += timestamp - fired_at
+        elif velocity < 0 or timestamp - fired_at > 2 * self._horizon:
+            self._pending = None
+            self._direction = None
+            self.predictions_cancelled += 1
 
     # -------------------  Notification handler  ------------------ #
-    def _notification_handler(self, _: int, data: bytearray) -> None:
-        """Decode a <float, float> packet and update state."""
+    def _notification_handler(self, _: int, data: bytearray, timestamp: Optional[float] = None) -> None:
+        """
+        Decode a <float, float> packet and update state.  ``timestamp`` (monotonic seconds)
+        is only passed by replays; live packets are stamped on arrival.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
         if len(data) != self._NOTIFY_SIZE:
+            self.packets_rejected += 1
             print(f"[WARN] Expected {self._NOTIFY_SIZE} bytes, got {len(data)}")
             return
 
         try:
             pitch, roll = struct.unpack(self._NOTIFY_FORMAT, data)  # FIXED: '<ff'
         except struct.error as exc:
+            self.packets_rejected += 1
             print(f"[ERROR] Unpack failed: {exc}")
             return
 
         with self._lock:
+            self.packets_received += 1
             self._raw_pitch = pitch
             self._raw_roll  = roll
 
-            # add to smoothing buffers
-            self._pitch_hist.append(pitch)
-            self._roll_hist.append(roll)
+            if self.recorder is not None:
+                self.recorder.append(timestamp, pitch, roll)
+
+            self._last_dt = timestamp - self._last_ts if self._last_ts is not None else 0.0
+            if self._last_dt > 0:
+                dt = self._last_dt
+                self._sample_period = dt if not self._sample_period else self._sample_period + 0.05 * (dt - self._sample_period)
+            self._last_ts = timestamp
+
+            # run the smoothing stage once, here, rather than on every read
+            self._pitch_smooth = self._pitch_filter.update(pitch, timestamp)
+            self._roll_smooth  = self._roll_filter.update(roll, timestamp)
 
             # first packet: auto-calibrate
             if not self._calibrated:
-                self.reset_origin()
+                self._set_origin()          # already holding the (non-reentrant) lock
                 self._calibrated = True
+
+            self._update_direction(timestamp)
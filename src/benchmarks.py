@@ -0,0 +1,352 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from board import Board
+from gameImage import HeadlessImages
+
+BASELINE  = Path(__file__).resolve().parent.parent / "benchmarks" / "baseline.json"
+THRESHOLD = 0.10            # compare: slower than the baseline by more than this is a regression
+ROUND_SEC = 0.02            # target length of one timed round when the benchmark sets no count
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Registers a benchmark: a function returning (step, setup or None, calls per round or None)."""
+    def register(build):
+        BENCHMARKS[name] = build
+        return build
+    return register
+
+
+class VirtualCanvas:
+    """
+    Stand-in for the Tk canvas with no display behind it: it accepts the same drawing calls
+    and only counts them, so Window._draw_board's own cost is measured. Use --tk under a
+    real or virtual X server (e.g. xvfb-run) to include Tk's.
+    """
+
+    def __init__(self):
+        self.items = 0
+        self.calls = 0
+
+    def create_rectangle(self, *coords, **options) -> int:
+        self.items += 1
+        self.calls += 1
+        return self.items
+
+    create_image = create_rectangle
+
+    def coords(self, item, *coords) -> None:
+        self.calls += 1
+
+    def itemconfigure(self, item, **options) -> None:
+        self.calls += 1
+
+    def delete(self, *tags) -> None:
+        self.calls += 1
+
+
+def _board(ghosts_per_type: int = 1, ticks: int = 0, seed: int = 0) -> Board:
+    """A headless board on the classic maze, played for ``ticks`` updates from a fixed seed."""
+    random.seed(seed)
+    board = Board(1280, 720, HeadlessImages(), ghosts_per_type=ghosts_per_type)
+    board.new_level()
+    for tick in range(ticks):
+        if tick % 5 == 0:
+            board.directions.push(random.choice(("Left", "Right", "Up", "Down")))
+        board.update_directions()
+        board.update_board()
+        if board.pacman.is_respawning:
+            board.pacman.is_respawning = False
+    return board
+
+
+def _search(steps_away: Optional[int]):
+    """Blinky's breadth-first search to a square ``steps_away`` steps off (None: the farthest)."""
+    board = _board()
+    blinky = next(enemy for enemy in board.enemies if enemy.enemy_type == enemy.blinky)
+    distances = board.maze.distances_to(blinky.y, blinky.x)
+    farthest = max(distances)
+    wanted = farthest if steps_away is None else min(steps_away, farthest)
+    goal_y, goal_x = divmod(distances.index(wanted), board.maze.width)
+    start = blinky.x, blinky.y
+    return lambda: blinky.breadth_first_search(board, start, goal_y, goal_x), None, None
+
+
+@benchmark("bfs_short")
+def _bfs_short():
+    return _search(6)
+
+
+@benchmark("bfs_long")
+def _bfs_long():
+    return _search(None)
+
+
+def _ticks(ghosts_per_type: int):
+    """One game update; every round starts again from the same snapshot (random state included)."""
+    board = _board(ghosts_per_type, ticks=30)
+    start = board.snapshot(with_rng=True)
+    moves = ("Left", "Up", "Right", "Down")
+    count = [0]
+
+    def setup():
+        board.restore(start)
+        count[0] = 0
+
+    def step():
+        count[0] += 1
+        if count[0] % 5 == 0:
+            board.directions.push(moves[count[0] // 5 % 4])
+        board.update_directions()
+        board.update_board()
+        if board.pacman.is_respawning:
+            board.pacman.is_respawning = False
+
+    return step, setup, 50
+
+
+@benchmark("tick")
+def _tick():
+    return _ticks(1)
+
+
+@benchmark("tick_256_ghosts")
+def _tick_many():
+    return _ticks(64)
+
+
+@benchmark("level_complete")
+def _level_complete():
+    return _board(ticks=30).level_complete, None, None
+
+
+@benchmark("restore_gamestate")
+def _restore_gamestate():
+    return _board(ticks=30).restore_gamestate, None, None
+
+
+@benchmark("new_level")
+def _new_level():
+    return _board(ticks=30).new_level, None, None
+
+
+@benchmark("notification")
+def _notification():
+    """One BLE packet through BalanceBoard._notification_handler, then get_direction()."""
+    from balance_board import BalanceBoard
+    from simulated_board import SimulatedTransport, synthetic_leans
+
+    board = BalanceBoard("00:00:00:00:00:00", transport=SimulatedTransport())
+    pack = struct.Struct(board._NOTIFY_FORMAT).pack
+    leans = synthetic_leans(rate_hz=100.0, seed=0)
+    packets = [bytearray(pack(*next(leans))) for _ in range(1000)]
+    handler, direction = board._notification_handler, board.get_direction
+    clock = [0.0, 0]
+
+    def step():
+        clock[0] += 0.01
+        clock[1] = (clock[1] + 1) % len(packets)
+        handler(0, packets[clock[1]], clock[0])
+        direction()
+
+    return step, None, None
+
+
+def _window(canvas, images, board: Board):
+    from window import Window
+    window = Window.__new__(Window)             # only what _draw_board uses, no Tk window
+    window._canvas, window._images, window.board = canvas, images, board
+    return window
+
+
+@benchmark("draw_board")
+def _draw_board():
+    """A game update and its redraw, in which only what changed reaches the canvas."""
+    board = _board(ticks=30)
+    window = _window(VirtualCanvas(), HeadlessImages(), board)
+    moves = ("Left", "Up", "Right", "Down")
+    start = board.snapshot(with_rng=True)
+    count = [0]
+
+    def setup():
+        board.restore(start)
+        window._draw_board()
+
+    def step():
+        count[0] += 1
+        if count[0] % 5 == 0:
+            board.directions.push(moves[count[0] // 5 % 4])
+        board.update_directions()
+        board.update_board()
+        if board.pacman.is_respawning:
+            board.pacman.is_respawning = False
+        window._draw_board()
+
+    return step, setup, 50
+
+
+@benchmark("draw_scene")
+def _draw_scene():
+    """Making a level's canvas items (walls, pickups, characters) from scratch."""
+    board = _board(ticks=30)
+    window = _window(VirtualCanvas(), HeadlessImages(), board)
+
+    def step():
+        window._scene = None
+        window._draw_board()
+
+    return step, None, None
+
+
+def _draw_board_tk():
+    """_draw_board on a real Tk canvas with the game's images, from scratch; needs a display."""
+    import tkinter as tk
+    from gameImage import GameImage
+
+    root = tk.Tk()
+    root.geometry("1280x720")
+    canvas = tk.Canvas(root, width=1280, height=720, bg="black")
+    canvas.pack()
+    images = GameImage()
+    board = Board(1280, 720, images)
+    board.new_level()
+    window = _window(canvas, images, board)
+
+    def step():
+        window._scene = None
+        window._draw_board()
+        root.update_idletasks()
+
+    return step, None, None
+
+
+# ------------------------------------------------------------------ running
+def run(names=None, rounds: int = 7) -> dict:
+    """Times each benchmark: ``rounds`` timed rounds, per-call median and best in microseconds."""
+    results = {}
+    for name in names or BENCHMARKS:
+        step, setup, number = BENCHMARKS[name]()
+        if number is None:
+            number = _calibrate(step)
+
+        per_call = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                step()
+            per_call.append((time.perf_counter() - start) / number * 1e6)
+
+        results[name] = {"median_us": round(statistics.median(per_call), 3),
+                         "best_us": round(min(per_call), 3), "calls": number, "rounds": rounds}
+        print(f"{name:20} {results[name]['median_us']:12.2f} us   (best {results[name]['best_us']:.2f}, "
+              f"{number} calls x {rounds})")
+    return {"meta": _meta(), "results": results}
+
+
+def _calibrate(step) -> int:
+    """Calls per round so a round lasts about ROUND_SEC."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            step()
+        if time.perf_counter() - start >= ROUND_SEC / 10 or number >= 1 << 20:
+            return max(1, int(number * ROUND_SEC / max(time.perf_counter() - start, 1e-9)))
+        number *= 10
+
+
+def _meta() -> dict:
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "platform": platform.platform(terse=True),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Prints current against baseline; returns the names that got slower than threshold. Runs
+    are compared by their best round, the one least disturbed by the rest of the machine.
+    """
+    regressions = []
+    print(f"{'benchmark':20} {'baseline':>12} {'current':>12} {'change':>8}   (best us per call)")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:20} {'-':>12} {now['best_us']:12.2f}      new")
+            continue
+        change = now["best_us"] / before["best_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "   REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "   faster"
+        print(f"{name:20} {before['best_us']:12.2f} {now['best_us']:12.2f} {change:+8.1%}{flag}")
+
+    if baseline["meta"].get("machine") != current["meta"].get("machine") or \
+            baseline["meta"].get("python") != current["meta"].get("python"):
+        print(f"[WARN] baseline is from {baseline['meta'].get('python')} on {baseline['meta'].get('machine')}, "
+              f"this run {current['meta'].get('python')} on {current['meta'].get('machine')}")
+    return regressions
+
+
+def _load(path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(results: dict, path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless microbenchmarks of the game's hot paths, with JSON baselines.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="names of the benchmarks")
+
+    run_cmd = sub.add_parser("run", help="time the benchmarks, optionally saving the results as a baseline")
+    run_cmd.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    run_cmd.add_argument("--rounds", type=int, default=7)
+    run_cmd.add_argument("--save", nargs="?", const=str(BASELINE), metavar="PATH",
+                         help=f"write the results as JSON (default path {BASELINE})")
+    run_cmd.add_argument("--tk", action="store_true", help="also time _draw_board on a real Tk canvas (needs a display)")
+
+    cmp_cmd = sub.add_parser("compare", help="flag benchmarks slower than a baseline; exits 1 on a regression")
+    cmp_cmd.add_argument("baseline", nargs="?", default=str(BASELINE))
+    cmp_cmd.add_argument("current", nargs="?", help="results JSON to compare (default: run the benchmarks now)")
+    cmp_cmd.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, e.g. 0.1 for 10%%")
+    cmp_cmd.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(BENCHMARKS))
+        sys.exit(0)
+
+    if getattr(args, "tk", False):
+        BENCHMARKS["draw_board_tk"] = _draw_board_tk
+
+    if args.command == "run":
+        results = run(args.names, args.rounds)
+        if args.save:
+            _save(results, args.save)
+    else:
+        baseline = _load(args.baseline)
+        current = _load(args.current) if args.current else run([name for name in baseline["results"] if name in BENCHMARKS] or None, args.rounds)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
@@ -2,55 +2,147 @@ from pacman import Pacman
 from pickup import Pickup
 from enemy import Enemy
 from wall import Wall
+from level_template import LevelTemplate
+from enemy_batch import EnemyBatch
+from position_index import PositionIndex
+from snapshot import BoardSnapshot
+from itertools import chain
+from maze import load_maze, maze_path
+from direction_queue import DirectionQueue, RETRACT
+from time import perf_counter
+from threading import Lock
+from pathlib import Path
+import latency
+import telemetry
 
 _DEBUG = False
 
 class Board():
-    restricted_area = [(13,11), (13,16)]
+    restricted_area = frozenset()   # the maze's gates, (y, x) squares Pacman may not step down into
+    maze = None             # compiled Maze, loaded once per process (see compile_layout)
+    _layout = None          # its numeric layout
+    _layout_path = None     # the file both were loaded from
+    _compile_lock = Lock()  # compile_layout() runs on a startup worker and on the Tk thread
     
-    def __init__(self, width, height, images):
+    def __init__(self, width, height, images, directions = None, maze = None, ghosts_per_type = 1,
+                 batch_enemies = None, maze_file = None):
+        ''' maze is a compiled Maze (see maze.py / maze_generator.py) for this board only;
+            by default every board plays maze_file (static/mazes/classic.txt when None), loaded
+            by compile_layout() and shared with every board playing that file. ghosts_per_type
+            enemies start on each ghost spawn; with batch_enemies (the default when there is
+            more than one per type) their moves are decided together by an EnemyBatch. '''
         self._window_width = width
         self._window_height = height
         self.images = images
+        self.directions = directions if directions is not None else DirectionQueue()
+        self.maze_file = maze_file
+        if maze is not None:
+            self.maze = maze
+            self.restricted_area = maze.gates
 
         self.Gamestate = None
         self.pacman = None
-        self.enemies = set()
-        self.game_objects = set()
+        self.enemies = []
+        self.ghosts_per_type = ghosts_per_type
+        self.batch_enemies = ghosts_per_type > 1 if batch_enemies is None else batch_enemies
+        self._enemy_batch = None
+        self._positions = None      # PositionIndex of the characters, for collisions
         
         self.game_over = False
 
+        # compiled once per board (see _level_template); _level_cells is the current level's
+        # walls and uneaten pickups, which a respawn restores the Gamestate from
+        self._template = None
+        self._characters = None
+        self._level_cells = None
+        self._pickups_left = 0
+
+        # squares (y * width + x) of the pickups eaten this level, in order, and how many of
+        # them count; snapshots share this list, it is copied before a rewound game writes it
+        self._eaten = []
+        self._eaten_count = 0
+        self.ticks = 0              # updates since the game started
+
+        # latency tracking: id of the buffered turn, and turns accepted since the last draw
+        self._buffered_cid = None
+        self.accepted_moves = []
+
+        # the last tentative turn's ticket and Pacman's (direction, last_direction,
+        # next_direction, buffered id) before it, put back if that turn is retracted
+        # (see DirectionQueue.retract)
+        self._before_tentative = None
+
+        # when a dict, seconds spent per phase ('movement', 'pathfinding', 'collision')
+        # are added to it every update (see maze_generator.py bench)
+        self.tick_phases = None
+
+        # when set (frame-time overlay on, see frame_timing.py), every update records the
+        # time of _validate_movement, _validate_pacman_state, the enemies and _game_continuation
+        self.frame_timer = None
+
     # Level Functions #
     def new_level(self):
-        ''' Called when a new level is needed. Alters the Gamestate (which consist of numbers)
-            to consist of Pacman game objects. Then update_objects() is called to fill the
-            game_ojects set with all the objects that are on the board. And the initial location
-            of Pacman is set. '''
+        ''' Called when a new level is needed. The Gamestate is restored from the compiled
+            level template in one copy (walls and pickups are shared objects), and Pacman and
+            the enemies are reset to their spawn squares instead of being rebuilt. '''
         score, lives, level = self.current_stats()
-        self.refresh_objects(level)
-        
-        self.Gamestate = Board.create_board()
-        self.Gamestate = self._pacman_board( self.square_height(), self.square_width() )
-        
-        self.update_board()
+        template = self._level_template()
+
+        self._level_cells = template.copy_cells()
+        self._pickups_left = template.total_pickups
+        self._eaten, self._eaten_count = [], 0
+        self.Gamestate = [ row[:] for row in self._level_cells ]
+        self._reset_characters()
         
-        self.pacman = self.pacman_location()
         self.pacman.level_up(score, lives, level)
-        self.enemies = { e for e in self.game_objects if type(e) == Enemy }
-
-    def refresh_objects(self, level):
-        ''' This is to refresh the board and attributes of the game when a level
-            transitions to the next. '''
-        if level > 1:
-            self.enemies = set()
-            self.game_objects = set()
-        
+        telemetry.emit('level_start', level = self.pacman.level, score = self.pacman.score,
+                       lives = self.pacman.lives, ghosts = len(self.enemies))
+
+    def _level_template(self) -> LevelTemplate:
+        ''' Compiles the maze into its static objects the first time a level starts. '''
+        if self._template is None:
+            if self.maze is None:
+                self.Gamestate, self.maze = Board.compile_layout(self.maze_file)
+                self.restricted_area = self.maze.gates
+            else:
+                self.Gamestate = self.maze.layout()
+            self.images.set_tile_size( self.square_width(), self.square_height() )
+            self._template = LevelTemplate(self.Gamestate, self.images)
+            self._characters = self._template.create_characters(self.images, self.ghosts_per_type)
+            if self.batch_enemies:
+                self._enemy_batch = EnemyBatch(self.maze)
+            pacman, enemies = self._characters
+            self._positions = PositionIndex(self.maze.width, len(self.maze.cells), chain( (pacman,), enemies ))
+        return self._template
+
+    def _reset_characters(self):
+        ''' Puts Pacman and the enemies back on their spawn squares for a new level. '''
+        self.pacman, self.enemies = self._characters
+        self.pacman.reset(self.images)
+        self[self.pacman.y][self.pacman.x] = self.pacman
+
+        for enemy in self.enemies:
+            enemy.reset(self.images)
+            self[enemy.y][enemy.x] = enemy
+
+        self._positions.remember()
+        self._before_tentative = None
+
+    def reset_game(self):
+        ''' Resets the board in place for a brand new game (score 0, 3 lives, level 1),
+            reusing the compiled layout and the already loaded images. '''
+        self.Gamestate = None
+        self.game_over = False
+        self.ticks = 0
+        self._buffered_cid = None
+        self.accepted_moves.clear()
+        self.directions.clear()
+        self.new_level()
+
     def level_complete(self) -> bool:
-        ''' Returns true or false if the total pickups on the board is 0.
+        ''' Returns true or false if the total pickups left in the level is 0.
             If 0 the level is complete, otherwise the game is still going. '''
-        total_pickups = { p for p in self.game_objects if type(p) == Pickup }
-
-        return len(total_pickups) == 0
+        return self._pickups_left == 0
 
     def current_stats(self) -> tuple:
         # Game has already started and is transitioning to a new level
@@ -60,17 +152,34 @@ class Board():
             return Pacman.no_score, Pacman.three_lives, Pacman.level_one        # (0, 3, 1)
 
     def _game_continuation(self, y, x) -> None:
-        ''' Checks if Pacman is ongoing to an enemy, if so restarts the level due to death.
-            Otherwise, checks if the game is not over, and if so updates the board square.
+        ''' Resolves Pacman's collisions with the enemies, which restarts the level if he
+            died. Otherwise, checks if the game is not over, and if so updates the board square.
             Otherwise, Pacman's location become's None because the game is done. '''
-        
-        if self._validate_upcoming_enemy(y, x):
-            if not self.pacman.invulnerable:
-                self.check_for_gameover()
-
-        else:
+        if not self._resolve_collisions():
             self._continuous_gameplay(y, x)
 
+        elif self.game_over:
+            self[y][x] = None
+
+    def _resolve_collisions(self) -> bool:
+        ''' Finds every enemy meeting Pacman this update, on his square or passing through
+            him, in one pass over the characters (see PositionIndex) rather than by what the
+            Gamestate squares hold. Pacman eats the vulnerable ones; meeting any other costs
+            him a life, and True is returned. '''
+        self._positions.rebuild()
+        died = False
+
+        for enemy in self._positions.collisions(self.pacman):
+            if enemy.invulnerable:
+                died = True
+            else:
+                self.pacman.contact(enemy)
+                self.restore_enemy(enemy)
+
+        if died:
+            self.check_for_gameover()
+        return died
+
     def _continuous_gameplay(self, y, x):
         ''' While the game is not over, the board squares are updated accordingly. If
             self._game_over returns True, then Pacman's location is set to None to show
@@ -96,6 +205,8 @@ class Board():
             from the original spot. If Pacman is still alive, then the board is
             just updated with his new position. '''
         self.pacman.lose_life() # Pacman loses a life on death
+        telemetry.emit('death', level = self.pacman.level, lives = self.pacman.lives,
+                       score = self.pacman.score, tick = self.ticks)
         
         if not self.pacman.out_of_lives():
             self.restore_gamestate()
@@ -105,61 +216,81 @@ class Board():
 
     def _game_over(self):
         self.game_over = True
+        telemetry.emit('game_over', level = self.pacman.level, score = self.pacman.score, tick = self.ticks)
 
     def restore_enemies_previous_square(self, enemy):
-        ''' Restores a pickup that an enemy went over because the way the game is organized,
-            requires board updation, and an enemy overwrites a spot. Due to this, the enemy
-            must store a boolean if the spot it goes over has a pickup, and once the enemy
-            leaves the spot, the pick up is restored. '''
+        ''' Restores the square an enemy went over because the way the game is organized,
+            requires board updation, and an enemy overwrites a spot. Enemies never eat
+            pickups, so once the enemy leaves the spot it goes back to what the level's
+            cells hold there: the pickup if Pacman has not eaten it yet, otherwise None. '''
         if self.has_last_location(enemy):
             self._enemy_new_location(enemy)
                 
     def _enemy_new_location(self, enemy):
-        ''' Checks for the enemies new location, and whether it was a pickup. If not, then
-            the board is just replaced with None, otherwise it is replaced with the Pickup.'''
-        y, x = enemy.last_location
-
+        ''' Checks for the enemies new location, and if it has moved restores the square it left. '''
         if self.location_has_changed(enemy, enemy.last_location):
-            if enemy.pickup_memory is not None:
-                self.restore_pickup(enemy, y, x)
-
-            else:
-                self[y][x] = None
+            self.restore_square(*enemy.last_location)
     
     def restore_enemy(self, enemy):
         ''' This function restores the enemy by calling initial_position() to change
             the enemy's y and x to original values. Then the board is updated with
-            the enemy's starting location. '''
+            the enemy's starting location, and the square it died on is restored. '''
+        if self[enemy.y][enemy.x] is enemy:
+            self.restore_square(enemy.y, enemy.x)
         enemy.initial_position()
         self[enemy.y][enemy.x] = enemy
 
-        if enemy.pickup_memory is not None:
+        if self.has_last_location(enemy):
             last_y, last_x = enemy.last_location
-            self.restore_pickup(enemy, last_y, last_x)
-        
+            if self[last_y][last_x] is enemy:
+                self.restore_square(last_y, last_x)
 
-    def restore_pickup(self, enemy, y, x):
-        ''' Restores a pickup from an enemy's memory, given a y and x coordinate. This function
-            is called when an enemy dies, or an enemy moves locations. '''
-        self[y][x] = enemy.pickup_memory
-        enemy.discard_pickup()
+    def restore_square(self, y, x):
+        ''' Puts the level's own content (a pickup or nothing) back on a square a character left. '''
+        self[y][x] = self._level_cells[y][x]
     
     # Game Update Functions #
     def update_board(self):
-        ''' Updates the game_objects set to the objects that are inside the current Gamestate.
-            Also updates where the current location of Pacman is on the board. '''
-        self.game_objects = { objs for rows in self.Gamestate for objs in rows if objs is not None }
-        self.pacman = self.pacman_location()
+        ''' Runs one game update. Walls and pickups are shared flyweights, so there is no
+            per-update collection of the board's objects; Pacman and the enemies are kept
+            on the board itself. '''
         self._update_gamestate()
+        self.ticks += 1
 
     def _update_gamestate(self):
         ''' Updates the entire gamestate each time it is called. This function is in charge of
             all the character object's movement, and game states as the game progresses. '''
-        y, x = self.pacman.return_location()
-        self._validate_movement(y, x)                                # pacman's movement is validated from current spot, and then pacman has a new location
+        timed = self.tick_phases is not None
+        timer = self.frame_timer
+        since = lap = perf_counter() if timed or timer is not None else 0
+
+        self._validate_movement(*self.pacman.return_location())     # pacman's movement is validated from current spot, and then pacman has a new location
+        y, x = self.pacman.return_location()                         # (a portal may have moved him)
+        if timer is not None:
+            lap = timer.lap('movement', lap)
         self._validate_pacman_state()                                # validates if pacman picks up a boost
-        self._validate_enemy_movement(y, x)                         # enemies need to determine direction -> pacman's new location
+        if timed:
+            self._lap('movement', since)
+        if timer is not None:
+            lap = timer.lap('pacman_state', lap)
+
+        self._validate_enemy_movement()                              # enemies need to determine direction -> pacman's new location
+        if timer is not None:
+            lap = timer.lap('enemies', lap)
+
+        since = perf_counter() if timed else 0
         self._game_continuation(y, x)                                # checks for death, game over, and updates Pacman's previous board square
+        self._positions.remember()                                   # where everyone ends this update, for the next one's swaps
+        if timed:
+            self._lap('collision', since)
+        if timer is not None:
+            timer.lap('continuation', lap)
+
+    def _lap(self, phase, since) -> float:
+        ''' Adds the time since since to phase in tick_phases, and returns the current time. '''
+        now = perf_counter()
+        self.tick_phases[phase] = self.tick_phases.get(phase, 0.0) + now - since
+        return now
 
     def _update_board_square(self, y, x):
         ''' Updates the last spot that Pacman was in and makes it None, this is specifically
@@ -182,9 +313,12 @@ class Board():
                     
     def update_directions(self):
         ''' This function is what allows smoother movement when wanting to change Pacman's
-            direction. It checks if Pacman has queue'd another direction that wasn't possible
-            at the previous state, and if no other directions are hit in the mean time, then
-            that move is executed when a possible path is validated. '''
+            direction. The next requested turn is taken from the direction queue, then it checks
+            if Pacman has queue'd another direction that wasn't possible at the previous state,
+            and if no other directions are hit in the mean time, then that move is executed when
+            a possible path is validated. '''
+        since = perf_counter() if self.tick_phases is not None else 0
+        self._consume_directions()
         self.validate_upcoming_movement()
 
         self.pacman.last_location = self.pacman.return_location()
@@ -192,13 +326,77 @@ class Board():
         if self.validate_path( self.pacman.direction ):
             self.pacman.movement()
 
+        if self.tick_phases is not None:
+            self._lap('movement', since)
+
                 
+    def _consume_directions(self):
+        ''' Applies the oldest turn waiting in the direction queue, one per tick; later turns
+            stay queued for the following ticks. Retractions on the way, and turns that
+            change nothing (the way Pacman already heads, or the turn already buffered),
+            are applied without using up the tick, and a tentative turn whose retraction
+            is already waiting right behind it is dropped with it, so the game never sees it. '''
+        directions, pacman = self.directions, self.pacman
+        request = directions.pop()
+        while request is not None:
+            _, direction, cid, ticket = request
+            if direction is RETRACT:
+                self._retract_direction(ticket)
+            elif ticket is not None and directions.retraction_next(ticket):
+                directions.pop()
+            else:
+                if cid is not None and latency.tracker is not None:
+                    latency.tracker.mark(cid, 'dequeued')
+                unchanged = direction == pacman.next_direction or \
+                            (direction == pacman.direction and pacman.next_direction is None)
+                self._before_tentative = (ticket, (pacman.direction, pacman.last_direction, pacman.next_direction,
+                                                   self._buffered_cid)) if ticket is not None else None
+                self.request_direction(direction, cid)
+                if not unchanged:
+                    return
+            request = directions.pop()
+
+    def _retract_direction(self, ticket):
+        ''' Undoes the tentative turn with ticket if it is the last turn applied: Pacman heads
+            the way he did before it and his buffered turn is back. Squares already moved in
+            the meantime are kept. A retraction of any other turn is ignored. '''
+        if self._before_tentative is None or self._before_tentative[0] != ticket:
+            return
+        pacman = self.pacman
+        pacman.direction, pacman.last_direction, pacman.next_direction, self._buffered_cid = self._before_tentative[1]
+        self._before_tentative = None
+        pacman.direction_image(self.images)
+
+    def _direction_accepted(self, cid):
+        if cid is not None and latency.tracker is not None:
+            latency.tracker.mark(cid, 'accepted')
+            self.accepted_moves.append(cid)
+
+    def request_direction(self, direction, cid = None):
+        ''' Turns Pacman towards direction if that path is open. Otherwise the turn is
+            buffered in next_direction (the latest blocked turn wins) and taken by
+            validate_upcoming_movement() as soon as the path opens; a later turn that
+            is possible straight away discards the buffered one. '''
+        self.pacman.change_direction(direction)
+
+        if not self.validate_path(direction):
+            self.pacman.next_direction = direction
+            self.pacman.direction = self.pacman.last_direction
+            self._buffered_cid = cid
+
+        else:
+            self.pacman.direction_image(self.images)
+            self.pacman.next_direction = None
+            self._buffered_cid = None
+            self._direction_accepted(cid)
+
     def _update_board_for_respawn(self):
         ''' When pacman is respawning, Pacman and all the enemies are put in their
             original starting position. '''
         self._update_enemy_respawns()      
         self.pacman.respawn(self.images)
         self[self.pacman.y][self.pacman.x] = self.pacman
+        self._before_tentative = None
 
 
     def _update_enemy_respawns(self):
@@ -218,34 +416,22 @@ class Board():
 
 
     def _update_enemy_movement(self, enemy):
-        ''' Enemy has moved, and now restores pickup if the enemy last touched one.
-            Checks if the new location contains a pickup, and then if so stores
-            the memory of that pickup. Then the board is updated with the enemy. '''
+        ''' Enemy has moved, and now restores the square it left (see
+            restore_enemies_previous_square). Then the board is updated with the enemy. '''
         self.restore_enemies_previous_square(enemy)
-            
-        if type(self[enemy.y][enemy.x]) == Pickup:
-            enemy.pickup_memory = self[enemy.y][enemy.x]
-
         self[enemy.y][enemy.x] = enemy
 
     # Direction Validation Functions #
     def validate_path(self, direction) -> bool:
         ''' Ensures that the direction Pacman is attempting to go is not a
-            Wall object. If there is no wall in the next spot, returns True,
-            else returns False. '''
-        y, x = self.pacman.return_location()
-
-        if direction == 'Left':
-            return type(self[y][x - 1]) != Wall
+            Wall object (following portals) or down into a gate. If the next
+            spot is open, returns True, else returns False. '''
+        square = self.next_square( *self.pacman.return_location(), direction )
 
-        elif direction == 'Right':
-            return type(self[y][x + 1]) != Wall
+        if direction == 'Down' and square in self.restricted_area:
+            return False
 
-        elif direction == 'Down':
-            return type(self[y + 1][x]) != Wall and (y + 1, x) not in Board.restricted_area
-
-        elif direction == 'Up':
-            return type(self[y - 1][x]) != Wall
+        return square is not None
 
     def _validate_pacman_state(self):
         ''' Checks if Pacman is invulnerable, if he is then the special case
@@ -265,39 +451,30 @@ class Board():
                 self.pacman.boost_running_out()         
 
         
-    def _validate_upcoming_enemy(self, y, x) -> bool:
-        ''' If Pacman is facing a direction, this function returns
-            a boolean if there is an enemy directly in front of him,
-            which results in a death if True. '''
-        if self.within_bounds(x):
-            return self._validate_past_enemy()
-
-    def _validate_past_enemy(self):
-        ''' Validates if Pacman's last location is an enemy, since this is only possible if
-            they past right by each other. '''
-        if self.has_last_location(self.pacman):
-            dy, dx = self.pacman.last_location
-            return type(self[dy][dx]) == Enemy
-    
-    
-    def _validate_upcoming_enemy_in_square(self, game_object, previous_y, previous_x):
-        return type(game_object) == Pacman and type(self[previous_y][previous_x]) == Enemy and \
-               not game_object.invulnerable
-           
-    
     def _validate_movement(self, y, x):
         '''
-        Checks for the case that Pacman crosses to the other side via one side,
-        which are when x == 14 and y == 0 or 27. If this is the case, the pacman
-        object changes it's x and y with the crossed_boundary method. Otherwise the
-        Gamestate is updated regularly.
+        Checks for the case that Pacman stepped onto a portal square of the maze. If
+        this is the case, he comes out on the linked square (see _through_portal).
+        Otherwise the Gamestate is updated regularly.
         '''
-        if self.edge_crossing(y, x):
-            self.pacman.crossed_boundary()              # crossed_boundary changes Pacman's y, so must call pacman.y and pacman.x below
+        if self._through_portal(self.pacman):
             self[self.pacman.y][self.pacman.x] = self.pacman
 
         else:
-            self.pacman.contact( self[y][x] )
+            self.pacman.contact( self._level_cells[y][x] )      # enemies are met in _resolve_collisions
+            self._pickup_eaten(y, x)
+
+    def _pickup_eaten(self, y, x):
+        ''' Clears an eaten pickup from the level's cells too, so a respawn does not bring it
+            back, and counts it off the pickups left. '''
+        if type(self._level_cells[y][x]) == Pickup:
+            self._level_cells[y][x] = None
+            self._pickups_left -= 1
+
+            if self._eaten_count < len(self._eaten):          # playing on from a rewound snapshot
+                self._eaten = self._eaten[:self._eaten_count]
+            self._eaten.append(y * self.board_width() + x)
+            self._eaten_count += 1
 
     def validate_upcoming_movement(self):
         ''' This function handles the case where Pacman has an upcoming direction
@@ -308,44 +485,55 @@ class Board():
                 self.pacman.change_direction(self.pacman.next_direction)
                 self.pacman.next_direction = None
                 self.pacman.direction_image( self.images )
+                self._direction_accepted(self._buffered_cid)
+                self._buffered_cid = None
     
-    def _validate_enemy_movement(self, pacman_y, pacman_x):
+    def _validate_enemy_movement(self):
         ''' Iterates through all the enemies on the board, determines their direction
-            and then validates that direction checking if they have killed Pacman, and
-            automatically updates enemy positions. '''
+            and then updates their positions on the board. Whether they meet Pacman is
+            decided afterwards, for all of them at once (see _resolve_collisions). With many
+            ghosts the directions are decided for all of them at once too (see enemy_batch.py). '''
+        timed = self.tick_phases is not None
+
+        if self._enemy_batch is not None:
+            self._validate_enemy_batch(timed)
+            return
+
         for enemy in self.enemies:
+            since = perf_counter() if timed else 0
             enemy.determineDirection(self, self.pacman)
-            self._validate_enemy_position(enemy, pacman_y, pacman_x)
+            self._through_portal(enemy)
+            if timed:
+                since = self._lap('pathfinding', since)
 
-    def _validate_enemy_position(self, enemy, pacman_y, pacman_x):
-        ''' Checks if the position of the enemy is the same position as Pacman, if so then
-            calls the function check_for_gameover(). Else it's just going to update the
-            board with the enemy. '''
-        self._update_previous_board_square(enemy)
-        
-        if (enemy.y, enemy.x) == (pacman_y, pacman_x):
-            self._validate_enemy_death_or_kill(enemy)
-        
-        else:
             self._update_enemy_movement(enemy)
+            if timed:
+                self._lap('collision', since)
 
-    def _validate_enemy_death_or_kill(self, enemy):
-        ''' This function occurs after the enemy has the same coordinates as Pacman,
-            then decides if the enemy is invulnerable, calls the check_for_gameover()
-            function. Otherwise, pacman eats the enemy and the enemy respawns. '''
-        if enemy.invulnerable:
-            self.check_for_gameover()
-        else:
-            self.pacman.contact(enemy)
-            self.restore_enemy(enemy)       
-    
+    def _validate_enemy_batch(self, timed):
+        ''' Every enemy moves first, then each one goes through portals and is placed on
+            the board in turn. '''
+        since = perf_counter() if timed else 0
+        self._enemy_batch.determine_directions(self, self.enemies, self.pacman)
+
+        for enemy in self.enemies:
+            self._through_portal(enemy)
+        if timed:
+            since = self._lap('pathfinding', since)
+
+        for enemy in self.enemies:
+            self._update_enemy_movement(enemy)
+        if timed:
+            self._lap('collision', since)
 
     # Individual Game Object Settings #
     def pacman_location(self) -> Pacman:
         ''' Returns the Pacman object on the board. '''
-        for game_obj in self.game_objects:
-            if type(game_obj) == Pacman:
-                return game_obj
+        return self.pacman
+
+    def characters(self):
+        ''' Pacman, then every enemy. '''
+        return chain( (self.pacman,), self.enemies )
     
     def location_has_changed(self, game_object, last_location) -> bool:
         return (game_object.y, game_object.x) != last_location
@@ -354,22 +542,29 @@ class Board():
         ''' Returns True if the game object has a last location, otherwise False. '''
         return game_object.last_location is not None
     
-    def within_bounds(self, x) -> bool:
-        return x != self.board_width() - 1 and x != 0
-
-    def edge_crossing(self, y, x):
-        ''' When Pacman is on the 15th row and has a x of 0 or 27,
-            then he is at the specific edge of the board that allows
-            crossing from one side to another, if so return True. '''
-        return (y == 14 and x == 0) or (y == 14 and x == 27)
+    def next_square(self, y, x, direction):
+        ''' The (y, x) square a step in direction leads to, through portals, or None when
+            that is a wall or off the board. One lookup in the maze's neighbour table. '''
+        return self.maze.step(y, x, direction)
+
+    def _through_portal(self, character) -> bool:
+        ''' When the character stands on a portal square of the maze, moves him to the linked
+            square and returns True. A single lookup in the maze's portal table. '''
+        linked = self.maze.portals.get( (character.y, character.x) )
+        if linked is None:
+            return False
+
+        character.change_location(linked[1], linked[0])
+        return True
     
-    def square_height(self) -> float:
-        ''' Returns the height of each individual square in the level. '''
-        return self._window_height / len(self)
+    def square_height(self) -> int:
+        ''' Returns the height of each individual square in the level, snapped to whole
+            pixels so the canvas never has to draw at sub-pixel positions. '''
+        return self._window_height // len(self)
 
-    def square_width(self) -> float:
-        '' 'Returns the width of each individual square in the level. '''
-        return self._window_width / self.board_width()
+    def square_width(self) -> int:
+        ''' Returns the width of each individual square in the level, in whole pixels. '''
+        return self._window_width // self.board_width()
 
     def board_width(self) -> int:
         ''' Returns the width of the board, [0] as an index since all list inside are same length. '''
@@ -391,108 +586,81 @@ class Board():
 
     # Board Creation Functions #
     def restore_gamestate(self):
-        ''' This function is used when Pacman dies to restore a normal gamestate. Since
-            positions become all over the place for the characters, this will append None
-            for the character positions, because their positions are dealt with in seperate
-            functions. The gamestate is then equaled to this normalized gamestate. '''
-        saved_gamestate = []
-
-        for i in range(len(self)):
-            new_row = []
-            for j in range(len(self[i])):
-                
-                if type(self[i][j]) == Pacman:
-                    new_row.append(None)
-
-                elif type(self[i][j]) == Enemy:
-
-                    if self[i][j].pickup_memory is not None:
-                        new_row.append(self[i][j].pickup_memory)
-                        self[i][j].discard_pickup()
-                        
-                    else:
-                        new_row.append(None)
-                
-                else:
-                    new_row.append(self[i][j])
-
-            saved_gamestate.append(new_row)
-
-        self.Gamestate = saved_gamestate
-
-    def _pacman_board(self, height, width) -> [list]:
-        ''' Takes the board of numbers, and easily sets up the coordinates of each object,
-            as manually typing each object with their coordinates would take way too long. '''
-        game_board = []
-        
-        for i in range(len(self)):
-            game_row = []
-            for j in range(len(self[i])):
-                # 0
-                if self[i][j] == Wall.wall:
-                    game_row.append( Wall(j, i, self.images) )
-
-                # 1
-                elif self[i][j] == Pickup.pickup:
-                    game_row.append( Pickup(j, i, self.images) )
-
-                # 3
-                elif self[i][j] == Pickup.boostUp:
-                    game_row.append( Pickup(j, i, self.images, True) )
-
-                # 5, 6, 7, 8
-                elif self[i][j] == Enemy.inky or self[i][j] == Enemy.blinky or self[i][j] == Enemy.pinky or self[i][j] == Enemy.clyde:
-                    game_row.append( Enemy(j, i, self[i][j], self.images) )
-
-                # 9
-                elif self[i][j] == Pacman.pacman:
-                    game_row.append( Pacman(j, i, self.images) )
-
-                else:
-                    game_row.append( None )
-
-            game_board.append(game_row)
+        ''' This function is used when Pacman dies to restore a normal gamestate. Walls and
+            pickups do not change on a death, so only the squares the characters stand on go
+            back to the level's own content; the characters are placed again by
+            _update_board_for_respawn(). '''
+        for character in self.characters():
+            self.restore_square(character.y, character.x)
+
+    # Snapshot Functions #
+    def snapshot(self, with_rng = False) -> BoardSnapshot:
+        ''' The game state at this update, for rewinding, replay seeking or trying moves
+            ahead (see snapshot.py). Costs O(characters): the pickups are shared, not copied.
+            with_rng also saves the random state the enemies draw from. '''
+        return BoardSnapshot(self, with_rng)
+
+    def restore(self, snapshot):
+        ''' Puts the game back to snapshot (earlier or later). Only the squares of the pickups
+            eaten in between and of the characters are rewritten; a snapshot from another
+            level, or from a game that went another way after a rewind, rebuilds the pickups. '''
+        for character in self.characters():
+            self.restore_square(character.y, character.x)
+
+        if snapshot.eaten is self._eaten:
+            self._restore_pickups(snapshot.eaten_count)
+        else:
+            self._rebuild_pickups(snapshot.eaten, snapshot.eaten_count)
 
-        return game_board
+        self.ticks, self.game_over = snapshot.tick, snapshot.game_over
+        snapshot.restore_characters(self)
+        for enemy in self.enemies:
+            self[enemy.y][enemy.x] = enemy
+        self[self.pacman.y][self.pacman.x] = self.pacman
+        self._positions.remember()
+        self._before_tentative = None
+
+    def _restore_pickups(self, count):
+        ''' Puts back the pickups eaten after the first count, or eats again up to count. '''
+        width, template = self.board_width(), self._template.cells
+        for square in self._eaten[count:self._eaten_count]:
+            y, x = divmod(square, width)
+            self._level_cells[y][x] = self[y][x] = template[y][x]
+
+        for square in self._eaten[self._eaten_count:count]:
+            y, x = divmod(square, width)
+            self._level_cells[y][x] = self[y][x] = None
+
+        self._pickups_left += self._eaten_count - count
+        self._eaten_count = count
+
+    def _rebuild_pickups(self, eaten, count):
+        ''' The level's cells from the template, less the first count pickups of eaten. '''
+        width = self.board_width()
+        self._level_cells = self._template.copy_cells()
+        for square in eaten[:count]:
+            y, x = divmod(square, width)
+            self._level_cells[y][x] = None
+
+        self.Gamestate = [ row[:] for row in self._level_cells ]
+        self._eaten, self._eaten_count = eaten, count
+        self._pickups_left = self._template.total_pickups - count
 
     @classmethod
-    def create_board(self):
-        #Sets up the board with the numbers, that will represent the objects
-        new_board = \
-        [ [0 for i in range(28)],
-          ([0] + [1 for i in range(12)] + [0]) * 2,
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-          [0, 3, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 3, 0],
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0], # replace 9 with 1
-          [0] + [1 for i in range(26)] + [0],
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-          [0, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 1, 0],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, None, 0, 0, None, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, None, 0, 0, None, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, None, None, None, None, None, None, None, None, None, None, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, None, 0, None, 0, 0, 0, 0, None, 0, None, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, None, 0, None, None, None, None, None, None, 0, None, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [None, None, None, None, None, None, 1, 0, 0, None, 0, None, None, None, None, None, None, 0, None, 0, 0, 1, None, None, None, None, None, None],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, None, 0, None, 5, 6, 7, 8, None, 0, None, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          [None, None, None, None, None, 0, 1, 0, 0, None, 0, 0, 0, 0, 0, 0, 0, 0, None, 0, 0, 1, 0, None, None, None, None],
-          [None, None, None, None, None, 0, 1, 0, 0, None, None, None, None, None, None, None, None, None, None, 0, 0, 1, 0, None, None, None, None, None],
-          [None, None, None, None, None, 0, 1, 0, 0, None, 0, 0, 0, 0, 0, 0, 0, 0, None, 0, 0, 1, 0, None, None, None, None, None],
-          [0, 0, 0, 0, 0, 0, 1, 0, 0, None, 0, 0, 0, 0, 0, 0, 0, 0, None, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-          ([0] + [1 for i in range(12)] + [0]) * 2,
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-          [0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0],
-          [0, 3, 1, 1, 0, 0, 1, 1, 1, 1, 1, 1, 1, None, 9, 1, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 3, 0, 0],
-          [0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0],
-          [0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 0],
-          [0, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 1, 0],
-          [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
-          [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0],
-          [0] + [1 for i in range(26)] + [0],
-          [0 for i in range(28)]]
-        
-        
-        return new_board
+    def compile_layout(cls, path = None) -> tuple:
+        ''' Loads the maze (static/mazes/classic.txt unless another file is given, see maze.py)
+            and caches it and its numeric layout on the class; returns (layout, maze). Called
+            from a worker thread at startup so the first new_level() does not pay for it, and
+            locked, so a board starting meanwhile waits for that load instead of racing it.
+            A different file replaces the cache (boards keep the maze they started with); the
+            cached layout is only ever read (LevelTemplate compiles the objects from it). '''
+        path = Path(path) if path is not None else maze_path('classic')
+        with cls._compile_lock:
+            if cls._layout is None or cls._layout_path != path:
+                maze = load_maze(path)
+                cls.maze, cls.restricted_area = maze, maze.gates
+                cls._layout, cls._layout_path = maze.layout(), path
+            return cls._layout, cls.maze
 
 
     # ===== debug functions =====
@@ -537,6 +705,6 @@ class Board():
 
     def print_enemys_type_and_position(self, enemy):
         if enemy.enemy_type == 7:   
-            print(enemy.enemy_type, enemy.y, enemy.x, enemy.pickup_memory)
+            print(enemy.enemy_type, enemy.y, enemy.x, self._level_cells[enemy.y][enemy.x])
 
             print('-' * 50)
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional
+
+from balance_board import BalanceBoard, BleakTransport, keep_connected
+
+
+class BalanceBoardManager:
+    """
+    Runs any number of balance boards on a single background thread and asyncio loop.
+    One scan looks for every board that has not been found yet; each found board then
+    costs one BLE connection + subscription (a task on the shared loop), with the same
+    reconnect logic as a stand-alone BalanceBoard.
+
+    Boards built with a non-BLE transport (SimulatedTransport, ReplayTransport) are run
+    on the same loop, so several simulated players can share one thread too.
+    """
+
+    def __init__(
+        self,
+        char_uuid: str = "2a57",
+        scan_timeout: float = 10.0,
+        connect_timeout: float = 20,
+        reconnect_delay: float = 2.0,
+    ):
+        self.char_uuid = char_uuid
+        self.scan_timeout = scan_timeout
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+
+        self._boards: Dict[str, BalanceBoard] = {}
+        self._attached: set = set()                 # MACs that already have a task
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------ #
+    #                         Public API                           #
+    # ------------------------------------------------------------ #
+    def add_board(self, mac_address: str, **board_kwargs) -> BalanceBoard:
+        """
+        Register a board (keyword arguments go to BalanceBoard).  Safe to call before or
+        after ``start()``; do not call ``start()`` on the returned board yourself.
+        """
+        key = mac_address.lower()
+        with self._lock:
+            if key in self._boards:
+                return self._boards[key]
+            board = BalanceBoard(mac_address, self.char_uuid, **board_kwargs)
+            self._boards[key] = board
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return board
+
+    def board(self, mac_address: str) -> BalanceBoard:
+        return self._boards[mac_address.lower()]
+
+    def boards(self) -> List[BalanceBoard]:
+        with self._lock:
+            return list(self._boards.values())
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-board link statistics, keyed by MAC address."""
+        return {
+            board.mac_address: {
+                "connected":        board.is_connected(),
+                "packets_received": board.packets_received,
+                "packets_rejected": board.packets_rejected,
+                "disconnects":      board.disconnects,
+            }
+            for board in self.boards()
+        }
+
+    def start(self) -> None:
+        """Start the shared event loop in one background thread."""
+        ready = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._wake = asyncio.Event()
+            ready.set()
+            self._loop.run_until_complete(self._main())
+
+        threading.Thread(target=run, name="balance-boards", daemon=True).start()
+        ready.wait()
+
+    # ------------------------------------------------------------ #
+    #                         Event loop                           #
+    # ------------------------------------------------------------ #
+    async def _main(self) -> None:
+        while True:
+            self._wake.clear()
+            self._attach_transports()
+
+            missing = self._missing_ble_boards()
+            if missing:
+                from bleak.exc import BleakError
+                try:
+                    found = await self._scan(missing)
+                except (BleakError, asyncio.TimeoutError, OSError) as exc:
+                    # e.g. an unpowered adapter: keep the boards already attached, retry later
+                    print(f"[WARN] Scan failed: {exc} — retrying in {self.reconnect_delay:.0f} s")
+                    await asyncio.sleep(self.reconnect_delay)
+                    continue
+                for key, device in found.items():
+                    self._attach(key, keep_connected(
+                        self._boards[key], device, self.char_uuid,
+                        self.connect_timeout, self.reconnect_delay,
+                    ))
+                if len(found) < len(missing):
+                    print(f"[WARN] Not found yet: {', '.join(sorted(set(missing) - set(found)))}")
+                    await asyncio.sleep(self.reconnect_delay)
+                    continue
+
+            await self._wake.wait()             # until add_board() registers another
+
+    def _attach_transports(self) -> None:
+        """Boards with their own (simulated/replay) transport just run it on this loop."""
+        for key, board in self._boards_by_key():
+            if key not in self._attached and not isinstance(board.transport, BleakTransport):
+                self._attach(key, board.transport.run(board))
+
+    def _missing_ble_boards(self) -> List[str]:
+        return [
+            key for key, board in self._boards_by_key()
+            if key not in self._attached and isinstance(board.transport, BleakTransport)
+        ]
+
+    def _boards_by_key(self):
+        with self._lock:
+            return list(self._boards.items())
+
+    def _attach(self, key: str, coro) -> None:
+        self._attached.add(key)
+        self._tasks.append(self._loop.create_task(coro))
+
+    async def _scan(self, wanted: List[str]) -> dict:
+        """One scan for all wanted MACs; stops early once every one has advertised."""
+        from bleak import BleakScanner
+
+        found = {}
+        done = asyncio.Event()
+
+        def on_detect(device, _advertisement) -> None:
+            key = device.address.lower()
+            if key in wanted and key not in found:
+                found[key] = device
+                if len(found) == len(wanted):
+                    done.set()
+
+        print(f"[INFO] Scanning for {len(wanted)} balance board(s)…")
+        async with BleakScanner(detection_callback=on_detect):
+            try:
+                await asyncio.wait_for(done.wait(), self.scan_timeout)
+            except asyncio.TimeoutError:
+                pass
+        return found
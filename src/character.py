@@ -1,4 +1,7 @@
 class Character():
+    # No per-instance __dict__; subclasses list their own extra attributes
+    __slots__ = ('x', 'y', 'direction', 'speed', 'start_location', 'last_location',
+                 'invulnerable', '_image')
 
     def __init__(self, x, y, direction):
         ''' Initializes a character object with x and y coordinates and a direction.
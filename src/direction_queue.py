@@ -0,0 +1,147 @@
+import time
+from collections import deque
+from itertools import count
+from typing import Optional, Tuple
+
+RETRACT = None              # the direction of a retraction (see DirectionQueue.retract)
+
+
+class DirectionQueue:
+    """
+    Bounded queue of timestamped direction requests shared by every input source
+    (keyboard bindings on the Tk thread, the balance board on its BLE thread).
+    Board.update_directions takes at most one turn from it per tick, oldest first, and
+    leaves the rest for the following ticks, so each turn gets a tick of its own instead
+    of being overwritten by a later one made before the game moved.
+
+    Buffering: a request repeating the one queued last (a held key's autorepeat) is
+    not queued again, and turns that have waited longer than ``max_age`` seconds are
+    dropped when they come up, so a backlog never replays moves the player made long
+    ago.  Requests are stamped with time.monotonic() when pushed (replays included,
+    whose packets carry their recorded times), the clock ``pop`` compares against.
+
+    ``push`` only uses deque.append, which is atomic in CPython, so producers on any
+    thread never take a lock.  When full, the oldest request is discarded.
+
+    A turn pushed as ``tentative`` (a predicted lean, see BalanceBoard(predictive=True))
+    gets a ticket, and may be withdrawn with ``retract(ticket)``; the board then puts
+    Pacman's direction back as it was before that turn, unless another turn has been
+    requested since.  A retraction whose turn never reached the board (discarded from
+    the full queue, or stale) matches nothing and is ignored.
+    """
+
+    def __init__(self, maxlen: int = 8, max_age: float = 1.0):
+        self._queue = deque(maxlen=maxlen)
+        self.max_age = max_age
+        self._tickets = count(1)    # next() on itertools.count is atomic in CPython
+        self.enabled = True         # cleared during level transitions / game over
+
+    def push(self, direction: str, cid: Optional[int] = None, tentative: bool = False) -> Optional[int]:
+        """
+        ``cid`` is the latency-tracking correlation id of the move, if it is being measured.
+        Returns the ticket of a tentative turn (None for the others, or when not queued).
+        """
+        if not self.enabled or direction is None:
+            return None
+        try:
+            last = self._queue[-1]
+        except IndexError:
+            last = None
+        if last is not None and last[1] == direction and not tentative and last[3] is None:
+            return None             # autorepeat of the turn still waiting
+        ticket = next(self._tickets) if tentative else None
+        self._queue.append((time.monotonic(), direction, cid, ticket))
+        return ticket
+
+    def retract(self, ticket: Optional[int]) -> None:
+        """Withdraws the tentative turn with ``ticket``: a request whose direction is RETRACT."""
+        if self.enabled and ticket is not None:
+            self._queue.append((time.monotonic(), RETRACT, None, ticket))
+
+    def pop(self) -> Optional[Tuple[float, Optional[str], Optional[int], Optional[int]]]:
+        """
+        Oldest (timestamp, direction, cid, ticket) request that is not stale, or None.
+        ticket is a tentative turn's, or for a retraction that of the turn it withdraws.
+        """
+        queue, oldest = self._queue, time.monotonic() - self.max_age
+        while True:
+            try:
+                request = queue.popleft()
+            except IndexError:
+                return None
+            if request[0] >= oldest or request[1] is RETRACT:
+                return request
+
+    def retraction_next(self, ticket: int) -> bool:
+        """True when the oldest request is the retraction of ``ticket``."""
+        try:
+            request = self._queue[0]
+        except IndexError:
+            return False
+        return request[1] is RETRACT and request[3] == ticket
+
+    def clear(self) -> None:
+        self._queue.clear()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+def _check() -> bool:
+    """
+    Headless checks of the buffering, on a real Board: a turn queued behind a held key's
+    autorepeats is applied on the next tick, and a turn older than max_age is dropped.
+    """
+    from board import Board
+    from gameImage import HeadlessImages
+
+    def requested(board) -> set:
+        return {board.pacman.direction, board.pacman.next_direction}
+
+    results = {}
+    board = Board(1280, 720, HeadlessImages())
+    board.new_level()
+    held = board.pacman.direction
+    for _ in range(12):                         # ~0.4 s of autorepeat on the key Pacman heads
+        board.directions.push(held)
+    turn = "Up" if held != "Up" else "Down"
+    board.directions.push(turn)
+    board.update_directions()
+    results["turn behind held-key repeats, next tick"] = turn in requested(board)
+
+    board.reset_game()
+    other = "Right" if held != "Right" else "Left"
+    for _ in range(12):                         # held on a key that is a real turn: it gets one tick
+        board.directions.push(other)
+    board.directions.push(turn)
+    board.update_directions()
+    board.update_directions()
+    results["turn behind a held turn, the tick after it"] = turn in requested(board)
+
+    board.reset_game()
+    queue = board.directions
+    queue.push(turn, tentative=True)            # a prediction the lean confirmed: never retracted
+    board.update_directions()
+    kept = board.pacman.direction, board.pacman.next_direction, board.pacman.last_direction
+    ticket = queue.push(other, tentative=True)
+    queue._queue.pop()                          # discarded, as from a full queue
+    queue.retract(ticket)
+    board.update_directions()
+    results["retraction of a discarded turn ignored"] = \
+        (board.pacman.direction, board.pacman.next_direction, board.pacman.last_direction) == kept
+
+    board.reset_game()
+    board.directions.max_age = 0.01
+    board.directions.push(turn)
+    time.sleep(0.02)
+    board.update_directions()
+    results["stale turn dropped"] = turn not in requested(board) and len(board.directions) == 0
+
+    for name, passed in results.items():
+        print(f"{name:45} {'ok' if passed else 'FAILED'}")
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if _check() else 1)
@@ -1,7 +1,6 @@
 from character import Character
 from wall import Wall
 import pacman
-from collections import deque
 from random import random
 
 class Enemy(Character):
@@ -9,6 +8,7 @@ class Enemy(Character):
     blinky = 6
     pinky  = 7
     clyde  = 8
+    __slots__ = ('enemy_type', 'slowed_down', 'movement_turns', 'last_choice')
     
     def __init__(self, x, y, enemy_type, images, direction = None):
         ''' Initializes an Enemy class that inherits from the Character Class. The enemy class
@@ -20,47 +20,44 @@ class Enemy(Character):
         self.invulnerable = True
         self.slowed_down = False
         self.determine_image(enemy_type, images)
-        self.pickup_memory = None
 
         if enemy_type == Enemy.inky or enemy_type == Enemy.clyde: # Only Inky and Clyde require these Attributes
             self.movement_turns = 15
             self.last_choice = None
 
-        
-    def discard_pickup(self) -> None:
-        ''' This function is called when an enemy was holding a pickup and then discards
-            it, and is used as memory. '''
-        self.pickup_memory = None
-        
+    def reset(self, images) -> None:
+        ''' Puts the enemy back in its spawn state for a new level, so the same object is
+            reused instead of building a new one each level. '''
+        self.initial_position()
+        self.direction = None
+        self.last_location = None
+        self.invulnerable = True
+        self.slowed_down = False
+
+        if self.enemy_type == Enemy.inky or self.enemy_type == Enemy.clyde:
+            self.movement_turns = 15
+            self.last_choice = None
+
+        self.determine_image(self.enemy_type, images)
+
     def determine_image(self, enemy_type, images) -> None:
         ''' Image display to player is determined by which type of enemy it is. If the enemy
             is not invulnerable, then they all have the same common vulnerable ghost image. '''
         if self.invulnerable:
             if enemy_type == Enemy.inky:
-                self._image = images.return_image('inky')
+                self._image = images.return_sprite('inky')
 
             elif enemy_type == Enemy.blinky:
-                self._image = images.return_image('blinky')
+                self._image = images.return_sprite('blinky')
 
             elif enemy_type == Enemy.pinky:
-                self._image = images.return_image('pinky')
+                self._image = images.return_sprite('pinky')
 
             elif enemy_type == Enemy.clyde:
-                self._image = images.return_image('clyde')
+                self._image = images.return_sprite('clyde')
                 
         else:
-            self._image = images.return_image('vulnerable_ghost')
-
-    def determine_path(self, board, start, endpoint_y, endpoint_x) -> deque:
-        ''' Path is towards endpoint destination if the enemy is invulnerable (the normal case).
-            Otherwise, the enemy needs to retreat towards the starting location. '''
-
-        if self.invulnerable:
-            return self.breadth_first_search(board, start, endpoint_y, endpoint_x)
-
-        else:
-            return self.breadth_first_search(board, start, self.start_location[1], self.start_location[0])[:-1]
-
+            self._image = images.return_sprite('vulnerable_ghost')
 
     def determineDirection(self, board, pacman) -> None:
         ''' Direction is determined by the enemy type. Since each enemy type
@@ -82,8 +79,7 @@ class Enemy(Character):
     # Inky Movement Functions #
     def blinky_movement(self, board, start, pacman) -> None:
         ''' Blinky's movement is to directly chase Pacman on the board. '''
-        path = self.determine_path(board, start, pacman.y, pacman.x)
-        self.path_finding_direction(path)
+        self._chase(board, start, pacman.y, pacman.x)
 
     # Blinky Movement Functions #
     def inky_movement(self, board, start, pacman) -> None:
@@ -108,9 +104,7 @@ class Enemy(Character):
         ''' Pinky's movement is meant to ambush, so we have the entire pacman object
             so that are we able to look at his direction and coordinates. '''
         endpoint_y, endpoint_x = self.pinky_endpoints(board, pacman)
-        path = self.determine_path(board, start, endpoint_y, endpoint_x)
-
-        self.path_finding_direction(path)
+        self._chase(board, start, endpoint_y, endpoint_x)
 
 
     def pinky_endpoints(self, board, pacman) -> tuple:
@@ -229,19 +223,7 @@ class Enemy(Character):
         ''' Validates if the direction on the board will bump them into a wall.
             If it is not a wall, it returns true and is a valid direction, otherwise
             returns false. '''
-        y, x = self.return_location()
-        
-        if self.direction == 'Left':
-            return type(board[y][x - 1]) != Wall
-
-        elif self.direction == 'Right': 
-            return type(board[y][x + 1]) != Wall
-
-        elif self.direction == 'Down':
-            return type(board[y + 1][x]) != Wall
-
-        elif self.direction == 'Up':
-            return type(board[y - 1][x]) != Wall
+        return board.next_square(self.y, self.x, self.direction) is not None
 
     def random_choice(self) -> int or float:
         ''' Inky and clyde have unstable movement, but the movement choices occur every 15 updates.
@@ -276,69 +258,57 @@ class Enemy(Character):
             self.slowed_down = True
     
     # Pathfinding Functions #
-    def path_finding_direction(self, path):
-        ''' This function is what changes the direction depending on the next location
-            the enemy needs to go. Only one case will follow each time and then once that
-            direction is set, the location is saved, and movement() is called to move the
-            enemy. '''
-        if self.not_empty_path( path ):
-            distance = self._path_length(path)
-
-            if self.y < path[distance][1]:
-                self.direction = 'Down'
-
-            elif self.y > path[distance][1]:
-                self.direction = 'Up'
-
-            elif self.x < path[distance][0]:
-                self.direction = 'Right'
-
-            elif self.x > path[distance][0]:
-                self.direction = 'Left'
-
-            self.enemy_moved()
-    
-    def breadth_first_search(self, board, start, endpoint_y, endpoint_x) -> deque:
+    def breadth_first_search(self, board, start, endpoint_y, endpoint_x) -> list:
         ''' The bfs algorithm is required in order to transverse through the
             2d board and find the quickest path that leads directly to the endpoint
-            locations. '''
-        queue = deque([[start]])
-        seen = set([start])
-        gamestate = board.Gamestate
-
-
-        while queue:
-            path = queue.popleft()
-            x, y = path[-1]
-
-            if (y, x) == (endpoint_y, endpoint_x):
-                return path
-
-            for x2, y2 in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
-                if self.wanted_path_indexes(board, gamestate, seen, x2, y2):
-                    queue.append(path + [(x2, y2)])
-                    seen.add((x2, y2))
-
-    def wanted_path_indexes(self, board, gamestate, seen, x, y) -> bool:
-        ''' To be a wanted index, x and y have to be within the board boundaries.
-            The position of y, x on the board also can not be a wall, since we need
-            a valid path. And (x, y) can not be duplicated, so must not be in the set seen. '''
-        return 0 <= x < board.board_width() and \
-               0 <= y < len(board) and \
-               type(gamestate[y][x]) != Wall and \
-               (x, y) not in seen
-
-    def _path_length(self, path) -> int:
-        ''' This function is a helper function to avoid index errors depending on
-            how large the path is. If the path is larger than 1, we can just get
-            the [1] index of the list for the next location. Otherwise, if it is
-            only 1, we do [0] since a list of length 1 only has that index value. '''
-        if len(path) > 1:
-            return 1
+            locations. The search itself is the maze's (see Maze.search), which reuses its
+            buffers; only the path returned, [(x, y), ...] from start, is built here. '''
+        width = board.maze.width
+        origin = start[1] * width + start[0]
+        goal = endpoint_y * width + endpoint_x
+        parents = board.maze.search(origin, goal)
+        if parents is None:
+            return None
+
+        path, square = [], goal
+        while True:
+            y, x = divmod(square, width)
+            path.append((x, y))
+            if square == origin:
+                break
+            square = parents[square]
+        path.reverse()
+        return path
+
+    def _chase(self, board, start, endpoint_y, endpoint_x) -> None:
+        ''' Moves one square along the shortest path towards the endpoint, or back towards
+            the spawn square when the enemy is not invulnerable (retreating, it stops one
+            square short of it). The path is never built: the search's parent array is
+            walked back from the goal to find the square after start and how long the path
+            is. Allocates nothing per update. '''
+        maze = board.maze
+        width = maze.width
+        origin = start[1] * width + start[0]
+        if self.invulnerable:
+            goal = endpoint_y * width + endpoint_x
         else:
-            return 0
-
-
-    def not_empty_path(self, path) -> bool:
-        ''' Returns a boolean if the path is not empty. '''
-        return path is not None and path != []
+            goal = self.start_location[1] * width + self.start_location[0]
+
+        parents = maze.search(origin, goal)
+        if parents is None:
+            return
+
+        steps, square, after = 0, goal, goal
+        while square != origin:
+            after, square = square, parents[square]
+            steps += 1
+        length = steps + 1 if self.invulnerable else steps     # retreating paths stop one short
+
+        if length == 0:
+            return
+        if length > 1:
+            next_y, next_x = divmod(after, width)
+            direction = maze.direction_to(self.y, self.x, next_y, next_x)
+            if direction is not None:
+                self.direction = direction
+        self.enemy_moved()
@@ -0,0 +1,190 @@
+import pacman           # before enemy, the two modules import each other
+from enemy import Enemy
+from maze import DIRECTIONS
+from array import array
+
+
+NONE = -1               # no target: the enemy moves at random this update
+
+
+class EnemyBatch():
+    ''' Decides every enemy's move for one update in batches, for boards with many ghosts
+        (see Board(ghosts_per_type=...)). Behaviour follows Enemy.determineDirection:
+
+        - chasers (Blinky, Pinky, Inky in Blinky or Pinky mode, and every retreating ghost)
+          are grouped by the square they head for, and each group shares one distance field
+          (Maze.distances_to) instead of one breadth-first search per ghost. A ghost takes the
+          neighbour one step closer, the first in right, left, down, up order on a tie.
+        - random movers (Clyde, and Inky in Clyde mode) draw their choice as before and are
+          checked against the maze's neighbour table.
+
+        A ghost already on its target, or that can not reach it, stays where it is.
+
+        The enemies' targets, squares and groups (chained by index, in place of a list per
+        target) and the distance fields (a pool of int arrays) are kept from one update to
+        the next, so an update allocates next to nothing however many ghosts there are. '''
+
+    # random_direction()'s quarters, as slots of the neighbour table (right, left, down, up)
+    _random_slots = (DIRECTIONS.index('Left'), DIRECTIONS.index('Right'),
+                     DIRECTIONS.index('Down'), DIRECTIONS.index('Up'))
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.fields = 0         # distance fields computed during the last update
+        self._targets = []              # per enemy: target square index, or NONE
+        self._cells = []                # per enemy: square index at the start of the update
+        self._next = []                 # per enemy: the next enemy with the same target, or NONE
+        self._groups = {}               # target square index -> first enemy heading there, this update
+        self._pool = []                 # distance field arrays, reused
+
+    def determine_directions(self, board, enemies, pacman) -> None:
+        ''' Moves every enemy in enemies for this update, like calling determineDirection()
+            on each of them. Portals and collisions are left to the board. '''
+        width, count = self.maze.width, len(enemies)
+        if len(self._targets) != count:
+            self._targets = [NONE] * count
+            self._cells = [NONE] * count
+            self._next = [NONE] * count
+        targets, cells, following, groups = self._targets, self._cells, self._next, self._groups
+
+        groups.clear()
+        for i, enemy in enumerate(enemies):     # in order: _target() draws Inky's choice
+            target = self._target(board, enemy, pacman)
+            cells[i] = enemy.y * width + enemy.x
+            if target is None:
+                targets[i] = NONE
+                continue
+            target = targets[i] = target[0] * width + target[1]
+            following[i] = groups.get(target, NONE)
+            groups[target] = i
+
+        neighbours = self.maze.neighbours
+        for index, (target, i) in enumerate(groups.items()):
+            distances = self._field(target, i, index)
+            while i != NONE:            # one step along the field, for each enemy of the group
+                enemy, cell = enemies[i], cells[i]
+                i = following[i]
+                distance = closer = distances[cell] - 1
+                if not enemy.invulnerable:
+                    distance -= 1           # retreating ghosts stop one square short, as Enemy._chase()
+                if distance < 0:
+                    continue                # on its target, or can not reach it
+                for d in range(4):          # right, left, down, up
+                    n = neighbours[cell * 4 + d]
+                    if n >= 0 and distances[n] == closer:
+                        enemy.direction = DIRECTIONS[d]
+                        enemy.enemy_moved()
+                        break
+        self.fields = len(groups)
+
+        self._random_moves(enemies)
+
+    def _target(self, board, enemy, pacman):
+        ''' The (y, x) square the enemy heads for this update, or None when it moves at
+            random. Inky's choice is drawn here, once per update, as in inky_movement(). '''
+        enemy_type = enemy.enemy_type
+        behaviour = enemy_type
+
+        if enemy_type == Enemy.inky:
+            choice = enemy.random_choice()
+            enemy._inky_and_clyde_movement_turns()
+            behaviour = Enemy.blinky if choice <= .33 else Enemy.clyde if choice <= .75 else Enemy.pinky
+
+        if behaviour == Enemy.clyde:
+            return None
+
+        if not enemy.invulnerable:          # retreating: back towards its spawn square
+            return enemy.start_location[1], enemy.start_location[0]
+
+        if behaviour == Enemy.pinky:
+            endpoints = enemy.pinky_endpoints(board, pacman)
+            if endpoints is not None:
+                return endpoints
+
+        return pacman.y, pacman.x
+
+    def _field(self, target, first, index) -> array:
+        ''' The distance field towards target, searched only as far as every enemy of the
+            group starting at first, into the pool's index-th array. '''
+        pool, maze = self._pool, self.maze
+        if index == len(pool):
+            pool.append(array('i', bytes(4 * len(maze.cells))))
+        return maze.distances_to(*divmod(target, maze.width), goals = self._group_cells(first),
+                                 out = pool[index])
+
+    def _group_cells(self, i):
+        cells, following = self._cells, self._next
+        while i != NONE:
+            yield cells[i]
+            i = following[i]
+
+    def _random_moves(self, enemies) -> None:
+        ''' clyde_movement() for every enemy without a target, with the steps looked up in
+            the neighbour table. The choices are drawn per enemy (they last 15 updates). '''
+        targets, cells, neighbours = self._targets, self._cells, self.maze.neighbours
+        quarters = self._random_slots
+
+        for i, enemy in enumerate(enemies):
+            if targets[i] != NONE:
+                continue
+            choice = enemy.random_choice()
+            enemy._inky_and_clyde_movement_turns()
+            slot = quarters[0] if choice <= .25 else quarters[1] if choice <= .50 else \
+                   quarters[2] if choice <= .75 else quarters[3]
+
+            enemy.direction = DIRECTIONS[slot]
+            if neighbours[cells[i] * 4 + slot] >= 0:
+                enemy.enemy_moved()
+            else:
+                enemy.clydes_wrong_direction()
+
+
+def _benchmark(counts, ticks, budget_ms, sequential_limit, seed) -> None:
+    ''' Headless games with growing numbers of ghosts: milliseconds per update, enemies
+        updated one by one (determineDirection) and in batches. '''
+    import random
+    import time
+    from board import Board
+    from gameImage import HeadlessImages
+
+    def tick_ms(per_type, batch):
+        random.seed(seed)
+        board = Board(1280, 720, HeadlessImages(), ghosts_per_type=per_type, batch_enemies=batch)
+        board.new_level()
+        rng = random.Random(seed)
+
+        start = time.perf_counter()
+        for tick in range(ticks):
+            if tick % 5 == 0:
+                board.directions.push(rng.choice(('Left', 'Right', 'Up', 'Down')))
+            board.update_directions()
+            board.update_board()
+
+            if board.game_over:
+                board.reset_game()
+            elif board.level_complete():
+                board.new_level()
+            elif board.pacman.is_respawning:
+                board.pacman.is_respawning = False
+        return (time.perf_counter() - start) / ticks * 1e3, len(board.enemies)
+
+    print(f"{'ghosts':>7} {'sequential':>11} {'batched':>9}   (ms/tick, frame budget {budget_ms} ms)")
+    for per_type in counts:
+        batched, ghosts = tick_ms(per_type, True)
+        sequential = f'{tick_ms(per_type, False)[0]:11.2f}' if ghosts <= sequential_limit else f"{'-':>11}"
+        over = '   over budget' if batched > budget_ms else ''
+        print(f'{ghosts:7d} {sequential} {batched:9.2f}{over}')
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Tick time against ghost count, sequential and batched enemy updates.')
+    parser.add_argument('per_type', type=int, nargs='*', default=[1, 4, 16, 64, 128, 256, 512],
+                        help='ghosts per type (the maze has four spawns)')
+    parser.add_argument('--ticks', type=int, default=100)
+    parser.add_argument('--budget-ms', type=float, default=16.7)
+    parser.add_argument('--sequential-limit', type=int, default=256,
+                        help='skip one-by-one updates above this many ghosts (they take seconds)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    _benchmark(args.per_type, args.ticks, args.budget_ms, args.sequential_limit, args.seed)
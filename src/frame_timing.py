@@ -0,0 +1,68 @@
+from array import array
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+# In drawing order: the window's phases around Board.update_board()'s own sub-phases
+PHASES = ("lateness", "directions", "movement", "pacman_state", "enemies", "continuation",
+          "completion", "draw", "frame")
+
+
+class FrameTimer:
+    """
+    Per-phase durations of the last ``capacity`` game updates, in preallocated ring buffers
+    (one array of doubles per phase), for the frame-time overlay. Recording is an index
+    store; percentiles are only worked out when the overlay asks for them. Nothing uses
+    this while the overlay and telemetry are off (Window.frame_timer and Board.frame_timer
+    are None); with telemetry on, Window logs summary() every ``capacity`` updates.
+    """
+
+    def __init__(self, capacity: int = 240):
+        self.capacity = capacity
+        self._rings: Dict[str, array] = {phase: array("d", bytes(8 * capacity)) for phase in PHASES}
+        self._counts: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self._expected: Optional[float] = None      # when the next update was due (perf_counter)
+
+    @property
+    def frames(self) -> int:
+        """Updates timed so far."""
+        return self._counts["frame"]
+
+    def record(self, phase: str, seconds: float) -> None:
+        count = self._counts[phase]
+        self._rings[phase][count % self.capacity] = seconds
+        self._counts[phase] = count + 1
+
+    def lap(self, phase: str, since: float) -> float:
+        """Records the time since ``since`` under phase; returns now, the start of the next phase."""
+        now = perf_counter()
+        self.record(phase, now - since)
+        return now
+
+    def expect(self, delay_ms: int) -> None:
+        """The next update was just scheduled ``delay_ms`` from now."""
+        self._expected = perf_counter() + delay_ms / 1000
+
+    def frame_started(self) -> float:
+        """Records how late this update ran against its schedule (when known); returns now."""
+        now = perf_counter()
+        if self._expected is not None:
+            self.record("lateness", max(0.0, now - self._expected))
+            self._expected = None
+        return now
+
+    def summary(self) -> List[Tuple[str, float, float, float]]:
+        """(phase, p50, p95, max) in milliseconds, for every phase recorded so far."""
+        rows = []
+        for phase in PHASES:
+            filled = min(self._counts[phase], self.capacity)
+            if not filled:
+                continue
+            samples = sorted(self._rings[phase][:filled])
+            rows.append((phase, samples[filled // 2] * 1e3,
+                         samples[min(filled - 1, int(filled * 0.95))] * 1e3, samples[-1] * 1e3))
+        return rows
+
+    def report(self) -> str:
+        lines = [f"{'phase':13}{'p50':>7}{'p95':>7}{'max':>7}  ms"]
+        lines += [f"{phase:13}{p50:7.2f}{p95:7.2f}{peak:7.2f}" for phase, p50, p95, peak in self.summary()]
+        return "\n".join(lines)
@@ -1,30 +1,163 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from PIL import Image
 from PIL.ImageTk import PhotoImage
+from sprite_atlas import load_atlas
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif"}
+
+# Images drawn inside a board tile. Their files are drawn for a tile SPRITE_DESIGN_TILE
+# pixels high; every other image (loading screen, countdown, ...) is shown at native size.
+SPRITES = ("pacmanL", "pacmanR", "pacmanU", "pacmanD",
+           "blinky", "pinky", "inky", "clyde", "vulnerable_ghost",
+           "pickup", "boost")
+SPRITE_DESIGN_TILE = 23
+SCALED_CACHE_SIZE = 64
+
+# Full-screen images: decoded on first use (or when prefetched) instead of at startup.
+# The transient ones are rarely shown and are released again once off screen.
+OVERLAYS = ("loading_screen", "over", "game_paused", "one", "two", "three")
+TRANSIENT_OVERLAYS = ("loading_screen", "over", "game_paused")
+
+_decoder = None
+
+
+def _decoder_pool() -> ThreadPoolExecutor:
+    global _decoder
+    if _decoder is None:
+        _decoder = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-decode")
+    return _decoder
+
+
+def _decode_file(path: Path) -> Image.Image:
+    image = Image.open(path)
+    image.load()                                 # force the decode now, not on first use
+    return image
+
+
+def _image_paths() -> dict:
+    return { p.stem: p for p in images_dir().iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS }
+
+
+def images_dir() -> Path:
+    """
+    The images folder is assumed to live under the project root at 'static/images',
+    alongside your 'src' folder.
+    """
+    # Locate this file (e.g. src/gameImage.py or wherever you put this)
+    this_file = Path(__file__).resolve()
+    src_dir    = this_file.parent           # e.g. .../your_project/src
+    project_root = src_dir.parent           # e.g. .../your_project
+
+    # static/images under the project root
+    path = project_root / "static" / "images"
+    if not path.is_dir():
+        raise FileNotFoundError(f"Could not find images folder at {path}")
+    return path
+
 
 class GameImage:
-    def __init__(self):
+    def __init__(self, decoded: dict = None):
         """
         Initializes a game image object that holds all of the images for the game.
-        The images folder is assumed to live under the project root at 'static/images',
-        alongside your 'src' folder.
-        """
-        # Locate this file (e.g. src/balance_board.py or wherever you put this)
-        this_file = Path(__file__).resolve()
-        src_dir    = this_file.parent           # e.g. .../your_project/src
-        project_root = src_dir.parent           # e.g. .../your_project
-
-        # static/images under the project root
-        images_dir = project_root / "static" / "images"
-        if not images_dir.is_dir():
-            raise FileNotFoundError(f"Could not find images folder at {images_dir}")
-
-        # Load all common image extensions
-        self.game_images = {}
-        for img_path in images_dir.iterdir():
-            if img_path.suffix.lower() in {".png", ".jpg", ".jpeg", ".gif"}:
-                key = img_path.stem  # filename without extension
-                # PhotoImage expects a string path
-                self.game_images[key] = PhotoImage(file=str(img_path))
+        ``decoded`` is the result of GameImage.decode() when the files were already
+        read and decoded off the Tk thread; only the PhotoImage conversion happens here.
+        Overlays are not part of it: they are decoded on the pool when prefetched, or
+        on first use.
+        """
+        if decoded is None:
+            decoded = GameImage.decode()
+        self._sources = decoded
+        self._paths = _image_paths()
+
+        # PhotoImage needs the Tk root, so this part must run on the Tk thread
+        self.game_images = { key: PhotoImage(image) for key, image in decoded.items() }
+        self._pending = {}                  # overlay name -> Future of its decoded image
+        self._transient_loaded = False
+
+        # sprites resampled for the current tile size, LRU-bounded, keyed by (name, size)
+        self._tile_size = None
+        self._scaled = OrderedDict()
+
+        # every level starts with the countdown, so have it decoding already
+        self.prefetch("three", "two", "one")
+
+    @staticmethod
+    def decode() -> dict:
+        """
+        Decodes every image except the overlays into a PIL image, keyed by filename without
+        extension. The sprites come from the prebuilt atlas (one file read) when it exists
+        (see sprite_atlas.py); anything else is decoded on the thread pool. Touches no Tk
+        state, so it is safe to run in a worker thread.
+        """
+        paths = _image_paths()
+        decoded = load_atlas(images_dir(), [name for name in SPRITES if name in paths]) or {}
+
+        remaining = [path for name, path in paths.items() if name not in decoded and name not in OVERLAYS]
+        decoded.update(zip((p.stem for p in remaining), _decoder_pool().map(_decode_file, remaining)))
+        return decoded
+
+    def prefetch(self, *names) -> None:
+        """ Starts decoding lazily loaded images in the background, ahead of their first use. """
+        for name in names:
+            if name not in self.game_images and name not in self._pending and name in self._paths:
+                self._pending[name] = _decoder_pool().submit(_decode_file, self._paths[name])
+
+    def release_transient(self) -> None:
+        """
+        Frees the rarely shown overlays once they are off screen (the canvas was cleared),
+        they are decoded again the next time. Costs nothing when none are loaded.
+        """
+        if self._transient_loaded:
+            for name in TRANSIENT_OVERLAYS:
+                self.game_images.pop(name, None)
+            self._transient_loaded = False
+
+    def set_tile_size(self, width: int, height: int) -> None:
+        """
+        Pre-scales every sprite for a board tile of width x height pixels. The resampling
+        is done once per size; calling this again with the same size costs nothing.
+        """
+        size = (int(width), int(height))
+        if size == self._tile_size:
+            return
+        self._tile_size = size
+        for name in SPRITES:
+            if name in self._sources:
+                self.return_sprite(name)
+
+    def return_sprite(self, name) -> PhotoImage:
+        """
+        Returns the PhotoImage for a sprite, scaled to the current tile size (see
+        set_tile_size). Before a tile size is set this is the native image.
+        """
+        if self._tile_size is None:
+            return self.return_image(name)
+
+        key = (name, self._tile_size)
+        image = self._scaled.get(key)
+        if image is not None:
+            self._scaled.move_to_end(key)
+            return image
+
+        source = self._sources.get(name)
+        if source is None:
+            return self.return_image(name)          # raises the usual KeyError
+
+        scale = min(self._tile_size) / SPRITE_DESIGN_TILE
+        width, height = max(1, round(source.width * scale)), max(1, round(source.height * scale))
+        if (width, height) == source.size:
+            image = self.game_images[name]
+        else:
+            if source.mode not in ("RGB", "RGBA"):
+                source = source.convert("RGBA")     # palette images would resize with NEAREST
+            image = PhotoImage(source.resize((width, height), Image.LANCZOS))
+
+        self._scaled[key] = image
+        if len(self._scaled) > SCALED_CACHE_SIZE:
+            self._scaled.popitem(last=False)
+        return image
 
     def return_image(self, name) -> PhotoImage:
         """
@@ -34,5 +167,40 @@ class GameImage:
         try:
             return self.game_images[name]
         except KeyError:
-            available = ", ".join(self.game_images.keys())
-            raise KeyError(f"No image named '{name}'. Available: {available}")
\ No newline at end of file
+            if name in self._paths:
+                return self._load(name)
+            available = ", ".join(sorted(set(self.game_images) | set(self._paths)))
+            raise KeyError(f"No image named '{name}'. Available: {available}")
+
+    def _load(self, name) -> PhotoImage:
+        """ First use of a lazily loaded image: wait for its prefetch (or decode it now). """
+        future = self._pending.pop(name, None)
+        source = future.result() if future is not None else _decode_file(self._paths[name])
+
+        image = PhotoImage(source)
+        self.game_images[name] = image
+        if name in TRANSIENT_OVERLAYS:
+            self._transient_loaded = True
+        return image
+
+
+class HeadlessImages:
+    '''
+    Stand-in for GameImage when nothing is drawn (benchmarks, simulations): needs no Tk
+    root and no image files, every image is just its name.
+    '''
+
+    def prefetch(self, *names) -> None:
+        pass
+
+    def release_transient(self) -> None:
+        pass
+
+    def set_tile_size(self, width: int, height: int) -> None:
+        pass
+
+    def return_sprite(self, name) -> str:
+        return name
+
+    def return_image(self, name) -> str:
+        return name
@@ -0,0 +1,91 @@
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Stages a move passes through, in order:
+#   notify   – BLE notification decoded (or key pressed) and a new direction fired
+#   dequeued – Board.update_directions took it from the direction queue
+#   accepted – Pacman actually turned (later than dequeued for buffered turns)
+#   drawn    – Tk finished the idle redraw that shows the turn
+STAGES = ("notify", "dequeued", "accepted", "drawn")
+_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+
+tracker: Optional["LatencyTracker"] = None      # set by enable(); None keeps every hook free
+
+
+class LatencyTracker:
+    """
+    Timestamps each move at every pipeline stage under a correlation id, in a fixed ring
+    of records, and reports per-stage latency percentiles over the session.
+    """
+
+    def __init__(self, capacity: int = 4096, clock=time.monotonic):
+        self.capacity = capacity
+        self.clock = clock
+        self._records = [[math.nan] * len(STAGES) for _ in range(capacity)]
+        self._next_id = 0
+        self._lock = threading.Lock()               # moves start on both the Tk and BLE threads
+
+    def begin(self) -> int:
+        """Start a new move at the 'notify' stage and return its correlation id."""
+        with self._lock:
+            cid = self._next_id
+            self._next_id += 1
+        record = self._records[cid % self.capacity]
+        for i in range(len(record)):
+            record[i] = math.nan
+        record[0] = self.clock()
+        return cid
+
+    def mark(self, cid: Optional[int], stage: str) -> None:
+        if cid is None or cid < self._next_id - self.capacity:
+            return                                  # untracked, or overwritten in the ring
+        record = self._records[cid % self.capacity]
+        index = _INDEX[stage]
+        if math.isnan(record[index]):               # first time only; redraws don't count
+            record[index] = self.clock()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Milliseconds between consecutive stages (and end to end): count, p50, p95, p99, max."""
+        spans = {f"{a}->{b}": [] for a, b in zip(STAGES, STAGES[1:])}
+        spans["total"] = []
+        for record in self._records[:min(self._next_id, self.capacity)]:
+            for a, b in zip(range(len(STAGES)), range(1, len(STAGES))):
+                if not (math.isnan(record[a]) or math.isnan(record[b])):
+                    spans[f"{STAGES[a]}->{STAGES[b]}"].append((record[b] - record[a]) * 1e3)
+            if not (math.isnan(record[0]) or math.isnan(record[-1])):
+                spans["total"].append((record[-1] - record[0]) * 1e3)
+        return {name: _summary(values) for name, values in spans.items()}
+
+    def print_report(self) -> None:
+        print(f"{'stage':22} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}   (ms)")
+        for name, s in self.report().items():
+            print(f"{name:22} {s['count']:6d} {s['p50']:8.1f} {s['p95']:8.1f} {s['p99']:8.1f} {s['max']:8.1f}")
+
+    def dump(self, path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    values = sorted(values)
+
+    def pct(p: float) -> float:
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+    return {"count": len(values), "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": values[-1]}
+
+
+def enable(capacity: int = 4096) -> LatencyTracker:
+    global tracker
+    tracker = LatencyTracker(capacity)
+    return tracker
+
+
+def disable() -> None:
+    global tracker
+    tracker = None
@@ -0,0 +1,125 @@
+from pacman import Pacman
+from pickup import Pickup
+from enemy import Enemy
+from wall import Wall
+
+
+class LevelTemplate():
+    ''' A maze compiled once into its static game objects. Walls and pickups are flyweights:
+        one Wall and two Pickup objects (normal and boost) shared by every square of their
+        kind, the position being the square's index. Starting a level or respawning only
+        copies rows of references, no per-cell objects are allocated. '''
+
+    def __init__(self, layout, images):
+        self.wall = Wall()
+        self.pickup = Pickup(images)
+        self.boost = Pickup(images, True)
+        static = { Wall.wall: self.wall, Pickup.pickup: self.pickup, Pickup.boostUp: self.boost }
+
+        self.cells = []                 # rows of Wall / Pickup / None, characters left out
+        self.pacman_start = None        # (x, y)
+        self.enemy_starts = []          # [(x, y, enemy_type)], in maze order
+        self.total_pickups = 0
+
+        for y, row in enumerate(layout):
+            self.cells.append( [ static.get(code) for code in row ] )
+
+            for x, code in enumerate(row):
+                if code == Pickup.pickup or code == Pickup.boostUp:
+                    self.total_pickups += 1
+                elif code == Pacman.pacman:
+                    self.pacman_start = x, y
+                elif code in (Enemy.inky, Enemy.blinky, Enemy.pinky, Enemy.clyde):
+                    self.enemy_starts.append( (x, y, code) )
+
+    def copy_cells(self) -> [list]:
+        ''' A fresh pickup bitmap for a new level: every pickup present, no characters. '''
+        return [ row[:] for row in self.cells ]
+
+    def create_characters(self, images, ghosts_per_type = 1) -> tuple:
+        ''' Builds Pacman and the enemies once; later levels just reset them. Every spawn
+            square gets ghosts_per_type enemies of its type (more than one for stress games). '''
+        x, y = self.pacman_start
+        enemies = [ Enemy(ex, ey, enemy_type, images) for ex, ey, enemy_type in self.enemy_starts
+                    for _ in range(ghosts_per_type) ]
+        return Pacman(x, y, images), enemies
+
+
+class _SquareWall(Wall):
+    ''' Benchmark baseline: a Wall of its own for every square, with its coordinates and
+        a __dict__, as before the flyweights. '''
+    def __init__(self, x, y, images):
+        self.x, self.y, self.images = x, y, images
+
+
+class _SquarePickup(Pickup):
+    ''' Benchmark baseline: a Pickup of its own for every square, as before the flyweights. '''
+    def __init__(self, x, y, images, boost = False):
+        Pickup.__init__(self, images, boost)
+        self.x, self.y, self.images = x, y, images
+
+
+class _PerSquareTemplate(LevelTemplate):
+    ''' Benchmark baseline: the template with per-square walls and pickups. '''
+    def __init__(self, layout, images):
+        LevelTemplate.__init__(self, layout, images)
+        for y, row in enumerate(layout):
+            for x, code in enumerate(row):
+                if code == Wall.wall:
+                    self.cells[y][x] = _SquareWall(x, y, images)
+                elif code == Pickup.pickup or code == Pickup.boostUp:
+                    self.cells[y][x] = _SquarePickup(x, y, images, code == Pickup.boostUp)
+
+
+if __name__ == '__main__':
+    # Level cost: time and allocated blocks for new_level() and a respawn, and the bytes a
+    # board holds for its level (template, level cells, Gamestate and characters), with the
+    # shared walls and pickups and with the per-square ones they replaced (the baseline).
+    import gc
+    import time
+    import tracemalloc
+    import board as board_module
+    from board import Board
+    from gameImage import HeadlessImages
+
+    board = Board(1280, 720, HeadlessImages())
+    board.new_level()
+    repeats = 500
+
+    def measure(name, step):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            step()
+        elapsed = (time.perf_counter() - start) / repeats * 1e6
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        step()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+        print(f'{name:16} {elapsed:8.1f} us   {blocks:5d} blocks allocated')
+
+    def bytes_per_level(template) -> float:
+        board_module.LevelTemplate = template
+        try:
+            boards = []
+            tracemalloc.start()
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(20):
+                boards.append( Board(1280, 720, HeadlessImages()) )
+                boards[-1].new_level()
+            gc.collect()
+            retained = (tracemalloc.get_traced_memory()[0] - before) / len(boards)
+            tracemalloc.stop()
+            return retained
+        finally:
+            board_module.LevelTemplate = LevelTemplate
+
+    measure('new_level', board.new_level)
+    measure('respawn restore', board.restore_gamestate)
+
+    shared, per_square = bytes_per_level(LevelTemplate), bytes_per_level(_PerSquareTemplate)
+    print(f'{"bytes per level":16} {shared:8.0f}   (per-square walls and pickups: {per_square:.0f}, '
+          f'{per_square / shared:.1f}x)')
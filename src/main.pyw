@@ -1,6 +1,16 @@
 import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+import latency
+import telemetry
 from balance_board import BalanceBoard
+from board import Board
+from gameImage import GameImage
+from sample_recording import SampleRecorder
+from savegame import CheckpointWriter, SaveError, resume
+from profiling import ProfileCapture, PROFILE_DIR
+from tilt_filters import filter_factory
+from startup import timeline
 from window import Window
 
 
@@ -21,6 +31,8 @@ TEXT = {
         "progress":        "{elapsed:.1f}/{total:.1f} seconds",
         "starting_game":   "Starting game!",
         "validated_tick":  "{dir} ✓",
+        "connecting":      "Connecting to the balance board…",
+        "keyboard_hint":   "Press Enter to play with the keyboard.",
     },
     "FR": {
         "dirs": {
@@ -34,6 +46,8 @@ TEXT = {
         "progress":        "{elapsed:.1f}/{total:.1f} secondes",
         "starting_game":   "Démarrage du jeu !",
         "validated_tick":  "{dir} ✓",
+        "connecting":      "Connexion à la planche…",
+        "keyboard_hint":   "Appuyez sur Entrée pour jouer au clavier.",
     },
 }
 
@@ -45,6 +59,18 @@ START_HOLD_SEC      = 5.0
 VALIDATION_HOLD_SEC = 3.0
 POLL_INTERVAL_MS    = 300           # 20 Hz
 DOT_RADIUS          = 10
+TILT_FILTER         = "boxcar:5"    # lower lag: "ema:0.5", "oneeuro", "median:3+oneeuro"
+PREDICTIVE_INPUT    = False         # fire directions early from tilt velocity (see sample_recording.py tune --predictive)
+MEASURE_LATENCY     = False         # print a per-stage input-to-screen latency report after each game
+RECORD_PATH         = None          # e.g. "recordings/session.bin" to log raw samples for replay
+MAZE_FILE           = None          # e.g. "../static/mazes/mine.txt"; None plays static/mazes/classic.txt
+GHOSTS_PER_TYPE     = 1             # stress mode: e.g. 100 starts 100 ghosts on every ghost spawn
+SAVE_PATH           = "saves/checkpoint.bin"    # game in progress, resumed on the next start; None disables
+CHECKPOINT_TICKS    = 10            # save every this many game updates (about 4 s)
+PROFILE_SECONDS     = 10.0          # <F9>: profile the Tk and BLE threads this long (F9 again stops early)
+TELEMETRY_PATH      = "logs/telemetry.jsonl"   # structured event log (JSON Lines); None disables
+TELEMETRY_MAX_BYTES = 1 << 20       # rotate the log past this size, keeping 3 old files
+TELEMETRY_STATS_SEC = 30.0          # log the BLE link's packet counters this often
 
 
 # ──────────────────────────────────────────────────────────────────────────
@@ -186,71 +212,215 @@ def wait_for_forward_visual(root, board: BalanceBoard, on_complete):
     check_forward()
 
 
+def wait_for_board_visual(root, sensor: dict, on_connected):
+    """
+    Shown while BLE is still discovering/connecting. Moves on to calibration as soon as
+    the board connects, or straight into a keyboard game when Enter is pressed.
+    """
+    title = tk.Label(root, text=TEXT[LANG]["connecting"], font=("Arial", 24), fg="white", bg="black")
+    title.pack(expand=True)
+    hint = tk.Label(root, text=TEXT[LANG]["keyboard_hint"], font=("Arial", 18), fg="white", bg="black")
+    hint.pack(pady=40)
+
+    state = {"done": False}
+
+    def finish(next_step):
+        if state["done"]:
+            return
+        state["done"] = True
+        root.winfo_toplevel().unbind("<Return>")
+        title.destroy()
+        hint.destroy()
+        next_step()
+
+    def check_connected():
+        if state["done"]:
+            return
+        if sensor["board"].is_connected():
+            finish(lambda: validate_user_input_visual(root, sensor["board"], on_connected))
+        else:
+            root.after(POLL_INTERVAL_MS, check_connected)
+
+    root.winfo_toplevel().bind("<Return>", lambda event: finish(on_connected))
+    check_connected()
+
+
 # ──────────────────────────────────────────────────────────────────────────
 #  BOILERPLATE  (unchanged from your original logic)
 # ──────────────────────────────────────────────────────────────────────────
 def main():
-    # 1) Start BLE sensor
-    balance_board = BalanceBoard(TARGET_MAC, CHAR_UUID)
-    balance_board.start()
-
-    print("Waiting for balance board…")
-    while not balance_board.wait_until_connected(timeout=10):      # ← pick a timeout you like
-        print("Could not connect within 10 s – retrying.") 
-        balance_board = BalanceBoard(TARGET_MAC, CHAR_UUID) 
-        balance_board.start()
-
-    # 2) Tk root
+    timeline.mark("process_start")
+    if MEASURE_LATENCY:
+        latency.enable()
+    if TELEMETRY_PATH:
+        telemetry.enable(TELEMETRY_PATH, max_bytes=TELEMETRY_MAX_BYTES)
+    session_start = time.monotonic()
+    telemetry.emit("session_start", maze=MAZE_FILE or "classic", ghosts_per_type=GHOSTS_PER_TYPE,
+                   tilt_filter=TILT_FILTER, predictive=PREDICTIVE_INPUT)
+
+    # 1) Start BLE sensor — scanning runs in the background from here on
+    recorder = SampleRecorder(RECORD_PATH) if RECORD_PATH else None
+    checkpoints = CheckpointWriter(SAVE_PATH) if SAVE_PATH else None
+
+    def make_board() -> BalanceBoard:
+        return BalanceBoard(TARGET_MAC, CHAR_UUID, recorder=recorder,
+                            tilt_filter=filter_factory(TILT_FILTER),
+                            predictive=PREDICTIVE_INPUT)
+
+    sensor = {"board": make_board()}
+    sensor["board"].start()
+    timeline.mark("ble_scan_started")
+
+    # 2) Decode images and compile the maze in parallel with BLE discovery
+    workers = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+    decoded_images = workers.submit(timeline.timed, "images_decoded", GameImage.decode)
+    compiled_maze = workers.submit(timeline.timed, "maze_compiled", Board.compile_layout, MAZE_FILE)
+    workers.shutdown(wait=False)
+
+    # 3) Tk root, with the connecting screen up straight away
     root = tk.Tk()
     root.attributes("-fullscreen", True)
     root.configure(bg="black")
+    timeline.mark("tk_root")
+    root.after_idle(lambda: timeline.mark("first_frame"))
 
     # — NEW: press <space> anywhere in the window to recalibrate
     def on_space(event=None):
         print("[INFO] Spacebar pressed → resetting origin")
-        balance_board.reset_origin()
+        sensor["board"].reset_origin()
 
     root.bind_all("<space>", on_space)
 
-    # 3) Validate then launch Pac-Man-style window
-    def start_game():
-        def restart_game():
-            """Restart the game from the calibration phase."""
-            for widget in root.winfo_children():
-                widget.destroy()
-            validate_user_input_visual(root, balance_board, start_game)
+    # press <F9> to profile the next PROFILE_SECONDS (pstats + collapsed stacks in src/profiles)
+    capture = ProfileCapture(PROFILE_DIR, PROFILE_SECONDS)
+    profile_timer = {"id": None}
 
-        for widget in root.winfo_children():
-            widget.destroy()
+    def stop_profile():
+        if profile_timer["id"] is not None:
+            root.after_cancel(profile_timer["id"])
+            profile_timer["id"] = None
+        for path in capture.stop():
+            print(f"[INFO] Profile written: {path}")
 
-        pacman = Window(root)
+    def on_profile_key(event=None):
+        if capture.running:
+            stop_profile()
+        else:
+            print(f"[INFO] Profiling for {PROFILE_SECONDS:.0f} s (F9 again to stop)")
+            capture.start()
+            profile_timer["id"] = root.after(int(PROFILE_SECONDS * 1000), stop_profile)
+
+    root.bind_all("<F9>", on_profile_key)
+
+    stats_due = {"at": time.monotonic() + TELEMETRY_STATS_SEC}
+
+    def watch_ble():
+        """Keep retrying the connection in the background, even once a keyboard game runs."""
+        board = sensor["board"]
+        if telemetry.log is not None and time.monotonic() >= stats_due["at"]:
+            stats_due["at"] += TELEMETRY_STATS_SEC
+            telemetry.emit("ble_stats", connected=board.is_connected(), **board.link_stats())
+        if board.is_connected():
+            if timeline.elapsed("ble_connected") is None:
+                timeline.mark("ble_connected")
+        elif not board.is_running():         # scan ended without finding the board
+            print("Could not find the balance board – retrying.")
+            sensor["board"] = make_board()
+            sensor["board"].direction_sink = board.direction_sink
+            sensor["board"].start()
+        root.after(POLL_INTERVAL_MS, watch_ble)
+
+    # 4) Validate then launch Pac-Man-style window. One Window (and with it the board,
+    #    the maze and every decoded image) lives for the whole session; a restart only
+    #    hides it and resets the game state.
+    game = {"window": None}
 
-        prev = {"dir": None}
+    def start_game():
+        window = game["window"]
+        if window is None:
+            images = GameImage(decoded_images.result())      # PhotoImage conversion: Tk thread only
+            timeline.mark("images_ready")
+            compiled_maze.result()      # the board plays what the worker compiled (raises its error)
+            window = game["window"] = Window(root, images, GHOSTS_PER_TYPE, MAZE_FILE)
+            resume_saved_game(window.board)
+            root.after_idle(lambda: (timeline.mark("first_game_frame"), timeline.log()))
+            window.run()
+        else:
+            window.new_game()
 
-        def poll_sensor():
-            new_dir = balance_board.get_direction()
-            old_dir = prev["dir"]
+        # tilts go straight from the BLE thread into the game's direction queue
+        sensor["board"].direction_sink = window.directions
 
-            if new_dir != old_dir:
-                if old_dir:
-                    root.event_generate(f"<KeyRelease-{old_dir}>")
-                if new_dir:
-                    root.event_generate(f"<KeyPress-{new_dir}>")
-                prev["dir"] = new_dir
+        saved = {"tick": window.board.ticks}
 
-            if pacman.board.game_over:  # Check if the game is over
+        def poll_sensor():
+            if window.board.game_over:  # Check if the game is over
                 print("[INFO] Game over! Restarting...")
+                if checkpoints is not None:
+                    checkpoints.discard()
+                if latency.tracker is not None:
+                    latency.tracker.print_report()
+                sensor["board"].direction_sink = None
                 restart_game()
                 return
 
+            # snapshot here (Tk thread, between updates); encoding and the write are in the background
+            if checkpoints is not None and window.board.ticks - saved["tick"] >= CHECKPOINT_TICKS \
+                    and not window.board.level_complete():
+                checkpoints.checkpoint(window.board)
+                saved["tick"] = window.board.ticks
+
             root.after(POLL_INTERVAL_MS, poll_sensor)
 
         root.after(POLL_INTERVAL_MS, poll_sensor)
-        pacman.run()
 
-    validate_user_input_visual(root, balance_board, start_game)
+    def resume_saved_game(board: Board):
+        """Carry on the game that was running when the cabinet lost power, if there is one."""
+        if not SAVE_PATH:
+            return
+        try:
+            snapshot = resume(board, SAVE_PATH)
+        except FileNotFoundError:
+            return
+        except (SaveError, OSError) as e:
+            print(f"[WARN] saved game not resumed: {e}")
+            return
+        print(f"[INFO] Resumed saved game: level {board.pacman.level}, score {board.pacman.score}, tick {snapshot.tick}")
+        telemetry.emit("game_resumed", level=board.pacman.level, score=board.pacman.score, tick=snapshot.tick)
+
+    def restart_game():
+        """Restart the game from the calibration phase (or straight away on keyboard)."""
+        game["window"].hide()
+        begin()
+
+    def begin():
+        # the calibration / connecting screens get their own frame, thrown away afterwards
+        screen = tk.Frame(root, bg="black")
+        screen.pack(fill=tk.BOTH, expand=True)
+        started = time.monotonic()
+
+        def done():
+            screen.destroy()
+            telemetry.emit("calibration", seconds=round(time.monotonic() - started, 2),
+                           input="board" if sensor["board"].is_connected() else "keyboard")
+            start_game()
+
+        if sensor["board"].is_connected():
+            validate_user_input_visual(screen, sensor["board"], done)
+        else:
+            wait_for_board_visual(screen, sensor, done)
+
+    watch_ble()
+    begin()
     root.mainloop()
 
+    if recorder is not None:
+        recorder.close()
+    if checkpoints is not None:
+        checkpoints.close()
+    telemetry.emit("session_end", seconds=round(time.monotonic() - session_start, 1))
+    telemetry.disable()
+
 
 if __name__ == "__main__":
     main()
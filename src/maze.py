@@ -0,0 +1,399 @@
+import argparse
+import hashlib
+import os
+import struct
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pacman import Pacman                 # before enemy: the two import each other
+from enemy import Enemy
+from pickup import Pickup
+from wall import Wall
+
+# Square codes, the same numbers Board layouts use. EMPTY stands in for None in the
+# binary formats.
+WALL, PICKUP, EMPTY, BOOST = Wall.wall, Pickup.pickup, 2, Pickup.boostUp
+GHOSTS = (Enemy.inky, Enemy.blinky, Enemy.pinky, Enemy.clyde)
+PACMAN = Pacman.pacman
+
+# Text format: one character per square, see static/mazes/classic.txt for the legend.
+TEXT_CODES = {"#": WALL, ".": PICKUP, "o": BOOST, " ": EMPTY, "-": EMPTY,
+              "P": PACMAN, "i": Enemy.inky, "b": Enemy.blinky, "p": Enemy.pinky, "c": Enemy.clyde}
+TEXT_CODES.update((str(d), EMPTY) for d in range(1, 10))
+COMMENT = ";"
+
+# Binary format: header, width * height square codes (row-major), the portal pairs as
+# <y, x, y, x>, then the gates as <y, x>. The compiled cache adds the neighbour table.
+HEADER   = struct.Struct("<4sHHHHH")
+PORTAL   = struct.Struct("<HHHH")
+GATE     = struct.Struct("<HH")
+MAGIC, COMPILED_MAGIC = b"PBMZ", b"PBMC"
+VERSION  = 1
+COMPILED_VERSION = 2                        # bump whenever the cached tables change meaning
+
+# Neighbour order, the same as the enemies' breadth-first search: right, left, down, up.
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIRECTIONS = ("Right", "Left", "Down", "Up")
+
+_ROOT = Path(__file__).resolve().parent.parent
+MAZES_DIR = _ROOT / "static" / "mazes"
+CACHE_DIR = _ROOT / ".cache" / "mazes"
+
+
+class MazeError(ValueError):
+    """A maze file that cannot be played: unknown squares, missing spawns, broken portals..."""
+
+
+class Maze:
+    """
+    A validated, compiled maze: the square codes plus the tables the game looks up instead
+    of hard-coding coordinates (gates, portals, walkability and each square's walkable
+    neighbours). Build one with load_maze(); it is immutable once built.
+    """
+
+    def __init__(self, width: int, height: int, cells: bytes,
+                 portals: Dict[Tuple[int, int], Tuple[int, int]], gates, neighbours: array = None):
+        self.width = width
+        self.height = height
+        self.cells = bytes(cells)
+        self.portals = dict(portals)                # (y, x) -> (y, x) of the linked square
+        self.gates = frozenset(gates)               # (y, x) squares Pacman may not step down into
+        self.walkable = bytes(code != WALL for code in self.cells)
+        self.neighbours = neighbours if neighbours is not None else self._neighbour_table()
+        self._predecessors = None                   # built on first distances_to()
+        self._parents = self._queue = self._reached = self._unreached = None    # see _buffers()
+        self._search_id = 0
+
+        self.pickups = sum(code in (PICKUP, BOOST) for code in self.cells)
+        self.pacman_start = None                    # (x, y)
+        self.ghost_starts = []                      # [(x, y, enemy_type)], in maze order
+        for i, code in enumerate(self.cells):
+            y, x = divmod(i, width)
+            if code == PACMAN:
+                self.pacman_start = x, y
+            elif code in GHOSTS:
+                self.ghost_starts.append((x, y, code))
+
+    def _neighbour_table(self) -> array:
+        """
+        Index of the square a step in each STEPS direction leads to, for every square, or -1
+        into a wall or off the board. Stepping onto a portal leads straight to its linked
+        square, so anything walking the table goes through portals with no extra checks.
+        """
+        table = array("i", [-1]) * (len(self.cells) * len(STEPS))
+        for i, code in enumerate(self.cells):
+            if code == WALL:
+                continue
+            y, x = divmod(i, self.width)
+            for d, (dx, dy) in enumerate(STEPS):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height and self.walkable[ny * self.width + nx]:
+                    ny, nx = self.portals.get((ny, nx), (ny, nx))
+                    table[i * len(STEPS) + d] = ny * self.width + nx
+        return table
+
+    def step(self, y: int, x: int, direction: str) -> Optional[Tuple[int, int]]:
+        """(y, x) that a step in direction leads to from (y, x), through portals; None if blocked."""
+        try:
+            n = self.neighbours[(y * self.width + x) * len(STEPS) + DIRECTIONS.index(direction)]
+        except ValueError:
+            return None                             # no direction (e.g. None)
+        return divmod(n, self.width) if n >= 0 else None
+
+    def direction_to(self, y: int, x: int, to_y: int, to_x: int) -> Optional[str]:
+        """The direction whose step from (y, x) lands on (to_y, to_x), or None if none does."""
+        target = to_y * self.width + to_x
+        i = (y * self.width + x) * len(STEPS)
+        for d, direction in enumerate(DIRECTIONS):
+            if self.neighbours[i + d] == target:
+                return direction
+        return None
+
+    def _buffers(self) -> None:
+        """search() and distances_to()'s scratch arrays, made once per maze."""
+        if self._parents is None or self._search_id == 0xFFFFFFFF:
+            size = len(self.cells)
+            self._parents = array("i", bytes(4 * size))
+            self._queue = array("i", bytes(4 * size))
+            self._reached = array("I", bytes(4 * size))
+            self._unreached = array("i", [-1]) * size
+            self._search_id = 0
+        self._search_id += 1
+
+    def search(self, start: int, goal: int) -> Optional[array]:
+        """
+        Breadth-first search from square ``start`` to square ``goal`` along the neighbour table,
+        trying the STEPS directions in order. Returns the parent array (each square reached
+        maps to the square it was reached from; walk it back from goal to start for the path)
+        or None if goal cannot be reached. The arrays are the maze's own and are reused by
+        every search without being cleared (squares are marked with the search's number), so
+        a search allocates nothing; the result only holds until the next search.
+        """
+        self._buffers()
+        mark, parents, queue, reached, neighbours = self._search_id, self._parents, self._queue, self._reached, self.neighbours
+
+        reached[start] = mark
+        if start == goal:
+            return parents
+        queue[0], head, tail = start, 0, 1
+        while head < tail:
+            square = queue[head]
+            head += 1
+            for k in range(square * 4, square * 4 + 4):     # right, left, down, up; through portals
+                n = neighbours[k]
+                if n >= 0 and reached[n] != mark:
+                    reached[n] = mark
+                    parents[n] = square
+                    if n == goal:
+                        return parents
+                    queue[tail] = n
+                    tail += 1
+        return None
+
+    def distances_to(self, y: int, x: int, goals=None, out: Optional[array] = None) -> array:
+        """
+        Steps from every square to (y, x) along the neighbour table (portals included), by one
+        breadth-first search backwards from (y, x); -1 where it cannot be reached. With
+        ``goals`` (square indices) the search stops as soon as all of them have a distance,
+        and squares farther away may be left at -1. ``out``, an array of len(cells) ints
+        (e.g. from an earlier call), is filled and returned instead of a new one.
+        """
+        if self._predecessors is None:
+            predecessors = [[] for _ in self.cells]
+            for i, n in enumerate(self.neighbours):
+                if n >= 0:
+                    predecessors[n].append(i // len(STEPS))
+            self._predecessors = predecessors
+
+        self._buffers()
+        if out is None:
+            distances = array("i", self._unreached)
+        else:
+            distances = out
+            distances[:] = self._unreached
+        start = y * self.width + x
+        if not (0 <= y < self.height and 0 <= x < self.width) or not self.walkable[start]:
+            return distances
+
+        distances[start] = 0
+        mark, reached, remaining = self._search_id, self._reached, -1
+        if goals is not None:                       # count the distinct goals, marking them
+            remaining = 0
+            for goal in goals:
+                if reached[goal] != mark:
+                    reached[goal] = mark
+                    remaining += 1
+            if reached[start] == mark:
+                remaining -= 1
+            if remaining == 0:
+                return distances
+
+        queue, predecessors = self._queue, self._predecessors
+        queue[0], head, tail = start, 0, 1
+        while head < tail:
+            i = queue[head]
+            head += 1
+            steps = distances[i] + 1
+            for j in predecessors[i]:
+                if distances[j] < 0:
+                    distances[j] = steps
+                    queue[tail] = j
+                    tail += 1
+                    if remaining > 0 and reached[j] == mark:
+                        remaining -= 1
+                        if remaining == 0:
+                            return distances
+        return distances
+
+    def layout(self) -> List[list]:
+        """The maze as the Board's numeric layout: rows of square codes, None for empty."""
+        return [[None if code == EMPTY else code for code in self.cells[y * self.width:(y + 1) * self.width]]
+                for y in range(self.height)]
+
+    def to_bytes(self, compiled: bool = False) -> bytes:
+        """The binary maze format, or with ``compiled`` the on-disk cache format."""
+        pairs = [(a, b) for a, b in sorted(self.portals.items()) if a < b]
+        parts = [HEADER.pack(COMPILED_MAGIC if compiled else MAGIC, COMPILED_VERSION if compiled else VERSION,
+                             self.width, self.height, len(pairs), len(self.gates)),
+                 self.cells]
+        parts += [PORTAL.pack(*a, *b) for a, b in pairs]
+        parts += [GATE.pack(*gate) for gate in sorted(self.gates)]
+        if compiled:
+            parts.append(self.neighbours.tobytes())
+        return b"".join(parts)
+
+
+# ------------------------------------------------------------------ parsing
+def parse_text(text: str) -> Maze:
+    lines = [line.rstrip("\r\n") for line in text.splitlines() if not line.startswith(COMMENT)]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    if not lines:
+        raise MazeError("maze has no rows")
+
+    width, height = max(len(line) for line in lines), len(lines)
+    cells = bytearray([EMPTY]) * (width * height)
+    gates, ends = [], {}
+    for y, line in enumerate(lines):
+        for x, char in enumerate(line):
+            if char not in TEXT_CODES:
+                raise MazeError(f"row {y + 1}, column {x + 1}: unknown square {char!r}")
+            cells[y * width + x] = TEXT_CODES[char]
+            if char == "-":
+                gates.append((y, x))
+            elif char.isdigit():
+                ends.setdefault(char, []).append((y, x))
+
+    portals = {}
+    for digit, squares in sorted(ends.items()):
+        if len(squares) != 2:
+            raise MazeError(f"portal {digit} has {len(squares)} squares, it needs exactly 2")
+        a, b = squares
+        portals[a], portals[b] = b, a
+
+    return _validate(Maze(width, height, cells, portals, gates))
+
+
+def parse_binary(data: bytes) -> Maze:
+    """Reads the binary maze format, or the compiled cache format (tables included)."""
+    if len(data) < HEADER.size:
+        raise MazeError("maze file is truncated")
+    magic, version, width, height, n_portals, n_gates = HEADER.unpack_from(data)
+    if magic not in (MAGIC, COMPILED_MAGIC):
+        raise MazeError(f"not a maze file (magic {magic!r})")
+    if version != (COMPILED_VERSION if magic == COMPILED_MAGIC else VERSION):
+        raise MazeError(f"unsupported maze version {version}")
+
+    size = width * height
+    tables = size * len(STEPS) * 4 if magic == COMPILED_MAGIC else 0
+    expected = HEADER.size + size + n_portals * PORTAL.size + n_gates * GATE.size + tables
+    if len(data) != expected:
+        raise MazeError(f"maze file is {len(data)} bytes, expected {expected}")
+
+    offset = HEADER.size
+    cells = data[offset:offset + size]
+    offset += size
+    portals = {}
+    for _ in range(n_portals):
+        y1, x1, y2, x2 = PORTAL.unpack_from(data, offset)
+        portals[(y1, x1)], portals[(y2, x2)] = (y2, x2), (y1, x1)
+        offset += PORTAL.size
+    gates = []
+    for _ in range(n_gates):
+        gates.append(GATE.unpack_from(data, offset))
+        offset += GATE.size
+
+    if tables:
+        neighbours = array("i")
+        neighbours.frombytes(data[offset:])
+        return Maze(width, height, cells, portals, gates, neighbours)   # validated when cached
+    return _validate(Maze(width, height, cells, portals, gates))
+
+
+def _validate(maze: Maze) -> Maze:
+    known = {WALL, PICKUP, EMPTY, BOOST, PACMAN, *GHOSTS}
+    for i, code in enumerate(maze.cells):
+        if code not in known:
+            y, x = divmod(i, maze.width)
+            raise MazeError(f"square ({y}, {x}) has unknown code {code}")
+
+    spawns = maze.cells.count(PACMAN)
+    if spawns != 1:
+        raise MazeError(f"maze needs exactly one Pacman spawn, found {spawns}")
+
+    for square in (*maze.portals, *maze.gates):
+        y, x = square
+        if not (0 <= y < maze.height and 0 <= x < maze.width) or not maze.walkable[y * maze.width + x]:
+            raise MazeError(f"portal/gate square {square} is outside the maze or a wall")
+
+    # everything Pacman can reach: no way off the board except through a portal, and
+    # every pickup must be reachable or the level can never be completed
+    x, y = maze.pacman_start
+    start = y * maze.width + x
+    seen, queue = {start}, deque([start])
+    while queue:
+        i = queue.popleft()
+        y, x = divmod(i, maze.width)
+        linked = maze.portals.get((y, x))
+        if linked is None and (x in (0, maze.width - 1) or y in (0, maze.height - 1)):
+            raise MazeError(f"square ({y}, {x}) leads off the board; close it with a wall or make it a portal")
+
+        for n in maze.neighbours[i * len(STEPS):(i + 1) * len(STEPS)]:       # portals included
+            if n >= 0 and n not in seen:
+                seen.add(n)
+                queue.append(n)
+
+    for i, code in enumerate(maze.cells):
+        if code in (PICKUP, BOOST) and i not in seen:
+            y, x = divmod(i, maze.width)
+            raise MazeError(f"pickup at ({y}, {x}) cannot be reached from Pacman's spawn")
+    return maze
+
+
+# ------------------------------------------------------------------ loading
+def maze_path(name: str) -> Path:
+    """static/mazes/<name>.txt (or .maze for the binary format)."""
+    text = MAZES_DIR / f"{name}.txt"
+    return text if text.is_file() else MAZES_DIR / f"{name}.maze"
+
+
+def load_maze(path, cache_dir: Optional[Path] = CACHE_DIR) -> Maze:
+    """
+    Loads a text or binary maze. The compiled result is cached in ``cache_dir`` under the
+    hash of the file's content, so later boots skip parsing and validation entirely.
+    Pass cache_dir=None to always compile.
+    """
+    data = Path(path).read_bytes()
+    key = hashlib.sha256(data + HEADER.pack(COMPILED_MAGIC, COMPILED_VERSION, 0, 0, 0, 0)).hexdigest()[:24]
+    cached = cache_dir / f"{key}.bin" if cache_dir is not None else None
+
+    if cached is not None and cached.is_file():
+        try:
+            return parse_binary(cached.read_bytes())
+        except MazeError:
+            pass                                    # stale or damaged cache: compile again
+
+    maze = parse_binary(data) if data[:4] == MAGIC else parse_text(data.decode("utf-8"))
+
+    if cached is not None:
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            partial = cached.with_suffix(f".{os.getpid()}.tmp")
+            partial.write_bytes(maze.to_bytes(compiled=True))
+            os.replace(partial, cached)
+        except OSError:
+            pass                                    # read-only install: just don't cache
+    return maze
+
+
+# ------------------------------------------------------------------ command line
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Validate, convert and time maze files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="validate a maze and print its summary")
+    info.add_argument("maze")
+    convert = sub.add_parser("convert", help="write a text maze in the binary format")
+    convert.add_argument("maze")
+    convert.add_argument("output")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        start = time.perf_counter()
+        maze = load_maze(args.maze, cache_dir=None)
+        compiled = time.perf_counter() - start
+        load_maze(args.maze)                        # make sure it is cached
+        start = time.perf_counter()
+        load_maze(args.maze)
+        cached = time.perf_counter() - start
+        print(f"{maze.width} x {maze.height}, {maze.pickups} pickups, {len(maze.ghost_starts)} ghosts, "
+              f"{len(maze.portals) // 2} portals, {len(maze.gates)} gates")
+        print(f"compile {compiled * 1e3:.2f} ms, from cache {cached * 1e3:.2f} ms")
+    else:
+        Path(args.output).write_bytes(load_maze(args.maze, cache_dir=None).to_bytes())
+        print(f"Wrote {args.output}")
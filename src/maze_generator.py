@@ -0,0 +1,178 @@
+import argparse
+import random
+from typing import List
+
+from maze import MazeError, Maze, parse_text
+
+MIN_WIDTH, MIN_HEIGHT = 28, 31
+MAX_SIZE = 512
+WALL, CORRIDOR, EMPTY = "#", ".", " "
+
+
+def generate_text(width: int = MIN_WIDTH, height: int = MIN_HEIGHT, seed: int = 0) -> str:
+    """
+    A left/right symmetric Pac-Man-style maze in the text format of static/mazes: a braided
+    maze (no dead ends) carved on the left half and mirrored, a ghost house with a gate in the
+    middle, Pacman below it, tunnels (portals) through the side walls, pickups on every
+    corridor and a boost near each corner. The same seed always gives the same maze.
+    """
+    if not (MIN_WIDTH <= width <= MAX_SIZE and MIN_HEIGHT <= height <= MAX_SIZE):
+        raise MazeError(f"generated mazes are {MIN_WIDTH}x{MIN_HEIGHT} up to {MAX_SIZE}x{MAX_SIZE}")
+
+    rng = random.Random(seed)
+    for _ in range(100):                            # a carve that fails validation is redrawn
+        text = _render(_carve(width, height, rng), width, height, rng)
+        try:
+            parse_text(text)
+            return text
+        except MazeError:
+            continue
+    raise MazeError(f"could not generate a valid {width}x{height} maze from seed {seed}")
+
+
+def generate_maze(width: int = MIN_WIDTH, height: int = MIN_HEIGHT, seed: int = 0) -> Maze:
+    """generate_text() compiled into the Maze that Board(maze=...) plays."""
+    return parse_text(generate_text(width, height, seed))
+
+
+def _carve(width: int, height: int, rng: random.Random) -> List[List[str]]:
+    """Braided maze on the lattice of odd squares of the left half (centre column included)."""
+    half = (width + 1) // 2
+    grid = [[WALL] * half for _ in range(height)]
+    cells = [(y, x) for y in range(1, height - 1, 2) for x in range(1, half, 2)]
+
+    # randomised depth-first carve: a perfect maze
+    start = rng.choice(cells)
+    grid[start[0]][start[1]] = CORRIDOR
+    stack = [start]
+    while stack:
+        y, x = stack[-1]
+        options = [(y + dy, x + dx, dy, dx) for dy, dx in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                   if 0 < y + dy < height - 1 and 0 < x + dx < half and grid[y + dy][x + dx] == WALL]
+        if not options:
+            stack.pop()
+            continue
+        ny, nx, dy, dx = rng.choice(options)
+        grid[y + dy // 2][x + dx // 2] = grid[ny][nx] = CORRIDOR
+        stack.append((ny, nx))
+
+    # braid: open one more wall at every dead end, Pac-Man mazes have loops everywhere
+    # (past the last column is the mirror image, which is open wherever this square is)
+    for y, x in cells:
+        walls = [(y + dy, x + dx) for dy, dx in ((0, 1), (0, -1), (1, 0), (-1, 0))
+                 if x + dx < half and grid[y + dy][x + dx] == WALL]
+        if len(walls) >= 3:
+            inner = [(wy, wx) for wy, wx in walls if 0 < wy < height - 1 and 0 < wx]
+            if inner:
+                wy, wx = rng.choice(inner)
+                grid[wy][wx] = CORRIDOR
+
+    # when the lattice stops short of the centre, bridge the halves every few rows
+    last = max(x for _, x in cells)
+    for y in range(1, height - 1, 4):
+        if grid[y][last] == CORRIDOR:
+            for x in range(last + 1, half):
+                grid[y][x] = CORRIDOR
+    return grid
+
+
+def _render(half_grid: List[List[str]], width: int, height: int, rng: random.Random) -> str:
+    grid = [row + row[:width - len(row)][::-1] for row in half_grid]      # mirror onto the right
+
+    # ghost house: an empty ring, the walls with a two-square gate on top, four ghosts inside
+    centre = width // 2
+    top, bottom = height // 2 - 3, height // 2 + 1
+    left, right = centre - 5, centre + 4 - (width % 2 == 0)
+    for y in range(top - 1, bottom + 2):
+        for x in range(left - 1, right + 2):
+            grid[y][x] = EMPTY
+    for y in range(top, bottom + 1):
+        for x in range(left, right + 1):
+            grid[y][x] = WALL if y in (top, bottom) or x in (left, right) else EMPTY
+    for x in (centre - 1, centre):
+        grid[top][x] = "-"
+    ghosts = "ibpc"
+    for i, x in enumerate(range(centre - 2, centre + 2)):
+        grid[top + 2][x] = ghosts[i]
+
+    # Pacman starts under the house; the ring around the house has no pickups
+    grid[bottom + 1][centre - 1] = "P"
+
+    # tunnels: portals on the side walls, joined to the first corridor inwards
+    rows = [y for y in range(3, height - 3, 2) if not top - 2 <= y <= bottom + 2]
+    for digit, y in zip("123456789", sorted(rng.sample(rows, min(9, max(1, height // 32), len(rows))))):
+        x = 1
+        while x < centre - 1 and grid[y][x] == WALL:
+            grid[y][x] = grid[y][width - 1 - x] = EMPTY
+            x += 1
+        grid[y][0] = grid[y][width - 1] = digit
+
+    # a boost on the corridor square nearest each corner
+    for corner_y in (1, height - 2):
+        squares = [(abs(y - corner_y) + x, y, x) for y in range(1, height - 1) for x in range(1, centre)
+                   if grid[y][x] == CORRIDOR]
+        _, y, x = min(squares)
+        grid[y][x] = grid[y][width - 1 - x] = "o"
+
+    header = f"; Generated {width}x{height} maze (maze_generator.py)\n"
+    return header + "\n".join("".join(row).rstrip() for row in grid) + "\n"
+
+
+# ------------------------------------------------------------------ command line
+def _size(text: str):
+    width, _, height = text.partition("x")
+    return int(width), int(height or width)
+
+
+def _benchmark(sizes, ticks: int, seed: int) -> None:
+    """Headless games on growing mazes: per-tick cost of movement, pathfinding and collision."""
+    import time
+    from board import Board
+    from gameImage import HeadlessImages
+
+    print(f"{'maze':>9} {'squares':>8} {'ticks':>6} {'movement':>10} {'pathfind':>10} {'collision':>10} {'total':>10}   (us/tick)")
+    for width, height in sizes:
+        board = Board(1280, 720, HeadlessImages(), maze=generate_maze(width, height, seed))
+        board.new_level()
+        board.tick_phases = phases = {}
+        rng = random.Random(seed)
+
+        start = time.perf_counter()
+        for tick in range(ticks):
+            if tick % 5 == 0:
+                board.directions.push(rng.choice(("Left", "Right", "Up", "Down")))
+            board.update_directions()
+            board.update_board()
+
+            if board.game_over:
+                board.reset_game()
+            elif board.level_complete():
+                board.new_level()
+            elif board.pacman.is_respawning:
+                board.pacman.is_respawning = False
+        total = (time.perf_counter() - start) / ticks * 1e6
+
+        per_tick = {name: phases.get(name, 0.0) / ticks * 1e6 for name in ("movement", "pathfinding", "collision")}
+        print(f"{width:>4}x{height:<4} {width * height:8d} {ticks:6d} {per_tick['movement']:10.1f} "
+              f"{per_tick['pathfinding']:10.1f} {per_tick['collision']:10.1f} {total:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate symmetric Pac-Man mazes and benchmark Board on them.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write a generated maze in the text format")
+    gen.add_argument("size", type=_size, help="WIDTHxHEIGHT, e.g. 64x64")
+    gen.add_argument("output")
+    gen.add_argument("--seed", type=int, default=0)
+    bench = sub.add_parser("bench", help="per-tick cost against maze size")
+    bench.add_argument("sizes", type=_size, nargs="*", default=[(28, 31), (64, 64), (128, 128), (256, 256), (512, 512)])
+    bench.add_argument("--ticks", type=int, default=200)
+    bench.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        with open(args.output, "w") as f:
+            f.write(generate_text(*args.size, seed=args.seed))
+        print(f"Wrote {args.output}")
+    else:
+        _benchmark(args.sizes, args.ticks, args.seed)
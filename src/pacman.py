@@ -1,6 +1,5 @@
 from character import Character
 from enemy import Enemy
-from wall import Wall
 from pickup import Pickup
 
 class Pacman(Character):
@@ -9,6 +8,8 @@ class Pacman(Character):
     no_score = 0
     level_one = 1
     three_lives = 3
+    __slots__ = ('score', 'life_score', 'lives', 'level', 'last_direction', 'next_direction',
+                 'is_respawning', 'invulnerable_ticks', 'death')
     
     def __init__(self, x, y, images, direction = 'Left'):
         Character.__init__(self, x, y, direction)
@@ -19,6 +20,7 @@ class Pacman(Character):
 
         self.last_direction, self.next_direction = 'Left', None
         self.is_respawning = False
+        self.death = False
         self.direction_image(images)
 
         self.invulnerable_ticks = Pacman.ticks
@@ -51,6 +53,17 @@ class Pacman(Character):
         self.direction_image( images )
         self.death = False
 
+    def reset(self, images) -> None:
+        ''' Puts Pacman back in his spawn state for a new level (score, lives and level
+            are kept, level_up() sets them), so the same object is reused every level. '''
+        self.initial_position()
+        self.direction, self.last_direction, self.next_direction = 'Left', 'Left', None
+        self.last_location = None
+        self.is_respawning = False
+        self.invulnerable = False
+        self.invulnerable_ticks = Pacman.ticks
+        self.direction_image(images)
+
     def restart_level(self) -> None:
         ''' On death, original values are restored. '''
         self.initial_position()
@@ -100,13 +113,6 @@ class Pacman(Character):
         ''' If next_direction has a direction, it returns True, else False. '''
         return self.next_direction is not None
         
-    def crossed_boundary(self):
-        ''' This function controls '''
-        if self.direction == 'Left':
-            self.change_location(27, 14)
-        else:
-            self.change_location(0, 14)
-
     # Display Functions #
     def display_score(self) -> str:
         return f'Score: {self.score}'
@@ -119,14 +125,14 @@ class Pacman(Character):
     
     def direction_image(self, images):
         if self.direction == 'Left':
-            self._image = images.return_image('pacmanL')
+            self._image = images.return_sprite('pacmanL')
 
         elif self.direction == 'Right':
-            self._image = images.return_image('pacmanR')
+            self._image = images.return_sprite('pacmanR')
 
         elif self.direction == 'Down':
-            self._image = images.return_image('pacmanD')
+            self._image = images.return_sprite('pacmanD')
 
         elif self.direction == 'Up':
-            self._image = images.return_image('pacmanU')
+            self._image = images.return_sprite('pacmanU')
 
@@ -1,18 +1,17 @@
 class Pickup():
     pickup = 1
     boostUp = 3
+    __slots__ = ('boost', '_image')
     
-    def __init__(self, x, y, images, boost = False):
+    def __init__(self, images, boost = False):
         ''' Initializes a Pickup object that basically functions as a representation on the
             board. There is no methods in the class, because it gets eaten by Pacman as the
-            game progresses. Due to this, it requires x and y coordinates, an image, and the
-            difference between a boost pick up or a normal one, where boost is False by default.'''
-        self.x = x
-        self.y = y
-        self.images = images
+            game progresses. A board only holds two of them, a normal and a boost pickup,
+            each shared by every square of its kind (a flyweight), so a pickup has no
+            coordinates of its own: its position is its index in the Gamestate. '''
         self.boost = boost # default = false since only 4 boost are on the board
         
         if self.boost:
-            self._image = self.images.return_image('boost')
+            self._image = images.return_sprite('boost')
         else:
-            self._image = self.images.return_image('pickup')
+            self._image = images.return_sprite('pickup')
@@ -0,0 +1,82 @@
+from array import array
+
+EMPTY = -1                  # no character / no square
+
+class PositionIndex():
+    ''' A spatial hash of the characters for one update: which characters stand on each
+        square (y * width + x), built in one pass over them. Collisions are looked up here
+        instead of in the Gamestate grid, so they do not depend on the order the grid was
+        written in, and stay O(characters) however many ghosts there are.
+
+        The squares the characters stood on at the end of the previous update are kept too,
+        which is how two characters passing through each other (a swap) are found.
+
+        A board's characters never change, so the index is made for them once and kept in
+        preallocated int arrays, by the characters' slots (their order in characters): per
+        square the first slot standing on it, per slot the next one on the same square, its
+        square now and its previous square. Nothing is allocated per update. '''
+
+    def __init__(self, width, squares, characters):
+        self.width = width
+        self.characters = tuple(characters)
+        self._slots = { character: i for i, character in enumerate(self.characters) }
+        count = len(self.characters)
+        self.first = array('i', [EMPTY]) * squares      # square -> first slot on it, this update
+        self.next = array('i', [EMPTY]) * count         # slot -> next slot on the same square
+        self.square = array('i', [EMPTY]) * count       # slot -> its square, this update
+        self.previous = array('i', [EMPTY]) * count     # slot -> its square at the end of the previous update
+
+    def remember(self) -> None:
+        ''' Records the characters' squares as the previous squares of the next update.
+            Called after every update, and when the characters are put back on their spawns. '''
+        width, previous = self.width, self.previous
+        for i, character in enumerate(self.characters):
+            previous[i] = character.y * width + character.x
+
+    def rebuild(self) -> None:
+        ''' Indexes the characters by the square they stand on now. '''
+        width, first, following, square = self.width, self.first, self.next, self.square
+        for s in square:                                # only the squares used last time
+            if s != EMPTY:
+                first[s] = EMPTY
+        characters = self.characters
+        for i in range(len(characters) - 1, -1, -1):    # backwards, so each square lists them in order
+            character = characters[i]
+            s = character.y * width + character.x
+            square[i] = s
+            following[i] = first[s]
+            first[s] = i
+
+    def at(self, y, x) -> list:
+        ''' The characters standing on (y, x) when the index was last rebuilt. '''
+        found = []
+        i = self.first[y * self.width + x]
+        while i != EMPTY:
+            found.append(self.characters[i])
+            i = self.next[i]
+        return found
+
+    def collisions(self, character):
+        ''' Every other character meeting character this update: on the same square, or
+            swapped with it (each now stands where the other stood before, portals included).
+            A list, or an empty tuple when there are none (the usual case, allocation free). '''
+        slot = self._slots[character]
+        here, before = self.square[slot], self.previous[slot]
+        characters, following, previous = self.characters, self.next, self.previous
+        met = ()
+
+        i = self.first[here]
+        while i != EMPTY:
+            if i != slot:
+                met = met or []
+                met.append(characters[i])
+            i = following[i]
+
+        if before != EMPTY and before != here:
+            i = self.first[before]
+            while i != EMPTY:
+                if i != slot and previous[i] == here:
+                    met = met or []
+                    met.append(characters[i])
+                i = following[i]
+        return met
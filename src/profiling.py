@@ -0,0 +1,131 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_DIR = Path(__file__).resolve().parent / "profiles"
+
+Function = Tuple[str, int, str]                 # pstats' key: (filename, first line, name)
+
+
+class ProfileCapture:
+    """
+    A profiling window over the running game, started and stopped from the Tk thread (see
+    the F9 binding in main.pyw). Two profilers run side by side:
+
+    - cProfile on the Tk thread, which runs the game: exact call counts and times, written
+      as ``tk-<time>.pstats``;
+    - a sampler thread that reads every thread's stack (the BLE thread included) every
+      ``interval`` seconds, written as ``sampled-<time>.pstats`` and as collapsed stacks,
+      ``<time>.collapsed`` (one ``thread;outer;...;inner count`` line per stack), ready for
+      flamegraph.pl or speedscope.
+
+    The sampler stops by itself after ``seconds``; stop() must still be called on the Tk
+    thread to end the cProfile run and write the files.
+    """
+
+    def __init__(self, out_dir=PROFILE_DIR, seconds: float = 10.0, interval: float = 0.005):
+        self.out_dir = Path(out_dir)
+        self.seconds = seconds
+        self.interval = interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()           # (thread name, (Function, ...) outer first) -> samples
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self) -> None:
+        """Starts profiling the calling (Tk) thread and sampling every thread."""
+        if self.running:
+            return
+        self._stacks.clear()
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> List[Path]:
+        """Stops both profilers and writes their files; returns the paths written."""
+        if not self.running:
+            return []
+        self._profile.disable()
+        profile, self._profile = self._profile, None
+        self._stop.set()
+        self._sampler.join()
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = [self.out_dir / f"tk-{stamp}.pstats", self.out_dir / f"sampled-{stamp}.pstats",
+                 self.out_dir / f"{stamp}.collapsed"]
+        profile.dump_stats(paths[0])
+        pstats.Stats(_SampledStats(self._stacks, self.interval)).dump_stats(paths[1])
+        self._write_collapsed(paths[2])
+        return paths
+
+    # ------------------------------------------------------------ #
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        deadline = self._started + self.seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self._stacks[(names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+
+    def _write_collapsed(self, path: Path) -> None:
+        with open(path, "w") as f:
+            for (thread, stack), count in sorted(self._stacks.items(), key=lambda item: -item[1]):
+                frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+                f.write(f"{thread.replace(';', '_').replace(' ', '_')};{frames} {count}\n")
+
+
+class _SampledStats:
+    """Samples in the shape pstats.Stats loads (like a cProfile.Profile): times are estimates."""
+
+    def __init__(self, stacks: Counter, interval: float):
+        self._stacks, self._interval = stacks, interval
+        self.stats: Dict[Function, tuple] = {}
+
+    def create_stats(self) -> None:
+        own: Counter = Counter()            # samples with the function on top of the stack
+        inclusive: Counter = Counter()      # samples with the function anywhere on the stack
+        callers: Dict[Function, Counter] = {}
+        for (_, stack), count in self._stacks.items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers.setdefault(callee, Counter())[caller] += count
+
+        seconds = self._interval
+        self.stats = {
+            function: (samples, samples, own[function] * seconds, samples * seconds,
+                       {caller: (n, n, 0.0, n * seconds) for caller, n in callers.get(function, {}).items()})
+            for function, samples in inclusive.items()
+        }
+
+
+if __name__ == "__main__":
+    # Print the top of a capture:  python3 profiling.py profiles/sampled-....pstats [count]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    pstats.Stats(sys.argv[1]).sort_stats("cumulative").print_stats(count)
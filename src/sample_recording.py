@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import mmap
+import struct
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from balance_board import BalanceBoard, BoardTransport
+from tilt_filters import filter_factory
+
+# File layout:  16-byte header, then fixed 16-byte records of
+#               <float64 monotonic seconds, float32 pitch, float32 roll>
+HEADER  = struct.Struct("<4sHH8x")
+RECORD  = struct.Struct("<dff")
+MAGIC   = b"PBLR"
+VERSION = 1
+
+
+class SampleRecorder:
+    """
+    Appends every decoded sample to a fixed-record binary file.  ``append`` packs into a
+    preallocated buffer (no allocation on the notification path); full buffers are
+    handed to a background thread that does the actual disk writes.
+    """
+
+    def __init__(self, path, buffer_records: int = 4096, buffers: int = 4):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            _check_header(self.path)
+
+        size = RECORD.size * buffer_records
+        self._free   = deque(bytearray(size) for _ in range(buffers))
+        self._full   = deque()                  # (buffer, used bytes)
+        self._buf    = self._free.popleft()
+        self._pos    = 0
+        self._size   = size
+
+        self._lock   = threading.Lock()
+        self._wake   = threading.Event()
+        self._closed = False
+        self.records_written = 0
+        self.records_dropped = 0                # writer fell behind and no buffer was free
+
+        self._writer = threading.Thread(target=self._write_loop, name="sample-recorder", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------ #
+    def append(self, timestamp: float, pitch: float, roll: float) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._pos == self._size and not self._swap():
+                self.records_dropped += 1
+                return
+            RECORD.pack_into(self._buf, self._pos, timestamp, pitch, roll)
+            self._pos += RECORD.size
+
+    def flush(self) -> None:
+        """Hand the partially filled buffer to the writer and wait for it to reach disk."""
+        with self._lock:
+            if self._pos:
+                self._swap()
+        while self._full:
+            self._wake.set()
+            time.sleep(0.001)
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self._file.close()
+
+    def __enter__(self) -> "SampleRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------ #
+    def _swap(self) -> bool:
+        """Queue the current buffer for writing.  Caller must hold ``_lock``."""
+        if not self._free:
+            return False
+        self._full.append((self._buf, self._pos))
+        self._buf, self._pos = self._free.popleft(), 0
+        self._wake.set()
+        return True
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._full:
+                buf, used = self._full[0]
+                self._file.write(memoryview(buf)[:used])
+                self.records_written += used // RECORD.size
+                self._full.popleft()
+                self._free.append(buf)
+            if self._closed:
+                return
+
+
+class RecordedSession:
+    """Read-only, memory-mapped view of a recording.  Indexing returns (timestamp, pitch, roll)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        _check_header(self.path)
+        self._file = open(self.path, "rb")
+        length = self.path.stat().st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if length else None
+        self._count = max(0, length - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Tuple[float, float, float]:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+
+    def __iter__(self) -> Iterator[Tuple[float, float, float]]:
+        for offset in range(HEADER.size, HEADER.size + self._count * RECORD.size, RECORD.size):
+            yield RECORD.unpack_from(self._mm, offset)
+
+    def samples(self) -> Iterator[Tuple[float, float]]:
+        """(pitch, roll) only — suitable as ``SimulatedTransport(samples=...)``."""
+        for _, pitch, roll in self:
+            yield pitch, roll
+
+    def duration(self) -> float:
+        return self[-1][0] - self[0][0] if self._count else 0.0
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+
+class ReplayTransport(BoardTransport):
+    """
+    Streams a recording back through the board's notification handler with its original
+    timing scaled by ``speed`` (1.0 real time, 4.0 four times faster, None as fast as possible).
+    Samples carry their recorded timestamps, so time-based filters behave as they did live.
+    """
+
+    def __init__(self, path, speed: Optional[float] = 1.0):
+        self.session = RecordedSession(path)
+        self.speed = speed
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self, board: BalanceBoard) -> None:
+        pack = struct.Struct(board._NOTIFY_FORMAT).pack
+        board._mark_connected()
+
+        start_wall = time.perf_counter()
+        start_ts = None
+        for timestamp, pitch, roll in self.session:
+            if self._stop.is_set():
+                break
+            if start_ts is None:
+                start_ts = timestamp
+            if self.speed:
+                delay = (timestamp - start_ts) / self.speed - (time.perf_counter() - start_wall)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            board._notification_handler(0, bytearray(pack(pitch, roll)), timestamp)
+
+        board._mark_disconnected()
+
+
+def replay_directions(path, board: Optional[BalanceBoard] = None, **board_kwargs) -> List[Tuple[float, Optional[str]]]:
+    """
+    Offline, single-threaded replay: feeds every recorded sample through ``board`` (a new
+    BalanceBoard built from ``board_kwargs`` if omitted) and returns the direction changes
+    as (timestamp, direction) — handy for tuning thresholds against real sessions.
+    """
+    if board is None:
+        board = BalanceBoard("00:00:00:00:00:00", **board_kwargs)
+    session = RecordedSession(path)
+    pack = struct.Struct(board._NOTIFY_FORMAT).pack
+
+    changes, last = [], None
+    try:
+        for timestamp, pitch, roll in session:
+            board._notification_handler(0, bytearray(pack(pitch, roll)), timestamp)
+            direction = board.get_direction()
+            if direction != last:
+                changes.append((timestamp, direction))
+                last = direction
+    finally:
+        session.close()
+    return changes
+
+
+def measure_prediction(path, window: float = 0.5, **board_kwargs) -> dict:
+    """
+    Replay a recording with and without ``predictive=True`` and compare gesture onsets:
+    how much earlier each real gesture fired, and how many early fires were false starts.
+    """
+    baseline = replay_directions(path, predictive=False, **board_kwargs)
+    board = BalanceBoard("00:00:00:00:00:00", predictive=True, **board_kwargs)
+    predicted = replay_directions(path, board)
+
+    onsets = [(t, d) for t, d in predicted if d is not None]
+    leads = []
+    for t, direction in baseline:
+        if direction is None:
+            continue
+        # latest predictive onset of the same direction shortly before the baseline onset
+        earlier = [pt for pt, pd in onsets if pd == direction and t - window <= pt <= t]
+        if earlier:
+            leads.append(t - earlier[-1])
+
+    stats = board.prediction_stats()
+    leads.sort()
+    return {
+        "gestures":            len(leads),
+        "mean_lead_ms":        sum(leads) / len(leads) * 1e3 if leads else 0.0,
+        "p50_lead_ms":         leads[len(leads) // 2] * 1e3 if leads else 0.0,
+        "early_fires":         stats["fired"],
+        "false_starts":        stats["cancelled"],
+        "false_positive_rate": stats["cancelled"] / stats["fired"] if stats["fired"] else 0.0,
+    }
+
+
+def check_retractions(path, **board_kwargs) -> dict:
+    """
+    Replay check of predictive mode against the game: feeds a recording through a predictive
+    BalanceBoard into a headless game's direction queue, drained after every sample, and
+    checks that each cancelled prediction left Pacman's direction and buffered turn as they
+    were before it fired.  ``mismatches`` should be 0.
+    """
+    from board import Board
+    from gameImage import HeadlessImages
+
+    game = Board(1280, 720, HeadlessImages())
+    game.new_level()
+    board = BalanceBoard("00:00:00:00:00:00", predictive=True, **board_kwargs)
+    board.direction_sink = game.directions
+    pack = struct.Struct(board._NOTIFY_FORMAT).pack
+
+    def turn_state():
+        return game.pacman.direction, game.pacman.next_direction
+
+    session = RecordedSession(path)
+    before_fire, checked, mismatches = None, 0, 0
+    try:
+        for timestamp, pitch, roll in session:
+            state, fired, cancelled = turn_state(), board.predictions_fired, board.predictions_cancelled
+            board._notification_handler(0, bytearray(pack(pitch, roll)), timestamp)
+            game._consume_directions()
+            if board.predictions_fired != fired:
+                before_fire = state
+            if board.predictions_cancelled != cancelled:
+                checked += 1
+                mismatches += turn_state() != before_fire
+    finally:
+        session.close()
+    return {"cancelled_checked": checked, "mismatches": mismatches}
+
+
+def _check_header(path: Path) -> None:
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+    if len(head) < HEADER.size:
+        raise ValueError(f"{path} is not a balance board recording (truncated header)")
+    magic, version, record_size = HEADER.unpack(head)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a v{VERSION} balance board recording")
+
+
+# ──────────────────────────────────────────────────────────────────────────
+#  python sample_recording.py info  session.bin
+#  python sample_recording.py tune  session.bin --activate 5 --release 3 --avg 5
+#  python sample_recording.py tune  session.bin --filter median:3+oneeuro
+#  python sample_recording.py tune  session.bin --predictive --horizon 0.08
+# ──────────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and replay balance board recordings.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    tune = sub.add_parser("tune")
+    tune.add_argument("path")
+    tune.add_argument("--activate", type=float, default=5.0)
+    tune.add_argument("--release", type=float, default=3.0)
+    tune.add_argument("--avg", type=int, default=BalanceBoard._AVG_SAMPLES)
+    tune.add_argument("--filter", default=None, help="tilt filter spec, overrides --avg")
+    tune.add_argument("--predictive", action="store_true", help="compare predictive mode against plain")
+    tune.add_argument("--horizon", type=float, default=0.08, help="prediction horizon (s)")
+    tune.add_argument("--min-velocity", type=float, default=25.0, help="prediction velocity floor (deg/s)")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        session = RecordedSession(args.path)
+        seconds = session.duration()
+        print(f"{len(session)} samples over {seconds:.1f} s "
+              f"({len(session) / seconds if seconds else 0:.1f} Hz)")
+        session.close()
+    elif args.predictive:
+        result = measure_prediction(
+            args.path, activate_thresh=args.activate, release_thresh=args.release,
+            tilt_filter=filter_factory(args.filter) if args.filter else None,
+            predict_horizon=args.horizon, predict_min_velocity=args.min_velocity,
+        )
+        result.update(check_retractions(
+            args.path, activate_thresh=args.activate, release_thresh=args.release,
+            tilt_filter=filter_factory(args.filter) if args.filter else None,
+            predict_horizon=args.horizon, predict_min_velocity=args.min_velocity,
+        ))
+        for key, value in result.items():
+            print(f"{key:20} {value:.3f}" if isinstance(value, float) else f"{key:20} {value}")
+    else:
+        tuned = type("TunedBalanceBoard", (BalanceBoard,), {"_AVG_SAMPLES": args.avg})
+        board = tuned("00:00:00:00:00:00", activate_thresh=args.activate, release_thresh=args.release,
+                      tilt_filter=filter_factory(args.filter) if args.filter else None)
+        changes = replay_directions(args.path, board)
+        fired = [c for c in changes if c[1] is not None]
+        print(f"{len(fired)} gestures fired, smoothing delay ≈ {board.group_delay() * 1e3:.0f} ms")
+        for timestamp, direction in changes:
+            print(f"{timestamp - changes[0][0]:9.3f}s  {direction or '-'}")
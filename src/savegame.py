@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import os
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from maze import BOOST, PICKUP, DIRECTIONS
+from snapshot import BoardSnapshot, FIELDS, NONE, _DIRECTION_CODES
+
+# File layout (little-endian):
+#   HEADER   magic, version, characters, maze key (sha256 of the maze), width, height, tick
+#   STATS    Pacman's score, life_score, lives, level, invulnerable_ticks, last/next direction,
+#            is_respawning, death, and the board's game_over
+#   entities characters * FIELDS int32 (see snapshot.py), Pacman first
+#   choices  (characters - 1) float64, the enemies' last random choices
+#   pickups  one bit per square, set where a pickup is still on the board
+#   RNG      random.getstate(): version, word count, words (uint32), gauss flag and value
+HEADER  = struct.Struct("<4sHH16sHHI")
+STATS   = struct.Struct("<iiiiibbBBB")
+RNG     = struct.Struct("<BH")
+GAUSS   = struct.Struct("<?d")
+MAGIC   = b"PBSV"
+VERSION = 1
+
+
+class SaveError(ValueError):
+    """A save file that is damaged, from another version, or for another maze or ghost count."""
+
+
+def maze_key(maze) -> bytes:
+    """16 bytes identifying the maze a save belongs to."""
+    return hashlib.sha256(maze.to_bytes()).digest()[:16]
+
+
+def pickup_bits(maze) -> bytearray:
+    """The pickup bitmap of a level nobody has eaten from yet."""
+    bits = bytearray((len(maze.cells) + 7) // 8)
+    for i, code in enumerate(maze.cells):
+        if code == PICKUP or code == BOOST:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+
+def encode(maze, snapshot: BoardSnapshot, key: Optional[bytes] = None, bits: Optional[bytearray] = None) -> bytes:
+    """
+    A snapshot (taken with with_rng=True for an exact resume) in the save format. Only reads
+    the snapshot and the maze, which never change, so it is safe on any thread. ``key`` and
+    ``bits`` are maze_key() and pickup_bits(), for callers that encode repeatedly.
+    """
+    bits = bytearray(bits if bits is not None else pickup_bits(maze))
+    for square in snapshot.eaten[:snapshot.eaten_count]:
+        bits[square >> 3] &= ~(1 << (square & 7))
+
+    score, life_score, lives, level, last_direction, next_direction, respawning, ticks, death = snapshot.pacman
+    parts = [HEADER.pack(MAGIC, VERSION, len(snapshot.entities) // FIELDS, key or maze_key(maze),
+                         maze.width, maze.height, snapshot.tick),
+             STATS.pack(score, life_score, lives, level, ticks, _DIRECTION_CODES[last_direction],
+                        _DIRECTION_CODES[next_direction], respawning, death, snapshot.game_over),
+             snapshot.entities.tobytes(), snapshot.last_choices.tobytes(), bytes(bits)]
+
+    if snapshot.rng is not None:
+        version, words, gauss = snapshot.rng
+        parts += [RNG.pack(version, len(words)), array("I", words).tobytes(),
+                  GAUSS.pack(gauss is not None, gauss or 0.0)]
+    return b"".join(parts)
+
+
+def decode(maze, data: bytes, characters: int) -> BoardSnapshot:
+    """The snapshot in a save, checked against the maze and number of characters it is loaded into."""
+    try:
+        magic, version, count, key, width, height, tick = HEADER.unpack_from(data)
+    except struct.error:
+        raise SaveError("save file is truncated") from None
+    if magic != MAGIC:
+        raise SaveError("not a save file")
+    if version != VERSION:
+        raise SaveError(f"save version {version}, expected {VERSION}")
+    if key != maze_key(maze) or (width, height) != (maze.width, maze.height):
+        raise SaveError("save is for another maze")
+    if count != characters:
+        raise SaveError(f"save has {count} characters, the board {characters}")
+
+    try:
+        offset = HEADER.size
+        (score, life_score, lives, level, ticks, last_direction, next_direction,
+         respawning, death, game_over) = STATS.unpack_from(data, offset)
+        offset += STATS.size
+
+        entities = array("i")
+        entities.frombytes(data[offset:offset + count * FIELDS * entities.itemsize])
+        offset += count * FIELDS * entities.itemsize
+        choices = array("d")
+        choices.frombytes(data[offset:offset + (count - 1) * choices.itemsize])
+        offset += (count - 1) * choices.itemsize
+
+        size = (width * height + 7) // 8
+        bits = data[offset:offset + size]
+        offset += size
+        if len(entities) != count * FIELDS or len(choices) != count - 1 or len(bits) != size:
+            raise SaveError("save file is truncated")
+
+        rng = None
+        if offset < len(data):
+            rng_version, length = RNG.unpack_from(data, offset)
+            offset += RNG.size
+            words = array("I")
+            words.frombytes(data[offset:offset + length * words.itemsize])
+            offset += length * words.itemsize
+            has_gauss, gauss = GAUSS.unpack_from(data, offset)
+            rng = (rng_version, tuple(words), gauss if has_gauss else None)
+    except (struct.error, ValueError) as e:
+        raise SaveError(f"save file is damaged: {e}") from None
+
+    start = pickup_bits(maze)
+    eaten = [square for square in range(width * height)
+             if start[square >> 3] >> (square & 7) & 1 and not bits[square >> 3] >> (square & 7) & 1]
+    pacman = (score, life_score, lives, level, _direction(last_direction), _direction(next_direction),
+              bool(respawning), ticks, bool(death))
+    return BoardSnapshot.from_record(tick, eaten, bool(game_over), pacman, entities, choices, rng)
+
+
+def _direction(code: int) -> Optional[str]:
+    return DIRECTIONS[code] if code != NONE else None
+
+
+def save(board, path) -> None:
+    """Writes the board's game to path straight away (see CheckpointWriter for the tick loop)."""
+    _write(Path(path), encode(board.maze, board.snapshot(with_rng=True)))
+
+
+def resume(board, path) -> BoardSnapshot:
+    """Loads a save into a board that has started a level on the same maze, ghost count included."""
+    snapshot = decode(board.maze, Path(path).read_bytes(), len(board.enemies) + 1)
+    board.directions.clear()
+    board.restore(snapshot)
+    return snapshot
+
+
+def _write(path: Path, data: bytes) -> None:
+    """Atomic and durable: a crash leaves either the previous save or this one, never half."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(partial, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+class CheckpointWriter:
+    """
+    Saves the game in the background. ``checkpoint`` only takes a snapshot on the calling
+    (Tk) thread, tens of microseconds; encoding and the disk write happen on a writer
+    thread. Checkpoints arriving faster than the disk keeps up replace the pending one.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.writes = 0
+        self.replaced = 0                       # checkpoints superseded before they were written
+        self.errors = 0
+        self._maze = self._key = self._bits = None
+        self._pending = None
+        self._discard = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    def checkpoint(self, board) -> None:
+        snapshot = board.snapshot(with_rng=True)
+        with self._lock:
+            if self._pending is not None:
+                self.replaced += 1
+            self._pending = (board.maze, snapshot)
+        self._wake.set()
+
+    def discard(self) -> None:
+        """The game is over: drop any pending checkpoint and delete the save."""
+        with self._lock:
+            self._pending = None
+            self._discard = True
+        self._wake.set()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, None
+                discard, self._discard = self._discard, False
+                closed = self._closed
+
+            if discard:
+                try:
+                    self.path.unlink()
+                except FileNotFoundError:
+                    pass
+            elif pending is not None:
+                maze, snapshot = pending
+                if maze is not self._maze:              # writer thread only
+                    self._maze, self._key, self._bits = maze, maze_key(maze), pickup_bits(maze)
+                try:
+                    _write(self.path, encode(maze, snapshot, self._key, self._bits))
+                    self.writes += 1
+                except OSError as e:
+                    self.errors += 1
+                    print(f"[WARN] checkpoint not saved: {e}")
+            if closed:
+                return
+
+
+# ------------------------------------------------------------------ command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect save files and time saving/resuming a game.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="print what a save holds (classic maze)")
+    info.add_argument("save")
+    bench = sub.add_parser("bench", help="size and cost of a save against ghost count")
+    bench.add_argument("per_type", type=int, nargs="*", default=[1, 16, 256])
+    args = parser.parse_args()
+
+    import random
+    import time
+    from board import Board
+    from gameImage import HeadlessImages
+
+    if args.command == "info":
+        data = Path(args.save).read_bytes()
+        count = HEADER.unpack_from(data)[2]
+        board = Board(1280, 720, HeadlessImages(), ghosts_per_type=max(1, (count - 1) // 4))
+        board.new_level()
+        snapshot = resume(board, args.save)
+        p = board.pacman
+        print(f"{len(data)} bytes, version {VERSION}: tick {snapshot.tick}, level {p.level}, score {p.score}, "
+              f"lives {p.lives}, {board._pickups_left} pickups left, {len(board.enemies)} ghosts")
+    else:
+        path = Path("checkpoint-bench.bin")
+        print(f"{'ghosts':>7} {'bytes':>7} {'snapshot':>9} {'encode':>8} {'load':>8}   (ms)")
+        for per_type in args.per_type:
+            random.seed(0)
+            board = Board(1280, 720, HeadlessImages(), ghosts_per_type=per_type)
+            board.new_level()
+            for tick in range(40):
+                board.directions.push(random.choice(DIRECTIONS))
+                board.update_directions()
+                board.update_board()
+
+            start = time.perf_counter()
+            snapshot = board.snapshot(with_rng=True)
+            taken = time.perf_counter()
+            data = encode(board.maze, snapshot)
+            encoded = time.perf_counter()
+            _write(path, data)
+            loaded_start = time.perf_counter()
+            resume(board, path)
+            loaded = time.perf_counter()
+            print(f"{len(board.enemies):7d} {len(data):7d} {(taken - start) * 1e3:9.3f} "
+                  f"{(encoded - taken) * 1e3:8.3f} {(loaded - loaded_start) * 1e3:8.3f}")
+        path.unlink()
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import math
+import random
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+from balance_board import BalanceBoard, BoardTransport
+
+
+def synthetic_leans(
+    rate_hz: float,
+    amplitude: float = 12.0,      # peak lean in degrees
+    hold_sec: float = 0.6,        # time held at the peak
+    ramp_sec: float = 0.25,       # time to lean in / come back
+    rest_sec: float = 0.4,        # time flat between gestures
+    noise: float = 0.3,           # gaussian sensor noise (degrees)
+    seed: Optional[int] = None,
+) -> Iterator[Tuple[float, float]]:
+    """
+    Endless (pitch, roll) stream that leans forward, left, right and back in turn,
+    with trapezoid ramps and a little sensor noise — roughly what a player does.
+    """
+    rng = random.Random(seed)
+    # (pitch sign, roll sign) in raw sensor axes; roll is inverted by get_tilt()
+    leans = [(1, 0), (0, 1), (0, -1), (-1, 0)]
+    ramp  = max(1, int(ramp_sec * rate_hz))
+    hold  = max(1, int(hold_sec * rate_hz))
+    rest  = max(1, int(rest_sec * rate_hz))
+    envelope = (
+        [i / ramp for i in range(ramp)]
+        + [1.0] * hold
+        + [1.0 - i / ramp for i in range(ramp)]
+        + [0.0] * rest
+    )
+
+    while True:
+        for dp, dr in leans:
+            for level in envelope:
+                yield (
+                    dp * amplitude * level + rng.gauss(0.0, noise),
+                    dr * amplitude * level + rng.gauss(0.0, noise),
+                )
+
+
+class SimulatedTransport(BoardTransport):
+    """
+    Stand-in for the Arduino.  Emits packets at ``rate_hz`` (up to 1 kHz) from either
+    a recorded (pitch, roll) iterable or :func:`synthetic_leans`, optionally with timing
+    jitter, packet loss and periodic disconnects, through the real notification handler.
+    """
+
+    MAX_RATE_HZ = 1000.0
+
+    def __init__(
+        self,
+        samples: Optional[Iterable[Tuple[float, float]]] = None,
+        rate_hz: float = 50.0,
+        jitter: float = 0.0,                       # std-dev of inter-packet delay (s)
+        loss: float = 0.0,                         # probability a packet is dropped
+        disconnect_every: Optional[float] = None,  # mean seconds between link drops
+        reconnect_delay: float = 1.0,
+        duration: Optional[float] = None,          # stop after this many seconds
+        seed: Optional[int] = None,
+    ):
+        if not 0 < rate_hz <= self.MAX_RATE_HZ:
+            raise ValueError(f"rate_hz must be in (0, {self.MAX_RATE_HZ:.0f}], got {rate_hz}")
+        if not 0.0 <= loss < 1.0:
+            raise ValueError(f"loss must be in [0, 1), got {loss}")
+
+        self.rate_hz = rate_hz
+        self.jitter = jitter
+        self.loss = loss
+        self.disconnect_every = disconnect_every
+        self.reconnect_delay = reconnect_delay
+        self.duration = duration
+        self._rng = random.Random(seed)
+        self._samples = samples if samples is not None else synthetic_leans(rate_hz, seed=seed)
+
+        # statistics
+        self.packets_sent    = 0
+        self.packets_dropped = 0
+        self.handler_time    = 0.0     # total seconds spent inside the notification handler
+        self.max_lateness    = 0.0     # worst delay between schedule and delivery (s)
+
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self, board: BalanceBoard) -> None:
+        period = 1.0 / self.rate_hz
+        pack = struct.Struct(board._NOTIFY_FORMAT).pack
+        handler = board._notification_handler
+        clock = time.perf_counter
+
+        start = clock()
+        deadline = start
+        next_drop = self._next_disconnect(start)
+        board._mark_connected()
+
+        for pitch, roll in self._samples:
+            if self._stop.is_set() or (self.duration is not None and deadline - start >= self.duration):
+                break
+
+            deadline += max(0.0, period + (self._rng.gauss(0.0, self.jitter) if self.jitter else 0.0))
+            delay = deadline - clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.max_lateness = max(self.max_lateness, -delay)
+
+            if next_drop is not None and deadline >= next_drop:
+                board._mark_disconnected()
+                await asyncio.sleep(self.reconnect_delay)
+                deadline = clock()
+                next_drop = self._next_disconnect(deadline)
+                board._mark_connected()
+
+            if self.loss and self._rng.random() < self.loss:
+                self.packets_dropped += 1
+                continue
+
+            t0 = clock()
+            handler(0, bytearray(pack(pitch, roll)))
+            self.handler_time += clock() - t0
+            self.packets_sent += 1
+
+        board._mark_disconnected()
+
+    def _next_disconnect(self, now: float) -> Optional[float]:
+        if not self.disconnect_every:
+            return None
+        return now + self._rng.expovariate(1.0 / self.disconnect_every)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+#  Stress benchmark:  python simulated_board.py --rate 1000 --seconds 10
+# ──────────────────────────────────────────────────────────────────────────
+def _benchmark(args) -> None:
+    transport = SimulatedTransport(
+        rate_hz=args.rate, jitter=args.jitter, loss=args.loss,
+        disconnect_every=args.disconnect_every, duration=args.seconds, seed=args.seed,
+    )
+    board = BalanceBoard("00:00:00:00:00:00", transport=transport)
+    board.start()
+    board.wait_until_connected(timeout=5)
+
+    # poll the way main.pyw does, but as fast as the game ever could
+    changes, polls, last = 0, 0, None
+    poll_time = 0.0
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        direction = board.get_direction()
+        poll_time += time.perf_counter() - t0
+        polls += 1
+        if direction != last:
+            changes, last = changes + 1, direction
+        time.sleep(args.poll_ms / 1000)
+    transport.stop()
+
+    sent = max(1, transport.packets_sent)
+    print(f"packets sent      : {transport.packets_sent} ({transport.packets_sent / args.seconds:.0f}/s)")
+    print(f"packets dropped   : {transport.packets_dropped}")
+    print(f"disconnects       : {board.disconnects}")
+    print(f"handler cost      : {transport.handler_time / sent * 1e6:.1f} µs/packet")
+    print(f"max lateness      : {transport.max_lateness * 1e3:.2f} ms")
+    print(f"get_direction cost: {poll_time / max(1, polls) * 1e6:.1f} µs/poll ({polls} polls)")
+    print(f"direction changes : {changes}  (expected ≈ {math.floor(args.seconds / 1.5) * 2})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive BalanceBoard from a simulated board.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="packets per second (≤ 1000)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--jitter", type=float, default=0.0, help="inter-packet std-dev (s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability")
+    parser.add_argument("--disconnect-every", type=float, default=None, help="mean seconds between drops")
+    parser.add_argument("--poll-ms", type=float, default=1.0, help="get_direction() poll interval")
+    parser.add_argument("--seed", type=int, default=None)
+    _benchmark(parser.parse_args())
@@ -0,0 +1,134 @@
+import pacman           # before enemy, the two modules import each other
+from enemy import Enemy
+from maze import DIRECTIONS
+from array import array
+import random
+
+# one row of BoardSnapshot.entities per character, Pacman first, then board.enemies in order
+Y, X, DIRECTION, LAST_Y, LAST_X, INVULNERABLE, SLOWED_DOWN, MOVEMENT_TURNS = range(8)
+FIELDS = 8
+NONE = -1               # no direction / no last location / no last choice
+_NO_LOCATION = NONE, NONE
+_DIRECTION_CODES = { direction: code for code, direction in enumerate(DIRECTIONS) }
+_DIRECTION_CODES[None] = NONE
+
+
+class BoardSnapshot():
+    ''' The game state of a Board at one update, cheap enough to take every tick (see
+        Board.snapshot() and Board.restore()).
+
+        The pickup layer is not copied. Within a level pickups are only ever eaten, so the
+        board keeps an append-only log of the squares eaten; a snapshot holds that log and
+        how far it went, and a restore only puts back (or eats again) the pickups in between.
+        The log is copied on write, when play carries on from a rewound point, so the other
+        snapshots keep their history. The characters are a small record array of ints. '''
+
+    __slots__ = ('tick', 'eaten', 'eaten_count', 'game_over', 'pacman',
+                 'entities', 'last_choices', 'images', 'rng')
+
+    def __init__(self, board, with_rng = False):
+        self.tick = board.ticks
+        self.eaten = board._eaten
+        self.eaten_count = board._eaten_count
+        self.game_over = board.game_over
+
+        p = board.pacman
+        self.pacman = ( p.score, p.life_score, p.lives, p.level, p.last_direction, p.next_direction,
+                        p.is_respawning, p.invulnerable_ticks, p.death )
+
+        record = []
+        codes = _DIRECTION_CODES
+        for character in board.characters():
+            last_y, last_x = character.last_location or _NO_LOCATION
+            record += ( character.y, character.x, codes[character.direction], last_y, last_x,
+                        character.invulnerable, getattr(character, 'slowed_down', False),
+                        getattr(character, 'movement_turns', 0) )
+        self.entities = array('i', record)
+        choices = ( getattr(enemy, 'last_choice', None) for enemy in board.enemies )
+        self.last_choices = array('d', [ NONE if choice is None else choice for choice in choices ])
+        self.images = tuple( character._image for character in board.characters() )
+
+        # the enemies draw from the global random(); needed to replay the same game from here
+        self.rng = random.getstate() if with_rng else None
+
+    @classmethod
+    def from_record(cls, tick, eaten, game_over, pacman, entities, last_choices, rng = None):
+        ''' A snapshot rebuilt from its fields, e.g. read back from a save file (see savegame.py).
+            The images are worked out again from the characters' state on restore. '''
+        snapshot = cls.__new__(cls)
+        snapshot.tick, snapshot.eaten, snapshot.eaten_count = tick, eaten, len(eaten)
+        snapshot.game_over, snapshot.pacman, snapshot.rng = game_over, pacman, rng
+        snapshot.entities, snapshot.last_choices, snapshot.images = entities, last_choices, None
+        return snapshot
+
+    def __repr__(self):
+        return f'<BoardSnapshot tick {self.tick}, level {self.pacman[3]}, {self.eaten_count} pickups eaten>'
+
+    def restore_characters(self, board) -> None:
+        ''' Puts Pacman and every enemy back as they were (the pickups are Board.restore()'s). '''
+        p = board.pacman
+        ( p.score, p.life_score, p.lives, p.level, p.last_direction, p.next_direction,
+          p.is_respawning, p.invulnerable_ticks, p.death ) = self.pacman
+
+        entities = self.entities
+        images = self.images if self.images is not None else [None] * len(entities)
+        for i, (character, image) in enumerate( zip(board.characters(), images) ):
+            row = i * FIELDS
+            character.y, character.x = entities[row + Y], entities[row + X]
+            direction = entities[row + DIRECTION]
+            character.direction = DIRECTIONS[direction] if direction != NONE else None
+            last_y = entities[row + LAST_Y]
+            character.last_location = (last_y, entities[row + LAST_X]) if last_y != NONE else None
+            character.invulnerable = bool(entities[row + INVULNERABLE])
+            character._image = image
+
+        for i, (enemy, choice) in enumerate( zip(board.enemies, self.last_choices), 1 ):
+            enemy.slowed_down = bool(entities[i * FIELDS + SLOWED_DOWN])
+            if enemy.enemy_type == Enemy.inky or enemy.enemy_type == Enemy.clyde:
+                enemy.movement_turns = entities[i * FIELDS + MOVEMENT_TURNS]
+                enemy.last_choice = choice if choice != NONE else None
+
+        if self.images is None:
+            p.direction_image(board.images)
+            for enemy in board.enemies:
+                enemy.determine_image(enemy.enemy_type, board.images)
+
+        if self.rng is not None:
+            random.setstate(self.rng)
+
+
+if __name__ == '__main__':
+    # Cost of a snapshot and of rewinding to it, against copying the whole Gamestate.
+    import time
+    from board import Board
+    from gameImage import HeadlessImages
+
+    random.seed(0)
+    board = Board(1280, 720, HeadlessImages())
+    board.new_level()
+    moves = ('Left', 'Right', 'Up', 'Down')
+    repeats = 2000
+
+    def per_call(step):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            step()
+        return (time.perf_counter() - start) / repeats * 1e6
+
+    for tick in range(60):
+        if tick % 7 == 0:
+            board.directions.push(random.choice(moves))
+        board.update_directions()
+        board.update_board()
+    snapshot = board.snapshot()
+
+    for tick in range(30):                      # play on, then rewind 30 updates
+        board.update_directions()
+        board.update_board()
+    rewind = board.snapshot()
+
+    print(f'{"snapshot":22} {per_call(board.snapshot):8.1f} us')
+    print(f'{"snapshot + rng":22} {per_call(lambda: board.snapshot(with_rng = True)):8.1f} us')
+    print(f'{"rewind 30 updates":22} {per_call(lambda: (board.restore(snapshot), board.restore(rewind))) / 2:8.1f} us')
+    print(f'{"full Gamestate copy":22} {per_call(lambda: [ row[:] for row in board.Gamestate ]):8.1f} us')
+    print(snapshot, rewind, sep = '\n')
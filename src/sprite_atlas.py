@@ -0,0 +1,106 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from PIL import Image
+
+ATLAS_WIDTH = 128
+PADDING = 1
+
+
+def atlas_paths(images_dir: Path):
+    """static/atlas/sprites.png and its index, next to static/images."""
+    atlas_dir = images_dir.parent / "atlas"
+    return atlas_dir / "sprites.png", atlas_dir / "sprites.json"
+
+
+def _source(path: Path) -> dict:
+    """What the atlas records of a sprite file, to tell when it has changed."""
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "sha1": hashlib.sha1(path.read_bytes()).hexdigest()}
+
+
+def _unchanged(path: Path, recorded: dict) -> bool:
+    """Same size and mtime, or (after a checkout, which resets mtimes) the same content."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != recorded.get("size"):
+        return False
+    if stat.st_mtime_ns == recorded.get("mtime_ns"):
+        return True
+    return hashlib.sha1(path.read_bytes()).hexdigest() == recorded.get("sha1")
+
+
+def build_atlas(images_dir: Path, names: Iterable[str]) -> Path:
+    """
+    Packs the named sprites from images_dir into one RGBA sheet (simple shelf packing,
+    tallest first) and writes it with a JSON index of name -> its box [x, y, width,
+    height] and the source file's size, mtime and SHA-1, which load_atlas checks.
+    """
+    sprites = {}
+    for name in names:
+        with Image.open(images_dir / f"{name}.png") as image:
+            sprites[name] = image.convert("RGBA")
+
+    boxes, x, y, shelf = {}, 0, 0, 0
+    for name in sorted(sprites, key=lambda n: (-sprites[n].height, n)):
+        width, height = sprites[name].size
+        if x + width > ATLAS_WIDTH:
+            x, y, shelf = 0, y + shelf + PADDING, 0
+        boxes[name] = [x, y, width, height]
+        x += width + PADDING
+        shelf = max(shelf, height)
+
+    sheet = Image.new("RGBA", (ATLAS_WIDTH, y + shelf), (0, 0, 0, 0))
+    for name, (bx, by, _, _) in boxes.items():
+        sheet.paste(sprites[name], (bx, by))
+
+    sheet_path, index_path = atlas_paths(images_dir)
+    sheet_path.parent.mkdir(parents=True, exist_ok=True)
+    sheet.save(sheet_path, optimize=True)
+    index_path.write_text("{\n" + ",\n".join(
+        f'  "{name}": {json.dumps({"box": boxes[name], **_source(images_dir / f"{name}.png")})}'
+        for name in sorted(boxes)) + "\n}\n")
+    return sheet_path
+
+
+def load_atlas(images_dir: Path, names: Iterable[str]) -> Optional[Dict[str, Image.Image]]:
+    """
+    Decodes the atlas (one file read) and cuts out the named sprites. An atlas that lacks
+    one of the names, or that was built from a sprite file since edited, is rebuilt first.
+    Returns None when there is no atlas or it can not be rebuilt (e.g. a read-only
+    install), so the caller can fall back to the individual files.
+    """
+    names = list(names)
+    sheet_path, index_path = atlas_paths(images_dir)
+    if not (sheet_path.is_file() and index_path.is_file()):
+        return None
+
+    index = json.loads(index_path.read_text())
+    if any(not isinstance(index.get(name), dict) or not _unchanged(images_dir / f"{name}.png", index[name])
+           for name in names):
+        try:
+            build_atlas(images_dir, names)
+        except OSError as e:
+            print(f"[WARN] sprite atlas out of date and not rebuilt: {e}")
+            return None
+        index = json.loads(index_path.read_text())
+
+    with Image.open(sheet_path) as sheet:
+        sheet.load()
+        sprites = {}
+        for name, entry in index.items():
+            x, y, w, h = entry["box"]
+            sprites[name] = sheet.crop((x, y, x + w, y + h))
+        return sprites
+
+
+if __name__ == "__main__":
+    from gameImage import SPRITES, images_dir
+
+    path = build_atlas(images_dir(), SPRITES)
+    print(f"Wrote {path}")
@@ -0,0 +1,43 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class StartupTimeline:
+    """
+    Records when each startup step finished, relative to process start, from any
+    thread.  ``log`` prints the timeline so time-to-first-frame can be tracked.
+    """
+
+    def __init__(self):
+        self._origin = time.monotonic()
+        self._events: List[Tuple[float, str, str]] = []
+        self._lock = threading.Lock()
+        self._logged = False
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            self._events.append((time.monotonic() - self._origin, name, threading.current_thread().name))
+
+    def elapsed(self, name: str) -> Optional[float]:
+        with self._lock:
+            return next((t for t, n, _ in self._events if n == name), None)
+
+    def timed(self, name: str, func, *args, **kwargs):
+        """Run ``func`` and mark ``name`` when it returns — handy as an executor job."""
+        result = func(*args, **kwargs)
+        self.mark(name)
+        return result
+
+    def log(self) -> None:
+        with self._lock:
+            if self._logged:
+                return
+            self._logged = True
+            events = sorted(self._events)
+        print("[INFO] Startup timeline:")
+        for t, name, thread in events:
+            print(f"         {t * 1e3:8.1f} ms  {name:20} ({thread})")
+
+
+timeline = StartupTimeline()
@@ -0,0 +1,233 @@
+import argparse
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, List
+
+
+class TiltFilter(ABC):
+    """
+    One-axis smoothing stage.  ``update`` runs once per sample in the notification
+    handler and returns the filtered value; ``group_delay`` reports how far (in seconds)
+    the output lags the input at the given sample period.
+    """
+
+    @abstractmethod
+    def update(self, value: float, timestamp: float) -> float:
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+    @abstractmethod
+    def group_delay(self, sample_period: float) -> float:
+        ...
+
+
+class BoxcarFilter(TiltFilter):
+    """Plain N-sample moving average — the original BalanceBoard smoothing."""
+
+    def __init__(self, size: int = 5):
+        self.size = size
+        self.reset()
+
+    def reset(self) -> None:
+        self._window = deque(maxlen=self.size)
+        self._sum = 0.0
+
+    def update(self, value: float, timestamp: float) -> float:
+        if len(self._window) == self.size:
+            self._sum -= self._window[0]
+        self._window.append(value)
+        self._sum += value
+        return self._sum / len(self._window)
+
+    def group_delay(self, sample_period: float) -> float:
+        return (self.size - 1) / 2 * sample_period
+
+
+class EmaFilter(TiltFilter):
+    """Exponential moving average; ``alpha`` is the weight of the newest sample."""
+
+    def __init__(self, alpha: float = 0.5):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self) -> None:
+        self._value = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+    def group_delay(self, sample_period: float) -> float:
+        return (1.0 - self.alpha) / self.alpha * sample_period
+
+
+class OneEuroFilter(TiltFilter):
+    """
+    One-Euro filter (Casiez et al.): a low-pass whose cutoff rises with speed, so the
+    board is heavily smoothed at rest and nearly unfiltered while the player is leaning.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.5, d_cutoff: float = 1.0,
+                 fallback_period: float = 0.02):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.fallback_period = fallback_period
+        self.reset()
+
+    def reset(self) -> None:
+        self._value = None
+        self._deriv = 0.0
+        self._last_ts = None
+        self._cutoff = self.min_cutoff
+
+    @staticmethod
+    def _alpha(cutoff: float, dt: float) -> float:
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self._value is None:
+            self._value, self._last_ts = value, timestamp
+            return value
+
+        dt = timestamp - self._last_ts
+        if dt <= 0:
+            dt = self.fallback_period
+        self._last_ts = timestamp
+
+        deriv = (value - self._value) / dt
+        self._deriv += self._alpha(self.d_cutoff, dt) * (deriv - self._deriv)
+        self._cutoff = self.min_cutoff + self.beta * abs(self._deriv)
+        self._value += self._alpha(self._cutoff, dt) * (value - self._value)
+        return self._value
+
+    def group_delay(self, sample_period: float) -> float:
+        # delay of the equivalent discrete EMA at the *current* cutoff
+        alpha = self._alpha(self._cutoff, sample_period)
+        return (1.0 - alpha) / alpha * sample_period
+
+
+class MedianFilter(TiltFilter):
+    """Median of the last N samples; rejects single-packet spikes without smearing edges much."""
+
+    def __init__(self, size: int = 3):
+        if size < 1 or size % 2 == 0:
+            raise ValueError(f"size must be a positive odd number, got {size}")
+        self.size = size
+        self.reset()
+
+    def reset(self) -> None:
+        self._window = deque(maxlen=self.size)
+
+    def update(self, value: float, timestamp: float) -> float:
+        self._window.append(value)
+        ordered = sorted(self._window)
+        return ordered[len(ordered) // 2]
+
+    def group_delay(self, sample_period: float) -> float:
+        return (self.size - 1) / 2 * sample_period
+
+
+class FilterChain(TiltFilter):
+    """Runs several filters in series, e.g. a median spike rejector feeding a One-Euro."""
+
+    def __init__(self, *filters: TiltFilter):
+        self.filters = list(filters)
+
+    def reset(self) -> None:
+        for f in self.filters:
+            f.reset()
+
+    def update(self, value: float, timestamp: float) -> float:
+        for f in self.filters:
+            value = f.update(value, timestamp)
+        return value
+
+    def group_delay(self, sample_period: float) -> float:
+        return sum(f.group_delay(sample_period) for f in self.filters)
+
+
+_FILTERS = {
+    "boxcar":  lambda *a: BoxcarFilter(*(int(x) for x in a)),
+    "ema":     lambda *a: EmaFilter(*a),
+    "oneeuro": lambda *a: OneEuroFilter(*a),
+    "median":  lambda *a: MedianFilter(*(int(x) for x in a)),
+}
+
+
+def filter_factory(spec: str) -> Callable[[], TiltFilter]:
+    """
+    Parse a filter spec such as ``"boxcar:5"``, ``"ema:0.4"`` or ``"median:3+oneeuro:1.0:0.5"``
+    into a factory (each axis of the board needs its own filter instance).
+    """
+    stages = []
+    for stage in spec.split("+"):
+        name, *params = stage.strip().split(":")
+        if name not in _FILTERS:
+            raise ValueError(f"Unknown filter '{name}'. Available: {', '.join(_FILTERS)}")
+        stages.append((_FILTERS[name], [float(p) for p in params]))
+
+    def build() -> TiltFilter:
+        built = [make(*params) for make, params in stages]
+        return built[0] if len(built) == 1 else FilterChain(*built)
+
+    build()         # fail fast on bad parameters
+    return build
+
+
+# ──────────────────────────────────────────────────────────────────────────
+#  Compare filters on a synthetic lean:  python tilt_filters.py --rate 50
+# ──────────────────────────────────────────────────────────────────────────
+def _compare(specs: List[str], rate_hz: float, activate: float, release: float, noise: float) -> None:
+    import random
+
+    period = 1.0 / rate_hz
+    rng = random.Random(0)
+    rest  = [rng.gauss(0.0, noise) for _ in range(int(2 * rate_hz))]
+    ramp  = [12.0 * min(1.0, i / (0.25 * rate_hz)) + rng.gauss(0.0, noise) for i in range(int(rate_hz))]
+    spike = [0.0] * 10 + [20.0] + [0.0] * 10
+
+    print(f"{'filter':28} {'delay ms':>9} {'cross ms':>9} {'jitter p-p':>11} {'spike peak':>11}")
+    for spec in specs:
+        make = filter_factory(spec)
+
+        f = make()
+        outputs = [f.update(v, i * period) for i, v in enumerate(rest)]
+        settled = outputs[len(outputs) // 2:]
+        jitter = max(settled) - min(settled)
+
+        f = make()
+        for i in range(10):
+            f.update(0.0, i * period)
+        crossed = next((i for i, v in enumerate(ramp) if f.update(v, (10 + i) * period) > activate), None)
+        raw = next(i for i, v in enumerate(ramp) if v > activate)
+        lag = "never" if crossed is None else f"{(crossed - raw) * period * 1e3:.0f}"
+        delay = f.group_delay(period) * 1e3
+
+        f = make()
+        peak = max(abs(f.update(v, i * period)) for i, v in enumerate(spike))
+
+        flag = "" if jitter < 2 * release else "  (exceeds hysteresis band)"
+        print(f"{spec:28} {delay:9.0f} {lag:>9} {jitter:11.2f} {peak:11.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare tilt filters: lag vs. jitter.")
+    parser.add_argument("specs", nargs="*",
+                        default=["boxcar:5", "ema:0.5", "oneeuro", "median:3", "median:3+oneeuro"])
+    parser.add_argument("--rate", type=float, default=50.0, help="sample rate of the board (Hz)")
+    parser.add_argument("--activate", type=float, default=5.0)
+    parser.add_argument("--release", type=float, default=3.0)
+    parser.add_argument("--noise", type=float, default=0.5, help="sensor noise std-dev (degrees)")
+    args = parser.parse_args()
+    _compare(args.specs, args.rate, args.activate, args.release, args.noise)
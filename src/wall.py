@@ -1,7 +1,8 @@
 class Wall:
     wall = 0
-    
-    def __init__(self, x, y, images):
-        self.x = x
-        self.y = y
-        self.images = images
+    __slots__ = ()
+
+    def __init__(self):
+        ''' Walls have no state and no behaviour, so a board shares a single Wall object
+            across every wall square (a flyweight); the square's position is its index in
+            the Gamestate. '''
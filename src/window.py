@@ -1,20 +1,28 @@
 import tkinter as tk
+import latency
+import telemetry
 from board import Board
 from gameImage import GameImage
-from pacman import Pacman
-from enemy import Enemy
 from pickup import Pickup
-from wall import Wall
+from maze import BOOST, PICKUP, WALL
+from direction_queue import DirectionQueue
+from frame_timing import FrameTimer
+from time import perf_counter
 
 class Window:
+    frame_timer = None      # FrameTimer while the frame-time overlay (F3) or telemetry is on
+    _hud_on = False
+    _scene = None           # the board's level cells the canvas items were made for (see _draw_board)
 
-    def __init__(self, master):
+    def __init__(self, master, images = None, ghosts_per_type = 1, maze_file = None):
         '''
         Initializes a Window Object that is the GUI for Pacman. The Window updates
         the GUI accordingly to the progression of the game, by the use of the Board
-        object attribute initialized here. '''
+        object attribute initialized here. images is an already loaded GameImage,
+        otherwise the images are loaded here. ghosts_per_type (stress games with many
+        ghosts) and maze_file (None plays the classic maze) are passed on to the Board. '''
         self._master = master
-        self._images = GameImage()
+        self._images = images if images is not None else GameImage()
 
         # 1) NATIVE FULLSCREEN MODE (macOS, Windows, Linux)
         # -------------------------------------------------
@@ -50,37 +58,142 @@ class Window:
         self._lives_label = tk.Label(self._master, text='0', font=('Arial', 20), bg='black', fg='white')
 
         # Place them in the same row—but you can adjust x/y coordinates for fullscreen:
-        self._score_label.place(relx=0.05, rely=0.97, anchor='sw')
-        self._level_label.place(relx=0.50, rely=0.97, anchor='s')
-        self._lives_label.place(relx=0.95, rely=0.97, anchor='se')
+        self._place_labels()
 
         self._master.title('Pacman')
 
+        # Keyboard and balance board both feed this queue; the board takes a turn from it each tick
+        self.directions = DirectionQueue()
+
         # Bindings, game init, etc., stay the same…
         self._bindings_enabled(True)
         self._pause = False
 
-        self.board = Board(self._width, self._height, self._images)
+        self.board = Board(self._width, self._height, self._images, self.directions,
+                           ghosts_per_type = ghosts_per_type, maze_file = maze_file)
         self.board.new_level()
 
+        # Frame-time overlay (F3): per-phase p50/p95/max of the last updates, off by default
+        self._hud_label = tk.Label(self._master, text='', font=('Courier', 12), bg='black', fg='lime',
+                                   justify='left', anchor='nw')
+        self._master.bind('<F3>', self._toggle_hud)
+        if telemetry.log is not None:       # per-phase timings go to the event stream as well
+            self.frame_timer = self.board.frame_timer = FrameTimer()
+
+    # Life-cycle Functions #
+    def new_game(self) -> None:
+        ''' Starts a new game in this same window: the board, images and maze are all
+            reused and only the game state is reset, so nothing is rebuilt per game. '''
+        self._pause = False
+        self.show()
+        self.board.reset_game()
+        self._bindings_enabled(True)
+        self.run()
+
+    def hide(self) -> None:
+        ''' Takes the game off screen (e.g. for calibration) without destroying anything. '''
+        self._bindings_enabled(False)
+        self._canvas.delete(tk.ALL)
+        self._scene = None
+        self._images.release_transient()
+        self._canvas.pack_forget()
+        for label in (self._score_label, self._level_label, self._lives_label, self._hud_label):
+            label.place_forget()
+
+    def show(self) -> None:
+        if not self._canvas.winfo_ismapped():
+            self._canvas.pack(fill=tk.BOTH, expand=True)
+            self._place_labels()
+
+    def _place_labels(self) -> None:
+        self._score_label.place(relx=0.05, rely=0.97, anchor='sw')
+        self._level_label.place(relx=0.50, rely=0.97, anchor='s')
+        self._lives_label.place(relx=0.95, rely=0.97, anchor='se')
+        if self._hud_on:
+            self._hud_label.place(relx=0.05, rely=0.90, anchor='sw')
+
+    def _toggle_hud(self, event = None) -> None:
+        ''' Turns the frame-time overlay on or off. While it is off (and telemetry is too)
+            nothing is timed. '''
+        self._hud_on = not self._hud_on
+        if self._hud_on:
+            if self.frame_timer is None:
+                self.frame_timer = self.board.frame_timer = FrameTimer()
+            self._hud_label['text'] = self.frame_timer.report()
+            self._hud_label.place(relx=0.05, rely=0.90, anchor='sw')
+        else:
+            if telemetry.log is None:
+                self.frame_timer = self.board.frame_timer = None
+            self._hud_label.place_forget()
+
     # Drawing Functions #
     def _draw_board(self) -> None:
-        ''' Draws the board given the game_objs in the board's set. '''
-        total_height = self.board.square_height() # Approximately ~24
-        total_width = self.board.square_width()   # Approximately ~36
-        
-        for game_obj in self.board.game_objects:
-            if type(game_obj) == Wall:
-                self._canvas.create_rectangle(game_obj.x * total_width,
-                                              game_obj.y * total_height,
-                                              (game_obj.x * total_width / total_width + 1) * total_width,
-                                              (game_obj.y * total_height / total_height + 1) * total_height,
-                                              fill = 'blue', width = 0)
-        
-            elif type(game_obj) == Pickup or type(game_obj) == Pacman or type(game_obj) == Enemy:
-                self._canvas.create_image( game_obj.x * total_width + (total_width / 2),
-                                           game_obj.y * total_height + (total_height / 2), image = game_obj._image)
-
+        ''' Draws the board as canvas items kept from one update to the next (tagged 'board'),
+            so an update only sends Tk what changed. The walls and one image per pickup square
+            are made when a level starts (see _build_scene); after that a pickup's image is
+            shown or hidden as its Gamestate square holds the pickup or not (eaten, or under a
+            character), and each character's image is moved with coords() and given a new
+            sprite only when its sprite changed. '''
+        board, canvas = self.board, self._canvas
+        if self._scene is not board._level_cells:
+            self._build_scene()
+
+        items, shown = self._pickup_items, self._pickup_shown
+        for i, (y, x) in enumerate(self._pickup_squares):
+            game_obj = board[y][x]
+            image = game_obj._image if type(game_obj) == Pickup else None
+            if image is not shown[i]:
+                if image is None:
+                    canvas.itemconfigure(items[i], state = 'hidden')
+                else:
+                    canvas.itemconfigure(items[i], image = image, state = 'normal')
+                shown[i] = image
+
+        total_height, total_width = board.square_height(), board.square_width()
+        half_height, half_width = total_height // 2, total_width // 2
+        items, xs, ys, images = self._character_items, self._character_xs, self._character_ys, self._character_images
+        for i, character in enumerate(board.characters()):
+            if character.x != xs[i] or character.y != ys[i]:
+                canvas.coords(items[i], character.x * total_width + half_width,
+                                        character.y * total_height + half_height)
+                xs[i], ys[i] = character.x, character.y
+            image = character._image
+            if image is not images[i]:
+                if image is None:
+                    canvas.itemconfigure(items[i], state = 'hidden')
+                else:
+                    canvas.itemconfigure(items[i], image = image, state = 'normal')
+                images[i] = image
+
+    def _build_scene(self) -> None:
+        ''' Makes the canvas items of a level: a rectangle per wall and an image per square
+            the maze starts with a pickup on, then one image per character on top. Tile
+            sizes are whole pixels, so every rectangle and sprite lands on integer coordinates. '''
+        board, canvas = self.board, self._canvas
+        canvas.delete('board')
+        total_height = board.square_height() # Approximately ~23
+        total_width = board.square_width()   # Approximately ~45
+        half_height, half_width = total_height // 2, total_width // 2
+
+        self._pickup_squares, self._pickup_items, self._pickup_shown = [], [], []
+        width = board.maze.width
+        for i, code in enumerate(board.maze.cells):
+            y, x = divmod(i, width)
+            if code == WALL:
+                canvas.create_rectangle(x * total_width, y * total_height,
+                                        (x + 1) * total_width, (y + 1) * total_height,
+                                        fill = 'blue', width = 0, tags = 'board')
+            elif code == PICKUP or code == BOOST:
+                self._pickup_squares.append((y, x))
+                self._pickup_items.append(canvas.create_image(x * total_width + half_width, y * total_height + half_height,
+                                                              state = 'hidden', tags = 'board'))
+                self._pickup_shown.append(None)
+
+        count = len(board.enemies) + 1
+        self._character_items = [ canvas.create_image(0, 0, state = 'hidden', tags = 'board') for _ in range(count) ]
+        self._character_xs, self._character_ys = [None] * count, [None] * count
+        self._character_images = [None] * count
+        self._scene = board._level_cells
 
     def _draw_stats(self) -> None:
         ''' Draws the statistics of Pacman for the player to see. '''
@@ -89,8 +202,11 @@ class Window:
         self._lives_label['text'] = self.board.pacman.display_lives()
 
     def _adjust_board(self) -> None:
-        ''' Deletes the board and then redraws to prevent animation overlapping. '''
-        self._canvas.delete(tk.ALL)
+        ''' Deletes the overlays (everything but the board's own items) and then redraws to
+            prevent animation overlapping. Overlays that were on screen are gone now, so the
+            rarely used ones are released. '''
+        self._canvas.delete('!board')
+        self._images.release_transient()
         self._draw_board()
         self._draw_stats()
 
@@ -101,6 +217,9 @@ class Window:
             then update the game as normal. '''
         # Completed Level GUI #
         if self.board.level_complete():
+            pacman = self.board.pacman
+            telemetry.emit('level_complete', level = pacman.level, score = pacman.score,
+                           lives = pacman.lives, tick = self.board.ticks)
             self.display_completed()
             self._canvas.after(5000, self.run)
 
@@ -116,17 +235,21 @@ class Window:
         # Game Progress #
         else:
             self._canvas.after(400, self.update)
+            if self.frame_timer is not None:
+                self.frame_timer.expect(400)
     
     def display_completed(self) -> None:
         ''' This functions is to add a proper transition between the completed
             level and the loading screen. Mainly for visual purposes to appear nicer. '''
         self.board.pacman.direction = None
         self._bindings_enabled(False)       # bindings are disabled during loading screen
+        self._images.prefetch('loading_screen')
         self._canvas.after(750, self.loading_screen)
 
     def loading_screen(self) -> None:
         ''' Adds a loading screen transition in between levels. '''
         self._canvas.delete(tk.ALL)
+        self._scene = None
         self._canvas.create_image( self._width / 2, self._height / 2,
                                    image = self._images.return_image('loading_screen') )
         
@@ -182,22 +305,24 @@ class Window:
         
     # (Player) Binding Functions #
     def pacmans_direction(self, event: tk.Event) -> None:
-        ''' Function that allows the player to move Pacman. Directions have
-            to be validated in order to avoid stopped movement. nextDirection
-            and lastDirection allow smoother control of Pacman. '''
-        try:
-            self.board.pacman.change_direction(event.keysym)
+        ''' Function that allows the player to move Pacman. The key is queued with
+            its timestamp (a held key's autorepeats only once) and applied by the board
+            at the next tick, where it is validated in order to avoid stopped movement. '''
+        cid = latency.tracker.begin() if latency.tracker is not None else None
+        self.directions.push(event.keysym, cid=cid)
 
-            if not self.board.validate_path( event.keysym ):
-                self.board.pacman.next_direction = event.keysym
-                self.board.pacman.direction = self.board.pacman.last_direction
+    def _mark_moves_drawn(self) -> None:
+        ''' Latency tracking: turns accepted this tick count as shown once Tk has run the
+            idle redraw queued by _adjust_board (our idle callback runs after it). '''
+        moves = list(self.board.accepted_moves)
+        self.board.accepted_moves.clear()
 
-            else:
-                self.board.pacman.direction_image( self._images )
-                self.board.pacman.next_direction = None
+        def drawn():
+            if latency.tracker is not None:
+                for cid in moves:
+                    latency.tracker.mark(cid, 'drawn')
 
-        except AttributeError:
-            pass
+        self._canvas.after_idle(drawn)
 
     def check_pause(self) -> None:
         ''' Check_pause constantly calls itself to check when the player
@@ -216,6 +341,10 @@ class Window:
         ''' The boolean argument is what decides if the bindings are enabled or
             disabled. The bindings are enabled during play, but disabled in betwene
             level transition, specifically during the loading screen. '''
+        self.directions.enabled = enabled
+        if not enabled:
+            self.directions.clear()
+
         if enabled:
             self._master.bind('<Left>', self.pacmans_direction)
             self._master.bind('<Right>', self.pacmans_direction)
@@ -239,12 +368,33 @@ class Window:
         '''
 
         if not self._pause:
+            timer = self.frame_timer
+            if timer is not None:
+                start = lap = timer.frame_started()
+
             self.board.update_directions()
-            self.board.update_board()
+            if timer is not None:
+                timer.lap('directions', lap)
+            self.board.update_board()                   # times its own sub-phases
+            if timer is not None:
+                lap = perf_counter()
             self._check_for_completion()
+            if timer is not None:
+                lap = timer.lap('completion', lap)
 
             if not self.board.game_over:
                 self._adjust_board()
+                if self.board.accepted_moves:
+                    self._mark_moves_drawn()
+            if timer is not None:
+                timer.lap('draw', lap)
+                timer.record('frame', perf_counter() - start)
+                if self._hud_on:
+                    self._hud_label['text'] = timer.report()
+                if telemetry.log is not None and timer.frames % timer.capacity == 0:
+                    telemetry.emit('frame_times', frames = timer.capacity, tick = self.board.ticks,
+                                   ms = { phase: [round(p50, 3), round(p95, 3), round(peak, 3)]
+                                          for phase, p50, p95, peak in timer.summary() })
             
         else:
             self._canvas.create_image(self._width / 2, self._height / 2,
@@ -252,7 +402,8 @@ class Window:
             self.check_pause()
 
     def run(self) -> None:
+        ''' Starts the current level: countdown, then the game loop. Only schedules callbacks,
+            the caller's single mainloop() drives them, so levels never nest mainloops. '''
         self.delay_beginning()
-        self._master.after(2000, self.update) # put again here to allow mainloop() to still occur and also call gameloop
-        self._master.mainloop()
+        self._master.after(2000, self.update)
 